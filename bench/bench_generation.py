@@ -0,0 +1,67 @@
+# bench/bench_generation.py
+"""
+Compares the concurrent generation pipeline with the old one-at-a-time loop,
+and single-topic prompts with batched ones, against the local Gemini stub.
+
+    python -m bench.bench_generation --topics 40 --latency 1.0 --rpm 120
+    python -m bench.bench_generation --concurrency 4 --batch-size 1 5 10 --item-latency 0.3 --rpm 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from bench.gemini_stub import StubConfig, start_in_thread
+
+
+def run(config, topics, requests_per_minute, concurrency, batch_size=1):
+    from utils.generation_pipeline import generate_topics, latency_summary
+    from utils.http_client import client
+
+    async def generate():
+        try:
+            # max_age=0 bypasses the response cache so every run really hits the stub
+            return await generate_topics(topics, requests_per_minute=requests_per_minute, concurrency=concurrency,
+                                         max_age=0, batch_size=batch_size)
+        finally:
+            await client.close()
+
+    requests_before = config.requests
+    started = time.perf_counter()
+    results = asyncio.run(generate())
+    elapsed = time.perf_counter() - started
+    summary = latency_summary(results)
+    summary.update({"concurrency": concurrency, "batch_size": batch_size, "rpm": requests_per_minute,
+                    "requests": config.requests - requests_before, "wall_seconds": round(elapsed, 3),
+                    "topics_per_minute": round(len(topics) / elapsed * 60, 1)})
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AI generation pipeline against a local stub")
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub response time in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of stub responses that are 429")
+    parser.add_argument("--rpm", type=float, default=120, help="Client-side requests per minute")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1], help="Topics per request to compare")
+    parser.add_argument("--item-latency", type=float, default=0.0, help="Extra stub seconds per topic answered")
+    parser.add_argument("--bad-item-rate", type=float, default=0.0,
+                        help="Fraction of batch items the stub leaves incomplete")
+    args = parser.parse_args()
+
+    server, base_url = start_in_thread(StubConfig(latency=args.latency, error_rate=args.error_rate,
+                                                  item_latency=args.item_latency,
+                                                  bad_item_rate=args.bad_item_rate))
+    os.environ["GEMINI_API_BASE"] = base_url
+    os.environ.setdefault("GOOGLE_AI_API_KEY", "stub")
+
+    topics = [f"Stub Topic {i}" for i in range(args.topics)]
+    report = [run(server.config, topics, args.rpm, c, b) for c in args.concurrency for b in args.batch_size]
+    server.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
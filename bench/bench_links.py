@@ -0,0 +1,56 @@
+# bench/bench_links.py
+"""
+Runs the link checker against the local site stub with different per-domain
+caps and reports throughput and the outcome breakdown of each run.
+
+    python -m bench.bench_links --links 600 --latency 0.05 --per-domain 1 4 8
+    python -m bench.bench_links --dead-rate 0.2 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+from bench.gemini_stub import fake_topic
+from bench.service_stubs import ServiceConfig, start_in_thread
+
+
+def resource_links(count):
+    """Links the way the generator stores them: three per topic on three sites."""
+    links = []
+    for i in range(count // 3 + 1):
+        links.extend(link["url"] for link in fake_topic(f"Stub Topic {i}")["resource_links"])
+    return links[:count]
+
+
+def run(base_url, urls, concurrency, per_domain, cache_path):
+    from utils.link_checker import LinkChecker
+
+    checker = LinkChecker(path=cache_path, concurrency=concurrency, per_domain=per_domain, base=base_url)
+    asyncio.run(checker.check(urls, refresh=True))
+    return dict(checker.report, concurrency=concurrency, per_domain=per_domain)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resource link checker against a local stub")
+    parser.add_argument("--links", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub seconds per request")
+    parser.add_argument("--dead-rate", type=float, default=0.1, help="Fraction of links the stub reports gone")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--per-domain", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    server, base_url = start_in_thread(ServiceConfig([], problems=0, link_dead_rate=args.dead_rate,
+                                                     link_latency=args.latency))
+    urls = resource_links(args.links)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "link_health.json")
+        report = [run(base_url, urls, args.concurrency, n, cache_path) for n in args.per_domain]
+    report.append({"stub_requests": server.config.link_requests})
+    server.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
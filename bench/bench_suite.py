@@ -0,0 +1,347 @@
+# bench/bench_suite.py
+"""
+Reproducible benchmarks for the lookup, rendering, loading and refresh paths,
+on synthetic datasets of 100/1k/10k topics. Results are printed (or written
+with --output) as JSON so runs on different commits can be diffed.
+
+    python -m bench.bench_suite --output bench-$(git rev-parse --short HEAD).json
+    python -m bench.bench_suite --sizes 1000 --skip-update
+    python -m bench.bench_suite --save-baseline      # after an intended speed change
+
+The update_all_data run uses bench.service_stubs in place of Notion, LeetCode,
+Gemini and the sites resource links point at, inside a temporary working directory.
+
+Every run is compared with bench/baseline.json: results more than --tolerance
+times slower than the baseline, or making more outside requests or commits,
+are listed under "regressions" and the suite exits with status 1. The
+baseline's numbers come from the machine recorded in it, so re-record it
+before comparing on different hardware.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from bench import service_stubs
+from bench.fixtures import FakeContext, make_dataset, make_queries
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+# Fields that tell results apart; everything else is a measurement
+IDENTITY_FIELDS = ("bench", "size", "path", "run", "topics", "problems", "users", "rounds")
+TIMING_FIELDS = ("per_op_us", "seconds")
+# Outside calls and commits should never grow without an intended change
+COUNT_FIELDS = ("gemini_requests", "notion_requests", "leetcode_requests", "commits", "repeats")
+# Timings this small are mostly noise; they only count as regressions past this much
+TIMING_FLOOR = {"per_op_us": 10.0, "seconds": 0.01}
+
+
+def _per_op_us(fn, items, repeat=3):
+    """Best-of-`repeat` mean microseconds per call of fn(item) over items."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, (time.perf_counter() - started) / len(items))
+    return round(best * 1e6, 3)
+
+
+def _async_per_op_us(coro_fn, items, repeat=3):
+    async def run():
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for item in items:
+                await coro_fn(item)
+            best = min(best, (time.perf_counter() - started) / len(items))
+        return best
+    return round(asyncio.run(run()) * 1e6, 3)
+
+
+@contextmanager
+def _timed(result, field="seconds"):
+    started = time.perf_counter()
+    yield
+    result[field] = round(time.perf_counter() - started, 4)
+
+
+@contextmanager
+def _working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def bench_lookups(size, queries_per_path):
+    from commands import autocomplete, dsa, resources, search  # noqa: F401 (search builds its index on publish)
+    from utils import topic_store
+
+    results = []
+    dataset, res = make_dataset(size)
+
+    publish = {"bench": "publish", "size": size}
+    with _timed(publish):  # Builds both indexes and pre-renders every embed
+        snapshot = topic_store.publish(dataset, res)
+    results.append(publish)
+
+    for path, queries in make_queries(dataset, queries_per_path).items():
+        results.append({"bench": "resolve", "size": size, "path": path,
+                        "per_op_us": _per_op_us(snapshot.index.resolve, queries)})
+
+    search_queries = [" ".join(dataset[k]["short"].split()[3:6]) for k in make_queries(dataset, queries_per_path)["exact"]]
+    results.append({"bench": "search", "size": size, "per_op_us": _per_op_us(snapshot.search.search, search_queries)})
+
+    prefixes = [q[:4] for q in make_queries(dataset, queries_per_path)["substring"]]
+    results.append({"bench": "autocomplete", "size": size,
+                    "per_op_us": _per_op_us(lambda q: autocomplete.topic_choices(snapshot, q), prefixes)})
+
+    keys = make_queries(dataset, queries_per_path)["exact"]
+    results.append({"bench": "build_dsa_embed", "size": size,
+                    "per_op_us": _per_op_us(lambda k: dsa.build_dsa_embed(snapshot, k), keys)})
+    results.append({"bench": "build_resources_embed", "size": size,
+                    "per_op_us": _per_op_us(lambda k: resources.build_resources_embed(snapshot, k), keys)})
+
+    ctx = FakeContext()
+    queries = make_queries(dataset, queries_per_path)
+    for path in ("exact", "fuzzy", "miss"):
+        results.append({"bench": "handle_dsa", "size": size, "path": path,
+                        "per_op_us": _async_per_op_us(lambda q: dsa.handle_dsa(ctx, q), queries[path])})
+        results.append({"bench": "handle_resources", "size": size, "path": path,
+                        "per_op_us": _async_per_op_us(lambda q: resources.handle_resources(ctx, q), queries[path])})
+    return results
+
+
+def bench_loading(size):
+    from utils import render_cache, topic_store
+    from utils.snapshots import load_generation, read_manifest, write_snapshot
+
+    dataset, res = make_dataset(size)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, _working_dir(tmp):
+        Path("data").mkdir()
+        legacy = Path("data/dsa_topics.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump(dataset, f, indent=2, ensure_ascii=False)
+        with open("data/resources.json", "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+
+        def load_json(_):
+            with open(legacy, "r", encoding="utf-8") as f:
+                json.load(f)
+        results.append({"bench": "json_load", "size": size, "bytes": legacy.stat().st_size,
+                        "per_op_us": _per_op_us(load_json, [None])})
+
+        written = {"bench": "write_snapshot", "size": size}
+        with _timed(written):
+            write_snapshot(dataset.items(), res.items())
+        results.append(written)
+
+        manifest = read_manifest()
+        opened = {"bench": "open_generation", "size": size,
+                  "bytes": sum(info["bytes"] for info in manifest["files"].values()),
+                  "per_op_us": _per_op_us(lambda _: load_generation(manifest), [None])}
+        results.append(opened)
+
+        loaded = {"bench": "topic_store_load", "size": size}
+        with _timed(loaded):  # Reads the generation and builds the index
+            topic_store.load()
+        results.append(loaded)
+        # Mapped generations warm their embeds on a thread; don't let it skew the lookups
+        render_cache.wait_for_warming()
+    return results
+
+
+def bench_challenges(users, rounds, problems):
+    """
+    users concurrent users each running !challenge `rounds` times and then
+    !solved, against a fresh progress store. Writes are committed in batches,
+    so commits should stay far below the number of commands.
+    """
+    from commands import challenge, progress
+    from utils import problem_catalog
+    from utils.progress_store import ProgressStore, commit_seconds
+    import utils.progress_store as progress_store
+
+    problem_catalog.publish(problem_catalog.ProblemCatalog.from_questions(service_stubs.leetcode_questions(problems)))
+    contexts = [FakeContext(user_id=i) for i in range(users)]
+
+    async def user(ctx):
+        for _ in range(rounds):
+            await challenge.handle_challenge(ctx)
+        await progress.handle_solved(ctx)
+
+    async def run():
+        await asyncio.gather(*(user(ctx) for ctx in contexts))
+        await progress_store._store.close()
+
+    result = {"bench": "challenge_progress", "users": users, "rounds": rounds, "problems": problems}
+    with tempfile.TemporaryDirectory() as tmp:
+        progress_store._store = ProgressStore(Path(tmp) / "progress.sqlite3")
+        commits_before = (commit_seconds.summary() or {"count": 0})["count"]
+        with _timed(result):
+            asyncio.run(run())
+        result["commands"] = users * (rounds + 1)
+        result["commands_per_second"] = round(result["commands"] / result["seconds"], 1)
+        result["commits"] = commit_seconds.summary()["count"] - commits_before
+        # Every challenge a user got in the run should be a different problem
+        served = [{m.embed.url for m in ctx.sent if m.embed is not None} for ctx in contexts]
+        result["repeats"] = sum(rounds - len(urls) for urls in served)
+        progress_store._store = None
+    return result
+
+
+def bench_update(config, topics, problems):
+    from utils.data_updater import update_all_data
+    from utils.http_client import client
+
+    async def run(**kwargs):
+        try:
+            return await update_all_data(**kwargs)
+        finally:
+            await client.close()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, _working_dir(tmp):
+        Path("data").mkdir()
+        first = {"bench": "update_all_data", "run": "initial", "topics": topics, "problems": problems}
+        with _timed(first):
+            first["published"] = asyncio.run(run())
+        first.update(gemini_requests=config.requests, notion_requests=config.notion_requests,
+                     leetcode_requests=config.leetcode_requests)
+        results.append(first)
+
+        second = {"bench": "update_all_data", "run": "forced, unchanged", "topics": topics}
+        requests_before = config.requests
+        with _timed(second):
+            second["published"] = asyncio.run(run(force_update=True))
+        second["gemini_requests"] = config.requests - requests_before
+        results.append(second)
+    return results
+
+
+def _identity(result):
+    return tuple((field, result[field]) for field in IDENTITY_FIELDS if field in result)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lines comparing each result with the baseline result of the same
+    identity, and the subset of them that are regressions.
+    """
+    previous = {_identity(result): result for result in baseline.get("results", [])}
+    comparisons, regressions = [], []
+    for result in results:
+        before = previous.get(_identity(result))
+        if before is None:
+            continue
+        label = " ".join(str(value) for _, value in _identity(result))
+        for field in TIMING_FIELDS:
+            if field in result and before.get(field):
+                ratio = result[field] / before[field]
+                line = {"result": label, "field": field, "baseline": before[field], "current": result[field],
+                        "ratio": round(ratio, 2)}
+                comparisons.append(line)
+                if ratio > tolerance and result[field] - before[field] > TIMING_FLOOR[field]:
+                    regressions.append(line)
+        for field in COUNT_FIELDS:
+            if field in result and field in before and result[field] > before[field]:
+                line = {"result": label, "field": field, "baseline": before[field], "current": result[field]}
+                comparisons.append(line)
+                regressions.append(line)
+    return comparisons, regressions
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lookups, rendering, loading and refreshes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200, help="Queries per resolution path")
+    parser.add_argument("--skip-update", action="store_true", help="Don't run update_all_data against the stubs")
+    parser.add_argument("--update-topics", type=int, default=40)
+    parser.add_argument("--update-problems", type=int, default=300)
+    parser.add_argument("--challenge-users", type=int, default=200, help="Concurrent users in the progress bench")
+    parser.add_argument("--challenge-rounds", type=int, default=5, help="!challenge commands per user")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub Gemini response time in seconds")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="Report to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="How many times slower than the baseline a result may be")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Record this run as the baseline instead of comparing with it")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    os.environ.setdefault("GOOGLE_AI_API_KEY", "stub")
+    os.environ.setdefault("AI_REQUESTS_PER_MINUTE", "6000")
+    os.environ.setdefault("AI_CACHE_PATH", "data/ai_cache.sqlite3")  # Relative, so it lands in the temp dir
+
+    stubs = None
+    if not args.skip_update:
+        # Point every integration at the stubs before utils reads its settings
+        names = [f"Stub Topic {i}" for i in range(args.update_topics)]
+        config = service_stubs.ServiceConfig(names, args.update_problems, latency=args.latency,
+                                             jitter=args.latency / 4)
+        stubs, base_url = service_stubs.start_in_thread(config)
+        os.environ["GEMINI_API_BASE"] = base_url
+        os.environ["NOTION_API_BASE"] = base_url
+        os.environ["LEETCODE_GRAPHQL_URL"] = f"{base_url}/graphql"
+        os.environ["LINK_CHECK_BASE"] = base_url
+
+    report = {"commit": _commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "created_at": time.time(), "results": []}
+    for size in args.sizes:
+        report["results"].extend(bench_loading(size))
+        report["results"].extend(bench_lookups(size, args.queries))
+
+    report["results"].append(bench_challenges(args.challenge_users, args.challenge_rounds, args.update_problems))
+
+    if stubs:
+        try:
+            report["results"].extend(bench_update(stubs.config, args.update_topics, args.update_problems))
+        finally:
+            stubs.shutdown()
+
+    regressions = []
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        report["baseline"] = {"path": str(baseline_path), "commit": baseline.get("commit"),
+                              "tolerance": args.tolerance}
+        report["comparison"], regressions = compare(report["results"], baseline, args.tolerance)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    for line in regressions:
+        logging.warning(f"Regression: {line['result']} {line['field']} {line['baseline']} -> {line['current']}")
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# bench/fixtures.py
+"""
+Synthetic topic datasets and a stand-in for discord.py's Context, shared by
+the benchmarks. Datasets are deterministic for a given size and seed, and
+their entries are copied from the bundled seed data so embeds are realistic.
+"""
+import itertools
+import json
+import random
+from pathlib import Path
+
+SEED_FILE = Path(__file__).resolve().parent.parent / "data" / "dsa_topics.json"
+MODIFIERS = ["Persistent", "Randomized", "Parallel", "Online", "Weighted", "Implicit", "Lazy", "Succinct",
+             "Dynamic", "Offline", "Bidirectional", "Compressed", "Augmented", "Distributed", "Cache Oblivious"]
+
+
+def _seed_entries():
+    with open(SEED_FILE, "r", encoding="utf-8") as f:
+        return list(json.load(f).values())
+
+
+def make_dataset(size, seed=0):
+    """Returns (dsa, resources) with `size` topics, shaped like the updater's output."""
+    rng = random.Random(seed)
+    entries = _seed_entries()
+    dsa, resources = {}, {}
+    i = 0
+    while len(dsa) < size:
+        base = entries[i % len(entries)]
+        rounds = i // len(entries)
+        if rounds == 0:
+            title = base["title"]
+        else:
+            title = f"{MODIFIERS[rounds % len(MODIFIERS)]} {base['title']}"
+            if rounds >= len(MODIFIERS):
+                title += f" {rounds // len(MODIFIERS) + 1}"
+        i += 1
+        key = title.lower().replace(" ", "-")
+        if key in dsa:
+            continue
+        entry = dict(base, title=title)
+        entry["short"] = entry.get("short", "") + f" Variant {rng.randint(0, 10 ** 6)}."
+        dsa[key] = entry
+        resources[key] = [list(link) for link in entry.get("links", [])]
+    return dsa, resources
+
+
+def _typo(text, rng):
+    letters = [i for i in range(1, len(text) - 2) if text[i].isalpha() and text[i + 1].isalpha()]
+    if not letters:
+        return text + "x"
+    i = rng.choice(letters)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def make_queries(dsa, count=200, seed=1):
+    """
+    Queries for each resolution path of TopicIndex.resolve: the exact key, a
+    differently cased/spaced title, a truncated title (substring match), a
+    title with a transposition typo (fuzzy) and a query matching nothing.
+    """
+    rng = random.Random(seed)
+    keys = rng.sample(list(dsa), min(count, len(dsa)))
+    titles = [dsa[k]["title"] for k in keys]
+    return {
+        "exact": keys,
+        "normalized": ["  " + t.upper().replace(" ", "   ") + " " for t in titles],
+        "substring": [t.lower()[:max(4, len(t) - 3)] for t in titles],
+        "fuzzy": [_typo(t.lower(), rng) for t in titles],
+        "miss": [f"qzx{rng.randint(0, 10 ** 6)} frobnicator" for _ in keys],
+    }
+
+
+_message_ids = itertools.count(1)
+
+
+class FakeMessage:
+    def __init__(self, ctx, content=None, embed=None):
+        self.id = next(_message_ids)
+        self.ctx = ctx
+        self.content = content
+        self.embed = embed
+
+    async def edit(self, content=None, embed=None, **kwargs):
+        self.content = content if content is not None else self.content
+        self.embed = embed if embed is not None else self.embed
+        return self
+
+
+class _Ref:
+    def __init__(self, id):
+        self.id = id
+        self.mention = f"<@{id}>"
+        self.display_name = f"user{id}"
+
+
+class FakeContext:
+    """Just enough of commands.Context for the command handlers: send() records replies."""
+
+    def __init__(self, user_id=1, channel_id=2, guild_id=3):
+        self.author = _Ref(user_id)
+        self.channel = _Ref(channel_id)
+        self.guild = _Ref(guild_id) if guild_id is not None else None
+        self.sent = []
+
+    async def send(self, content=None, embed=None, **kwargs):
+        message = FakeMessage(self, content, embed)
+        self.sent.append(message)
+        return message
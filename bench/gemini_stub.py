@@ -0,0 +1,152 @@
+# bench/gemini_stub.py
+"""
+A local stand-in for the Gemini generateContent endpoint. It answers with a
+well-formed DSA topic JSON after a configurable delay and can inject 429s and
+5xx responses, or enforce its own requests-per-minute quota. Batched prompts
+get a JSON array back, optionally with some items left incomplete.
+
+    python -m bench.gemini_stub --port 8765 --latency 1.5 --rpm 60
+    python -m bench.gemini_stub --latency 1.0 --item-latency 0.5 --bad-item-rate 0.05
+    GEMINI_API_BASE=http://127.0.0.1:8765 python bot.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOPIC_PATTERN = re.compile(r'algorithm: "([^"]+)"')
+BATCH_PATTERN = re.compile(r'topics: (\[.*\])')
+
+
+def fake_topic(topic):
+    slug = topic.lower().replace(" ", "-")
+    video = hashlib.sha1(slug.encode()).hexdigest()[:11]
+    return {
+        "title": topic.title(),
+        "short_description": f"{topic} is a stub topic generated for benchmarking. " * 3,
+        "time_complexity": "O(n log n)",
+        "space_complexity": "O(n)",
+        "cpp_code": "#include <iostream>\nint main() {\n  // stub\n  return 0;\n}\n",
+        "resource_links": [
+            {"name": "GeeksforGeeks Article", "url": f"https://www.geeksforgeeks.org/{slug}/"},
+            {"name": "YouTube Tutorial", "url": f"https://www.youtube.com/watch?v={video}"},
+            {"name": "LeetCode Problems", "url": f"https://leetcode.com/tag/{slug}/"},
+        ],
+    }
+
+
+class StubConfig:
+    def __init__(self, latency=1.0, jitter=0.25, error_rate=0.0, server_error_rate=0.0, rpm=None,
+                 item_latency=0.0, bad_item_rate=0.0):
+        self.latency = latency          # Fixed cost of every call
+        self.item_latency = item_latency  # Extra seconds per topic in the answer, like output tokens
+        self.bad_item_rate = bad_item_rate  # Fraction of batch items returned without their code
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.server_error_rate = server_error_rate
+        self.rpm = rpm
+        self.requests = 0
+        self.rejected = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def over_quota(self):
+        with self._lock:
+            self.requests += 1
+            if not self.rpm:
+                return False
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                self.rejected += 1
+                return True
+            self._recent.append(now)
+            return False
+
+
+def make_handler(config):
+    class GeminiStubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, body, headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if config.over_quota() or random.random() < config.error_rate:
+                self._reply(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}, {"Retry-After": "1"})
+                return
+            if random.random() < config.server_error_rate:
+                self._reply(503, {"error": {"code": 503, "status": "UNAVAILABLE"}})
+                return
+
+            prompt = body["contents"][0]["parts"][0]["text"]
+            batch = BATCH_PATTERN.search(prompt)
+            if batch:
+                answer = []
+                for topic in json.loads(batch.group(1)):
+                    item = dict(fake_topic(topic), topic=topic)
+                    if random.random() < config.bad_item_rate:
+                        del item["cpp_code"]
+                    answer.append(item)
+            else:
+                match = TOPIC_PATTERN.search(prompt)
+                answer = fake_topic(match.group(1) if match else "Unknown")
+            items = len(answer) if batch else 1
+            time.sleep(max(0.0, config.latency + config.item_latency * items
+                           + random.uniform(-config.jitter, config.jitter)))
+            text = json.dumps(answer)
+            self._reply(200, {"candidates": [{"content": {"parts": [{"text": f"```json\n{text}\n```"}]}}],
+                              "usageMetadata": {"candidatesTokenCount": len(text) // 4}})
+
+    return GeminiStubHandler
+
+
+def start_in_thread(config=None, host="127.0.0.1", port=0):
+    """Starts the stub on a background thread; returns (server, base_url)."""
+    config = config or StubConfig()
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini generateContent stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.25)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Fraction answered with 503")
+    parser.add_argument("--rpm", type=int, default=None, help="Reject requests above this rate with 429")
+    parser.add_argument("--item-latency", type=float, default=0.0, help="Extra seconds per topic in a response")
+    parser.add_argument("--bad-item-rate", type=float, default=0.0, help="Fraction of batch items left incomplete")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.server_error_rate, args.rpm,
+                        args.item_latency, args.bad_item_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    print(f"Gemini stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
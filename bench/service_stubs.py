@@ -0,0 +1,195 @@
+# bench/service_stubs.py
+"""
+Local stand-ins for every service the updater talks to, on one port:
+Notion's loadPageChunk (paged by chunkNumber), LeetCode's GraphQL endpoint, (for any other POST)
+the Gemini stub from bench.gemini_stub, and (for GET/HEAD) the sites resource links point at, with a
+configurable share of them dead.
+
+    python -m bench.service_stubs --port 8766 --topics 200 --problems 3000
+    NOTION_API_BASE=http://127.0.0.1:8766 LEETCODE_GRAPHQL_URL=http://127.0.0.1:8766/graphql \
+        GEMINI_API_BASE=http://127.0.0.1:8766 LINK_CHECK_BASE=http://127.0.0.1:8766 python bot.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bench.gemini_stub import StubConfig, make_handler
+
+TAGS = ["array", "string", "hash-table", "dynamic-programming", "math", "sorting", "greedy", "depth-first-search",
+        "binary-search", "tree", "breadth-first-search", "graph", "two-pointers", "stack", "heap-priority-queue",
+        "linked-list", "trie", "backtracking", "union-find", "segment-tree"]
+
+
+NOTION_CHUNK_BLOCKS = 25
+
+
+def notion_page(root_id, topic_names, edited_at=1700000000000):
+    """
+    The blocks of a page titled like the real one: a root page block listing
+    two section headers and one numbered block per topic, in page order.
+    Returns id -> block record.
+    """
+    blocks = {}
+    content = []
+
+    def add(text, block_type="text"):
+        block_id = str(uuid.uuid4())
+        blocks[block_id] = {"value": {"id": block_id, "type": block_type, "properties": {"title": [[text]]}}}
+        content.append(block_id)
+
+    add("Core Foundations", "header")
+    for i, name in enumerate(topic_names, 1):
+        if i == len(topic_names) // 2:
+            add("Basic Sorting", "header")
+        add(f"{i}. {name}", "numbered_list")
+    blocks[root_id] = {"value": {"id": root_id, "type": "page", "content": content, "last_edited_time": edited_at,
+                                 "properties": {"title": [["List of important topics for DSA"]]}}}
+    return blocks
+
+
+def notion_chunks(root_id, topic_names, per_chunk=NOTION_CHUNK_BLOCKS):
+    """
+    loadPageChunk responses, as encoded bodies, in the order Notion serves
+    them: the root block first, then the page's blocks per_chunk at a time,
+    each but the last carrying a cursor.
+    """
+    blocks = notion_page(root_id, topic_names)
+    order = [root_id] + blocks[root_id]["value"]["content"]
+    bodies = []
+    for start in range(0, len(order), per_chunk):
+        ids = order[start:start + per_chunk]
+        more = start + per_chunk < len(order)
+        cursor = {"stack": [[{"table": "block", "id": root_id, "index": start + per_chunk}]] if more else []}
+        bodies.append(json.dumps({"recordMap": {"block": {i: blocks[i] for i in ids}}, "cursor": cursor}).encode())
+    return bodies
+
+
+def leetcode_questions(count, seed=0):
+    rng = random.Random(seed)
+    questions = []
+    for i in range(1, count + 1):
+        tags = rng.sample(TAGS, rng.randint(1, 3))
+        questions.append({
+            "acRate": round(rng.uniform(15, 85), 2),
+            "difficulty": rng.choice(["Easy", "Medium", "Medium", "Hard"]),
+            "title": f"Stub Problem {i}",
+            "titleSlug": f"stub-problem-{i}",
+            "paidOnly": rng.random() < 0.15,
+            "topicTags": [{"name": t.replace("-", " ").title(), "slug": t} for t in tags],
+        })
+    return questions
+
+
+def link_is_dead(url, dead_rate):
+    """Whether the stub treats a link as gone; stable across runs for the same URL."""
+    return zlib.crc32(url.encode()) % 1000 < dead_rate * 1000
+
+
+class ServiceConfig(StubConfig):
+    def __init__(self, topic_names, problems=1000, link_dead_rate=0.1, link_latency=0.05,
+                 head_refused=("geeksforgeeks.org",), **gemini):
+        super().__init__(**gemini)
+        self.topic_names = topic_names
+        self.link_dead_rate = link_dead_rate
+        self.link_latency = link_latency
+        self.head_refused = head_refused  # Sites answering HEAD with 405, like some CDNs do
+        self.link_requests = 0
+        self.notion_pages = {}  # Page id -> chunk bodies; the stub serves whatever page is asked for
+        self.questions = leetcode_questions(problems)
+        self.notion_requests = 0
+        self.leetcode_requests = 0
+
+
+def make_service_handler(config):
+    gemini_handler = make_handler(config)
+
+    class ServiceStubHandler(gemini_handler):
+        def _send_raw(self, payload):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if self.path.endswith("/api/v3/loadPageChunk"):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                config.notion_requests += 1
+                page_id = body.get("pageId", "")
+                if page_id not in config.notion_pages:
+                    config.notion_pages[page_id] = notion_chunks(page_id, config.topic_names)
+                chunks = config.notion_pages[page_id]
+                self._send_raw(chunks[min(body.get("chunkNumber", 0), len(chunks) - 1)])
+            elif self.path.startswith("/graphql"):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                config.leetcode_requests += 1
+                variables = body.get("variables") or {}
+                skip, limit = variables.get("skip", 0), variables.get("limit", 50)
+                page = {"total": len(config.questions), "questions": config.questions[skip:skip + limit]}
+                self._reply(200, {"data": {"problemsetQuestionList": page}})
+            else:
+                super().do_POST()
+
+        def _link(self, method):
+            # Requests arrive as /host/path, the way LINK_CHECK_BASE rewrites them
+            config.link_requests += 1
+            parts = urlsplit(self.path)
+            host, _, path = parts.path.lstrip("/").partition("/")
+            url = f"https://{host}/{path}"
+            if path == "oembed":
+                url = (parse_qs(parts.query).get("url") or [""])[0]
+            time.sleep(config.link_latency)
+            if method == "HEAD" and any(host.endswith(site) for site in config.head_refused):
+                status = 405
+            elif link_is_dead(url, config.link_dead_rate):
+                status = 400 if path == "oembed" else 404
+            else:
+                status = 200
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            self._link("GET")
+
+        def do_HEAD(self):
+            self._link("HEAD")
+
+    return ServiceStubHandler
+
+
+def start_in_thread(config, host="127.0.0.1", port=0):
+    """Starts all three stubs on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_service_handler(config))
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Notion + LeetCode + Gemini stubs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--topics", type=int, default=100, help="Topics listed on the Notion page")
+    parser.add_argument("--problems", type=int, default=1000, help="Problems in the LeetCode catalog")
+    parser.add_argument("--latency", type=float, default=0.2, help="Gemini seconds per response")
+    args = parser.parse_args()
+
+    config = ServiceConfig([f"Stub Topic {i}" for i in range(args.topics)], args.problems,
+                           latency=args.latency, jitter=args.latency / 4)
+    server = ThreadingHTTPServer((args.host, args.port), make_service_handler(config))
+    print(f"Service stubs listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
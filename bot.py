@@ -2,80 +2,232 @@
 import os
 import logging
 import asyncio
+import time
 from dotenv import load_dotenv
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 # Correctly read the interval in hours and convert to minutes for the task
 UPDATE_INTERVAL_HOURS = int(os.getenv("UPDATE_INTERVAL_HOURS", "24"))
+# How often to stat() the data files for changes made outside this process
+DATA_WATCH_SECONDS = int(os.getenv("DATA_WATCH_SECONDS", "30"))
+# Sharding: SHARD_COUNT=0 runs one unsharded bot. Otherwise this process runs
+# the SHARD_IDS shards (all of them if unset) out of SHARD_COUNT; launcher.py
+# sets both for each worker it spawns.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))
+SHARD_IDS = [int(s) for s in os.getenv("SHARD_IDS", "").split(",") if s.strip()]
+# "embedded": one bot process (elected by lease) runs the updater.
+# "external": `python -m utils.data_updater` runs it; the bot only consumes new generations.
+UPDATER_MODE = os.getenv("UPDATER_MODE", "embedded")
+# Every command is also a slash command. With MESSAGE_CONTENT_INTENT=0 Discord
+# stops sending us the text of ordinary messages; "!" commands then only work
+# in DMs and when the bot is mentioned ("@DSA Master dsa heap").
+MESSAGE_CONTENT_INTENT = os.getenv("MESSAGE_CONTENT_INTENT", "1") == "1"
+# Register the slash commands with Discord at startup (done by the process running shard 0)
+SYNC_COMMANDS = os.getenv("SYNC_COMMANDS", "1") == "1"
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)-8s %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
 intents = discord.Intents.default()
-intents.message_content = True
+intents.message_content = MESSAGE_CONTENT_INTENT
+prefix = commands.when_mentioned_or("!")
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+if SHARD_COUNT:
+    bot = commands.AutoShardedBot(command_prefix=prefix, intents=intents, shard_count=SHARD_COUNT,
+                                  shard_ids=SHARD_IDS or None)
+else:
+    bot = commands.Bot(command_prefix=prefix, intents=intents)
+
+async def sync_slash_commands():
+    # Global registration is rate limited by Discord, so one process does it
+    if not SYNC_COMMANDS or (SHARD_IDS and 0 not in SHARD_IDS):
+        return
+    try:
+        synced = await bot.tree.sync()
+        logging.info(f"Registered {len(synced)} slash commands")
+    except discord.HTTPException as e:
+        logging.error(f"Failed to register slash commands: {e}")
+
+async def setup_hook():
+    # One persistent handler serves the page buttons of every !dsa code view
+    bot.add_view(code_view.CodePager(dsa.page_embed))
+    await sync_slash_commands()
+
+bot.setup_hook = setup_hook
 
 @bot.event
 async def on_ready():
     logging.info(f"Logged in as {bot.user} (id: {bot.user.id})")
     logging.info("DSA Master Bot is now online and ready.")
-    # Start the periodic update task only after the bot is ready
-    if not periodic_update.is_running():
-        periodic_update.start()
+    # Start the periodic update task only after the bot is ready. Its first
+    # run is the initial sync; commands are served from the seed data or the
+    # last published generation meanwhile, and finished topics appear as they land.
+    if SHARD_COUNT:
+        logging.info(f"Running shards {sorted(bot.shards)} of {SHARD_COUNT}")
+    # With several processes sharing data/, only the lease holder runs the
+    # updater; the others serve whatever it publishes via the file watcher.
+    if UPDATER_MODE == "external":
+        logging.info("Consumer mode: the standalone updater publishes data; watching for new generations only.")
+    elif updater_lease.try_acquire():
+        if not periodic_update.is_running():
+            periodic_update.start()
+    else:
+        logging.info(f"Data updater runs in another process (pid {updater_lease.holder()}); watching for new data only.")
+    if not watch_data_files.is_running():
+        watch_data_files.start()
+
+# Every command passes the per-user/channel/guild limits before its handler runs
+@bot.check
+async def throttle_commands(ctx):
+    return throttle.check(ctx)
 
-# --- Command definitions remain the same ---
-@bot.command(name="dsa")
+@bot.event
+async def on_command_error(ctx, error):
+    if isinstance(error, Throttled):
+        # Cheap reply, at most one per user per window, and it cleans itself up.
+        # Slash commands always need an answer, so they get a private one.
+        if ctx.interaction or throttle.should_notify(ctx.author.id):
+            await ctx.send(f"⏳ Slow down, {ctx.author.mention} — try again in {max(1, round(error.retry_after))}s.",
+                           delete_after=5, ephemeral=True)
+        return
+    if isinstance(error, commands.CommandNotFound):
+        return
+    if isinstance(error, (commands.MissingPermissions, commands.NoPrivateMessage)):
+        await ctx.send("🔒 That command is for server admins.", delete_after=5, ephemeral=True)
+        return
+    logging.error(f"Command {ctx.command} failed: {error}", exc_info=error)
+    if ctx.interaction and not ctx.interaction.response.is_done():
+        await ctx.send("❌ Something went wrong. Please try again!", ephemeral=True)
+
+# Per-command latency and outcome; after_invoke runs whether or not the handler raised
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def record_command_metrics(ctx):
+    name = ctx.command.qualified_name
+    metrics.command_seconds.observe(time.perf_counter() - ctx.started_at, name)
+    metrics.commands_total.inc(name, "error" if ctx.command_failed else "ok")
+
+# --- Command definitions: each works as !name and as /name ---
+@bot.hybrid_command(name="dsa", description="Get detailed info about a DSA topic")
+@app_commands.describe(topic="Topic name, e.g. segment tree")
 async def dsa_command(ctx, *, topic: str):
     await dsa.handle_dsa(ctx, topic)
 
-@bot.command(name="resources")
+@bot.hybrid_command(name="resources", description="Get learning resources for a topic")
+@app_commands.describe(topic="Topic name, e.g. dijkstra")
 async def resources_command(ctx, *, topic: str):
     await resources.handle_resources(ctx, topic)
 
-@bot.command(name="challenge")
-async def challenge_command(ctx):
-    await challenge.handle_challenge(ctx)
+# Suggestions while typing, answered from the in-memory prefix trie
+@dsa_command.autocomplete("topic")
+async def dsa_topic_autocomplete(interaction, current: str):
+    return await autocomplete.dsa_topic(interaction, current)
+
+@resources_command.autocomplete("topic")
+async def resources_topic_autocomplete(interaction, current: str):
+    return await autocomplete.resources_topic(interaction, current)
+
+@bot.hybrid_command(name="search", description="Find topics whose description or code mentions your words")
+@app_commands.describe(query="Words to look for, e.g. shortest path negative weights")
+async def search_command(ctx, *, query: str):
+    await search.handle_search(ctx, query)
 
-@bot.command(name="help_dsa")
+@bot.hybrid_command(name="challenge", description="Get a random LeetCode problem, optionally filtered")
+@app_commands.describe(filters="Any of easy/medium/hard, a topic or tag, and a minimum acceptance like 40%")
+async def challenge_command(ctx, *, filters: str = ""):
+    await challenge.handle_challenge(ctx, filters)
+
+@bot.hybrid_command(name="solved", description="Mark your last challenge (or any LeetCode problem) solved")
+@app_commands.describe(problem="Problem link or title; leave empty for your last !challenge")
+async def solved_command(ctx, *, problem: str = ""):
+    await progress.handle_solved(ctx, problem)
+
+@bot.hybrid_command(name="progress", description="Your solved count, streak and top tags on this server")
+async def progress_command(ctx):
+    await progress.handle_progress(ctx)
+
+@bot.hybrid_command(name="status", description="Show data freshness and sync progress")
+async def status_command(ctx):
+    await status.handle_status(ctx)
+
+@bot.hybrid_command(name="stats", description="Latency, cache and API metrics (server admins)")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+@app_commands.default_permissions(manage_guild=True)
+async def stats_command(ctx):
+    await stats.handle_stats(ctx)
+
+@bot.hybrid_command(name="help_dsa", description="List the bot's commands")
 async def help_command(ctx):
-    embed = discord.Embed(title="DSA Master Bot Commands", color=0x3498DB)
+    embed = discord.Embed(title="DSA Master Bot Commands", color=0x3498DB,
+                          description="Every command also works as a slash command, e.g. `/dsa`.")
     embed.add_field(name="!dsa <topic>", value="Get detailed info about a DSA topic", inline=False)
     embed.add_field(name="!resources <topic>", value="Get learning resources for a topic", inline=False)
-    embed.add_field(name="!challenge", value="Get a random LeetCode problem", inline=False)
+    embed.add_field(name="!search <words>", value="Find topics whose description or code mentions your words", inline=False)
+    embed.add_field(name="!status", value="Show data freshness and sync progress", inline=False)
+    embed.add_field(name="!challenge [easy|medium|hard] [tag] [min-ac%]", value="Get a random LeetCode problem, optionally filtered", inline=False)
+    embed.add_field(name="!solved [problem]", value="Mark your last challenge (or any LeetCode problem) solved", inline=False)
+    embed.add_field(name="!progress", value="Your solved count, streak and top tags on this server", inline=False)
+    embed.add_field(name="!stats", value="Latency, cache and API metrics (server admins)", inline=False)
     await ctx.send(embed=embed)
 
 # --- Task loop and main execution block ---
-async def run_update_in_executor(force=False):
-    loop = asyncio.get_running_loop()
-    # Use run_in_executor to run the blocking update function
-    await loop.run_in_executor(None, update_all_data, force)
-
 # Run the task every N hours as defined in your environment
 @tasks.loop(hours=UPDATE_INTERVAL_HOURS)
 async def periodic_update():
     logging.info("Periodic update check started.")
     try:
-        await run_update_in_executor()
+        # Network I/O is async on the bot's loop; only disk writes and index builds use threads
+        await update_all_data()
         logging.info("Periodic update check finished.")
     except Exception as e:
         logging.error(f"Periodic update failed: {e}")
 
+# Pick up data files rewritten by another process (or by hand) without a restart
+@tasks.loop(seconds=DATA_WATCH_SECONDS)
+async def watch_data_files():
+    # Take over the updater if its previous leader has exited
+    if UPDATER_MODE != "external" and not periodic_update.is_running() and updater_lease.try_acquire():
+        periodic_update.start()
+    try:
+        await asyncio.to_thread(topic_store.refresh_if_changed)
+        await asyncio.to_thread(problem_catalog.refresh_if_changed)
+    except Exception as e:
+        logging.error(f"Data file watch failed: {e}")
+
 async def main():
-    # Perform the initial data update only if necessary
-    logging.info("Performing initial data check before starting the bot...")
-    from utils.data_updater import update_all_data
-    # On the first run, force an update if data doesn't exist.
-    update_all_data(force_update=not os.path.exists("data/dsa_topics.json"))
-    logging.info("Initial data check completed.")
+    # Load whatever is on disk (last generation or the bundled seed) and log in
+    # straight away; the initial sync runs in the background from on_ready.
+    topic_store.load()
+    problem_catalog.load()
+    if not topic_store.current().ready:
+        logging.warning("No topic data on disk yet; commands will say so until the first sync publishes topics.")
 
-    async with bot:
-        await bot.start(TOKEN)
+    metrics_runner = await metrics.start_server()
+    try:
+        async with bot:
+            await bot.start(TOKEN)
+    finally:
+        # Commit challenge progress still queued for its batch
+        await get_store().close()
+        await http_client.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
 
 if __name__ == "__main__":
-    from commands import dsa, resources, challenge
+    from commands import dsa, resources, search, challenge, progress, status, stats, autocomplete, code_view
     from utils.data_updater import update_all_data
+    from utils import topic_store, problem_catalog
+    from utils.http_client import client as http_client
+    from utils.progress_store import get_store
+    from utils.throttle import throttle, Throttled
+    from utils.leader import updater_lease
+    from utils import metrics
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,44 @@
+# commands/autocomplete.py
+import time
+from discord import app_commands
+from utils import topic_store
+from utils import metrics
+from utils.prefix_trie import MAX_CHOICES
+
+autocomplete_seconds = metrics.Histogram("autocomplete_seconds", "Time to answer one slash command autocomplete",
+                                         ("option",))
+
+def topic_choices(snapshot, current, resources_only=False):
+    """
+    Up to 25 (title, key) pairs for what the user has typed so far: prefix
+    matches from the snapshot's trie, or fuzzy suggestions if it's a typo.
+    """
+    index = snapshot.index
+    if not current.strip():
+        keys = index.keys[:MAX_CHOICES * 2]
+    else:
+        keys = snapshot.completions.complete(current) or index.suggest(current, n=5)
+    if resources_only:
+        keys = [k for k in keys if k in snapshot.resources]
+    # Choice names are capped at 100 characters by Discord
+    return [(index.titles[key][:100], key) for key in keys[:MAX_CHOICES]]
+
+async def _autocomplete(option, current, resources_only=False):
+    # Answered from memory: Discord drops autocomplete responses after 3 seconds
+    started = time.perf_counter()
+    choices = topic_choices(topic_store.current(), current, resources_only)
+    autocomplete_seconds.observe(time.perf_counter() - started, option)
+    return [app_commands.Choice(name=name, value=key) for name, key in choices]
+
+async def dsa_topic(interaction, current: str):
+    return await _autocomplete("dsa", current)
+
+async def resources_topic(interaction, current: str):
+    return await _autocomplete("resources", current, resources_only=True)
+
+def _build(snapshot):
+    # Same policy as !search: complete snapshots get their trie while being published
+    if not snapshot.partial:
+        snapshot.completions
+
+topic_store.subscribe(_build)
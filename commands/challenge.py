@@ -1,62 +1,143 @@
 # commands/challenge.py
+import logging
+import math
 import discord
-import asyncio
+from utils import problem_catalog, topic_store
+from utils.progress_store import get_store
+from commands.progress import owner
 from utils.data_updater import get_random_leetcode_problem
 
-async def handle_challenge(ctx):
+DIFFICULTY_WORDS = {"easy": "Easy", "medium": "Medium", "med": "Medium", "hard": "Hard"}
+
+def _acceptance(word):
+    """A minimum acceptance percentage like '40%' or '55.5', or None if the word isn't one."""
+    try:
+        value = float(word.rstrip("%"))
+    except ValueError:
+        return None
+    # Words like 'inf', 'nan' or '1e400' parse as floats but aren't percentages
+    return value if math.isfinite(value) and 0 <= value <= 100 else None
+
+def parse_filters(catalog, text):
+    """
+    Splits '!challenge medium graphs 40%' into (difficulty, tag, min_ac, unknown).
+    The tag may be a LeetCode tag or any topic name !dsa understands.
+    """
+    difficulty = None
+    min_ac = None
+    words = []
+    for word in (text or "").split():
+        lowered = word.lower()
+        if lowered in DIFFICULTY_WORDS and difficulty is None:
+            difficulty = DIFFICULTY_WORDS[lowered]
+            continue
+        threshold = _acceptance(lowered)
+        if threshold is not None:
+            min_ac = threshold
+        else:
+            words.append(word)
+
+    if not words:
+        return difficulty, None, min_ac, None
+
+    query = " ".join(words)
+    tag = catalog.resolve_tag(query)
+    if not tag:
+        snapshot = topic_store.current()
+        key = snapshot.index.resolve(query)
+        if key:
+            tag = catalog.tag_for_topic(key, snapshot.dsa.get(key))
+    return difficulty, tag, min_ac, None if tag else query
+
+async def handle_challenge(ctx, filters: str = ""):
+    catalog = problem_catalog.current()
+    if catalog.rows:
+        # Served from the local catalog; only hit LeetCode if it hasn't been downloaded yet
+        difficulty, tag, min_ac, unknown = parse_filters(catalog, filters)
+        if unknown:
+            await ctx.send(f"❌ Unknown topic or tag **{unknown}**. Try something like `!challenge medium graph 40%`.")
+            return
+        progress = get_store()
+        guild_id, user_id = owner(ctx)
+        # Problems this user has already been given are skipped until none are left
+        seen = await progress.seen(guild_id, user_id, catalog)
+        problem = catalog.pick(difficulty, tag, min_ac, exclude=seen)
+        repeat = problem is None and bool(seen)
+        if repeat:
+            problem = catalog.pick(difficulty, tag, min_ac)
+        if not problem:
+            await ctx.send("❌ No free problems match those filters — try loosening them.")
+            return
+        progress.served(guild_id, user_id, problem["slug"], problem["tags"])
+        embed = build_challenge_embed(problem)
+        if repeat:
+            embed.set_footer(text="You've been given every problem matching these filters, so this one is a repeat. "
+                                  "Use !solved when you finish it.")
+        await ctx.send(embed=embed)
+        return
+
     # Show loading message
     loading_msg = await ctx.send("🎯 Fetching a random LeetCode problem...")
     
     try:
-        # Get problem in a separate thread to avoid blocking
-        loop = asyncio.get_event_loop()
-        problem = await loop.run_in_executor(None, get_random_leetcode_problem)
+        problem = await get_random_leetcode_problem()
         
         if not problem:
             await loading_msg.edit(content="❌ Couldn't fetch LeetCode problem right now — try again later.")
             return
 
-        # Create embed
-        difficulty_colors = {
-            "Easy": 0x00B74A,    # Green
-            "Medium": 0xFFB800,   # Orange  
-            "Hard": 0xFF2D55      # Red
-        }
-        
-        difficulty = problem.get('difficulty', 'Unknown')
-        color = difficulty_colors.get(difficulty, 0x007ACC)
-        
-        embed = discord.Embed(
-            title=f"🎯 {problem['title']}", 
-            description=f"**Difficulty:** {difficulty}",
-            color=color,
-            url=problem['url']
-        )
+        get_store().served(*owner(ctx), problem["slug"])
+        await loading_msg.edit(content="", embed=build_challenge_embed(problem))
         
+    except Exception as e:
+        await loading_msg.edit(content="❌ Something went wrong while fetching the problem. Please try again!")
+        logging.error(f"Challenge command error: {e}")
+
+def build_challenge_embed(problem):
+    # Create embed
+    difficulty_colors = {
+        "Easy": 0x00B74A,    # Green
+        "Medium": 0xFFB800,   # Orange  
+        "Hard": 0xFF2D55      # Red
+    }
+    
+    difficulty = problem.get('difficulty', 'Unknown')
+    color = difficulty_colors.get(difficulty, 0x007ACC)
+    
+    description = f"**Difficulty:** {difficulty}"
+    if problem.get('ac_rate'):
+        description += f" · **Acceptance:** {problem['ac_rate']:.1f}%"
+    
+    embed = discord.Embed(
+        title=f"🎯 {problem['title']}", 
+        description=description,
+        color=color,
+        url=problem['url']
+    )
+    
+    embed.add_field(
+        name="🔗 Solve Now", 
+        value=f"[Click here to solve on LeetCode]({problem['url']})", 
+        inline=False
+    )
+    
+    # Add difficulty-based encouragement
+    encouragements = {
+        "Easy": "Great for warming up! 🚀",
+        "Medium": "Perfect for skill building! 💪",
+        "Hard": "Challenge mode activated! 🔥"
+    }
+    
+    if difficulty in encouragements:
         embed.add_field(
-            name="🔗 Solve Now", 
-            value=f"[Click here to solve on LeetCode]({problem['url']})", 
+            name="💡 Tip", 
+            value=encouragements[difficulty], 
             inline=False
         )
-        
-        # Add difficulty-based encouragement
-        encouragements = {
-            "Easy": "Great for warming up! 🚀",
-            "Medium": "Perfect for skill building! 💪",
-            "Hard": "Challenge mode activated! 🔥"
-        }
-        
-        if difficulty in encouragements:
-            embed.add_field(
-                name="💡 Tip", 
-                value=encouragements[difficulty], 
-                inline=False
-            )
-        
-        embed.set_footer(text="Good luck! Use !challenge for another problem.")
-        
-        await loading_msg.edit(content="", embed=embed)
-        
-    except Exception as e:
-        await loading_msg.edit(content="❌ Something went wrong while fetching the problem. Please try again!")
-        print(f"Challenge command error: {e}")
\ No newline at end of file
+    
+    if problem.get('tags'):
+        embed.add_field(name="🏷️ Tags", value=", ".join(problem['tags'][:6]), inline=False)
+    
+    embed.set_footer(text="Good luck! Use !solved when you finish it, or !challenge [easy|medium|hard] [tag] [min-ac%] "
+                          "for another problem.")
+    return embed
@@ -0,0 +1,157 @@
+# commands/code_view.py
+import io
+import logging
+import os
+from collections import OrderedDict
+import discord
+from utils import topic_store
+from utils import metrics
+from utils.render_cache import RenderCache
+
+# A page goes inside ```cpp fences in one embed field (1024 characters)
+CODE_PAGE_CHARS = 1000
+# Open paginators remembered; the least recently used one expires past this
+CODE_VIEWS_MAX = int(os.getenv("CODE_VIEWS_MAX", "5000"))
+CODE_FIELD = "💻 C++ Implementation"
+
+def split_code(code, limit=CODE_PAGE_CHARS):
+    """Splits code into pages of at most limit characters, at line boundaries where possible."""
+    pages = []
+    page = ""
+    for line in code.strip("\n").splitlines(keepends=True):
+        # A single line longer than a page is the only thing split mid-line
+        while len(line) > limit:
+            if page:
+                pages.append(page)
+                page = ""
+            pages.append(line[:limit])
+            line = line[limit:]
+        if len(page) + len(line) > limit:
+            pages.append(page)
+            page = ""
+        page += line
+    if page.strip():
+        pages.append(page)
+    return [p.rstrip("\n") for p in pages]
+
+# Pages are a pure function of the entry, so they are split once per snapshot
+_pages = RenderCache("code pages", lambda snapshot, key: split_code(snapshot.dsa[key].get("code") or ""))
+
+def code_pages(snapshot, key):
+    return _pages.get(snapshot, key)
+
+def code_field(pages, page):
+    """(name, value) of the embed field showing one page of code."""
+    name = CODE_FIELD if len(pages) == 1 else f"{CODE_FIELD} · page {page + 1}/{len(pages)}"
+    return name, f"```cpp\n{pages[page]}\n```"
+
+
+class ViewState:
+    __slots__ = ("key", "page", "author_id")
+
+    def __init__(self, key, page, author_id):
+        self.key = key
+        self.page = page
+        self.author_id = author_id
+
+
+class ViewStates:
+    """message id -> ViewState for open paginators, bounded like KeyedLimiter."""
+
+    def __init__(self, max_views=CODE_VIEWS_MAX):
+        self.max_views = max_views
+        self._states = OrderedDict()
+
+    def open(self, message_id, key, author_id):
+        self._states[message_id] = ViewState(key, 0, author_id)
+        self._states.move_to_end(message_id)
+        if len(self._states) > self.max_views:
+            self._states.popitem(last=False)
+
+    def get(self, message_id):
+        state = self._states.get(message_id)
+        if state is not None:
+            self._states.move_to_end(message_id)
+        return state
+
+    def __len__(self):
+        return len(self._states)
+
+views = ViewStates()
+metrics.Callback("code_views_open", "Code paginators whose buttons still work", lambda: len(views))
+
+def controls(page, count):
+    """
+    Buttons for a message showing page `page` of `count`. The view is
+    stopped before it is sent so discord.py doesn't keep a copy per message;
+    clicks are handled by the one CodePager registered at startup.
+    """
+    view = discord.ui.View(timeout=None)
+    view.add_item(discord.ui.Button(label="◀", style=discord.ButtonStyle.secondary, custom_id="code:prev",
+                                    disabled=page == 0))
+    view.add_item(discord.ui.Button(label=f"{page + 1}/{count}", style=discord.ButtonStyle.secondary,
+                                    custom_id="code:page", disabled=True))
+    view.add_item(discord.ui.Button(label="▶", style=discord.ButtonStyle.secondary, custom_id="code:next",
+                                    disabled=page >= count - 1))
+    view.add_item(discord.ui.Button(label="📎 .cpp file", style=discord.ButtonStyle.primary, custom_id="code:file"))
+    view.stop()
+    return view
+
+def remember(message, key, author_id):
+    """Starts tracking a sent paginator so its buttons know what they page through."""
+    if message is not None:
+        views.open(message.id, key, author_id)
+
+
+class CodePager(discord.ui.View):
+    """
+    Persistent handler for every paginator's buttons. page_embed(snapshot,
+    key, page) renders the !dsa embed showing one page of code.
+    """
+
+    def __init__(self, page_embed):
+        super().__init__(timeout=None)
+        self.page_embed = page_embed
+
+    async def _turn(self, interaction, step):
+        state = views.get(interaction.message.id)
+        if state is None:
+            await interaction.response.send_message("⌛ This code view has expired — run `/dsa` again.",
+                                                    ephemeral=True)
+            return
+        if interaction.user.id != state.author_id:
+            await interaction.response.send_message("Only the person who asked can turn these pages. "
+                                                    "Use 📎 to get the whole file.", ephemeral=True)
+            return
+        snapshot = topic_store.current()
+        if state.key not in snapshot.dsa:
+            await interaction.response.send_message("❌ That topic is no longer listed.", ephemeral=True)
+            return
+        pages = code_pages(snapshot, state.key)
+        # The code may have been regenerated (and repaginated) since the view opened
+        state.page = max(0, min(len(pages) - 1, state.page + step))
+        await interaction.response.edit_message(embed=self.page_embed(snapshot, state.key, state.page),
+                                                view=controls(state.page, len(pages)))
+
+    @discord.ui.button(label="◀", custom_id="code:prev")
+    async def previous_page(self, interaction, button):
+        await self._turn(interaction, -1)
+
+    @discord.ui.button(label="▶", custom_id="code:next")
+    async def next_page(self, interaction, button):
+        await self._turn(interaction, 1)
+
+    @discord.ui.button(label="📎 .cpp file", custom_id="code:file")
+    async def code_file(self, interaction, button):
+        state = views.get(interaction.message.id)
+        snapshot = topic_store.current()
+        if state is None or state.key not in snapshot.dsa:
+            await interaction.response.send_message("⌛ This code view has expired — run `/dsa` again.",
+                                                    ephemeral=True)
+            return
+        code = snapshot.dsa[state.key].get("code") or ""
+        try:
+            await interaction.response.send_message(
+                file=discord.File(io.BytesIO(code.encode("utf-8")), filename=f"{state.key}.cpp"), ephemeral=True)
+        except discord.HTTPException as e:
+            logging.error(f"Failed to attach code for {state.key}: {e}")
@@ -1,57 +1,24 @@
 # commands/dsa.py
-import json
-import os
+import copy
 import discord
-from difflib import get_close_matches
-
-DATA_FILE = "data/dsa_topics.json"
+from utils import topic_store, problem_catalog
+from utils.render_cache import RenderCache
+from commands import code_view
 
 async def handle_dsa(ctx, topic: str):
-    if not os.path.exists(DATA_FILE):
+    snapshot = topic_store.current()
+    db = snapshot.dsa
+    if not db:
         await ctx.send("⏳ Data not ready yet — please wait while the bot finishes initial sync.")
         return
 
-    try:
-        with open(DATA_FILE, "r", encoding='utf-8') as f:
-            db = json.load(f)
-    except Exception as e:
-        await ctx.send("❌ Error loading data. Please try again later.")
-        return
-
-    # Normalize the input topic
-    key = topic.lower().replace(" ", "").replace("-", "").replace("_", "")
-    
-    # Try exact match first
-    found_key = None
-    if key in db:
-        found_key = key
-    else:
-        # Try fuzzy matching with original keys
-        all_keys = list(db.keys())
-        # Create a mapping of normalized keys to original keys
-        normalized_map = {k.lower().replace(" ", "").replace("-", "").replace("_", ""): k for k in all_keys}
-        
-        if key in normalized_map:
-            found_key = normalized_map[key]
-        else:
-            # Try substring matching
-            matches = [k for k in all_keys if topic.lower() in k.lower() or k.lower() in topic.lower()]
-            if matches:
-                found_key = matches[0]
-            else:
-                # Try close matches
-                close_matches = get_close_matches(topic.lower(), [k.lower() for k in all_keys], n=1, cutoff=0.6)
-                if close_matches:
-                    # Find the original key
-                    for orig_key in all_keys:
-                        if orig_key.lower() == close_matches[0]:
-                            found_key = orig_key
-                            break
+    found_key = snapshot.index.resolve(topic)
+    if found_key not in db:
+        found_key = None
 
     if not found_key:
         # Suggest similar topics
-        all_titles = [db[k].get("title", k) for k in db.keys()]
-        suggestions = get_close_matches(topic, all_titles, n=3, cutoff=0.4)
+        suggestions = [db[k].get("title", k) for k in snapshot.index.suggest(topic) if k in db]
         
         embed = discord.Embed(
             title="❌ Topic Not Found", 
@@ -75,8 +42,18 @@ async def handle_dsa(ctx, topic: str):
         await ctx.send(embed=embed)
         return
 
-    info = db[found_key]
-    title = info.get("title", topic)
+    embed = _embeds.get(snapshot, found_key)
+    pages = code_view.code_pages(snapshot, found_key)
+    if len(pages) > 1:
+        message = await ctx.send(embed=embed, view=code_view.controls(0, len(pages)))
+        code_view.remember(message, found_key, ctx.author.id)
+    else:
+        await ctx.send(embed=embed)
+
+def build_dsa_embed(snapshot, key):
+    """The !dsa response for a topic; built once per snapshot by the render cache."""
+    info = snapshot.dsa[key]
+    title = info.get("title", key)
     
     embed = discord.Embed(
         title=f"📚 {title}", 
@@ -94,13 +71,11 @@ async def handle_dsa(ctx, topic: str):
     if space_complexity and space_complexity != "N/A":
         embed.add_field(name="💾 Space Complexity", value=space_complexity, inline=True)
 
-    # Add code snippet
-    code = info.get("code", "")
-    if code and len(code.strip()) > 0:
-        if len(code) < 1000:
-            embed.add_field(name="💻 C++ Implementation", value=f"```cpp\n{code[:800]}\n```", inline=False)
-        else:
-            embed.add_field(name="💻 C++ Implementation", value="Code is too long — check the resources below!", inline=False)
+    # Add code snippet: the first page, with buttons for the rest (see handle_dsa)
+    pages = code_view.code_pages(snapshot, key)
+    if pages:
+        name, value = code_view.code_field(pages, 0)
+        embed.add_field(name=name, value=value, inline=False)
 
     # Add resources
     links = info.get("links", [])
@@ -109,7 +84,42 @@ async def handle_dsa(ctx, topic: str):
         resource_text = "\n".join(f"🔗 [{title}]({url})" for title, url in links[:3])
         embed.add_field(name="📖 Learning Resources", value=resource_text, inline=False)
 
-    # Add footer
-    embed.set_footer(text="Use !resources <topic> for more learning materials")
+    # Practice problems from the local LeetCode catalog
+    catalog = problem_catalog.current()
+    tag = catalog.tag_for_topic(key, info) if catalog.rows else None
+    if tag:
+        practice = catalog.sample(tag)
+        if practice:
+            practice_text = "\n".join(f"🧩 [{p['title']}]({p['url']}) · {p['difficulty']}" for p in practice)
+            embed.add_field(name="🧩 Practice Problems", value=practice_text, inline=False)
+
+    # Add footer, led by the Notion section the topic is listed under
+    footer = "Use !resources <topic> for more learning materials"
+    if info.get("category"):
+        footer = f"{info['category']} · {footer}"
+    embed.set_footer(text=footer)
+    return embed
+
+def page_embed(snapshot, key, page):
+    """The !dsa embed with its code field turned to another page."""
+    # Embed.copy() shares the field dicts with the cached embed, so copy deeply
+    embed = discord.Embed.from_dict(copy.deepcopy(_embeds.get(snapshot, key).to_dict()))
+    pages = code_view.code_pages(snapshot, key)
+    for i, field in enumerate(embed.fields):
+        if field.name.startswith(code_view.CODE_FIELD):
+            name, value = code_view.code_field(pages, page)
+            embed.set_field_at(i, name=name, value=value, inline=False)
+            break
+    return embed
+
+# Practice problems come from the catalog, so a new catalog also invalidates the cache
+_embeds = RenderCache("!dsa", build_dsa_embed, version=lambda: id(problem_catalog.current()))
+
+def _warm(snapshot):
+    # Partial snapshots published mid-sync are rendered lazily. So are mapped
+    # generations: every embed carries a page of code, and warming them all
+    # would read the whole of code.bin back onto the heap
+    if not snapshot.partial and not snapshot.mapped:
+        _embeds.warm(snapshot, snapshot.dsa)
 
-    await ctx.send(embed=embed)
\ No newline at end of file
+topic_store.subscribe(_warm)
\ No newline at end of file
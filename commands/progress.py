@@ -0,0 +1,73 @@
+# commands/progress.py
+import discord
+from utils import problem_catalog
+from utils.progress_store import get_store
+
+def owner(ctx):
+    """(guild id, user id) progress is kept under; DMs count as guild 0."""
+    return (ctx.guild.id if ctx.guild else 0), ctx.author.id
+
+async def handle_solved(ctx, problem: str = ""):
+    catalog = problem_catalog.current()
+    progress = get_store()
+    guild_id, user_id = owner(ctx)
+
+    tags = ()
+    if problem.strip():
+        row = catalog.find(problem)
+        if row is None:
+            await ctx.send(f"❌ Couldn't find **{problem}** in the LeetCode catalog. "
+                           "Paste its link or title, or run `!solved` alone for your last challenge.")
+            return
+        info = catalog.problem(row)
+        slug, title, tags = info["slug"], info["title"], info["tags"]
+    else:
+        slug = await progress.last_served(guild_id, user_id)
+        if not slug:
+            await ctx.send("❌ You haven't been given a problem yet — try `!challenge` first.")
+            return
+        row = catalog.by_slug.get(slug)
+        info = catalog.problem(row) if row is not None else None
+        title = info["title"] if info else slug.replace("-", " ").title()
+        tags = info["tags"] if info else ()
+
+    result = await progress.solved(guild_id, user_id, slug, tags)
+    if not result["new"]:
+        await ctx.send(f"☑️ **{title}** was already marked solved. {result['solved']} solved in total.")
+        return
+    await ctx.send(f"✅ Marked **{title}** solved — {result['solved']} solved in total, "
+                   f"🔥 {result['streak']}-day streak (best {result['best_streak']}).")
+
+async def handle_progress(ctx):
+    catalog = problem_catalog.current()
+    progress = get_store()
+    guild_id, user_id = owner(ctx)
+    summary = await progress.summary(guild_id, user_id)
+
+    if not summary["served"] and not summary["solved"]:
+        await ctx.send("📭 No progress yet — `!challenge` gives you a problem and `!solved` marks it done.")
+        return
+
+    embed = discord.Embed(title=f"📈 Progress for {ctx.author.display_name}", color=0x9B59B6)
+    totals = f"**{summary['solved']}** solved · {summary['served']} challenges served"
+    if catalog.rows:
+        seen = (await progress.seen(guild_id, user_id, catalog) & catalog.free_bits).bit_count()
+        totals += f"\nSeen {seen} of {len(catalog.free)} free problems"
+    embed.add_field(name="🎯 Totals", value=totals, inline=False)
+    streak = summary["streak"]
+    embed.add_field(name="🔥 Streak", value=f"{streak} day{'' if streak == 1 else 's'} (best {summary['best_streak']})",
+                    inline=False)
+
+    if summary["tags"]:
+        lines = [f"• {tag.replace('-', ' ').title()}: {solved} solved of {served}" for tag, served, solved in summary["tags"]]
+        embed.add_field(name="🏷️ Top Tags", value="\n".join(lines), inline=False)
+    if summary["recent"]:
+        lines = []
+        for slug in summary["recent"]:
+            row = catalog.by_slug.get(slug)
+            title = catalog.problem(row)["title"] if row is not None else slug.replace("-", " ").title()
+            lines.append(f"• [{title}](https://leetcode.com/problems/{slug}/)")
+        embed.add_field(name="✅ Recently Solved", value="\n".join(lines), inline=False)
+
+    embed.set_footer(text="Progress is kept per server. Streaks count days (UTC) with at least one solve.")
+    await ctx.send(embed=embed)
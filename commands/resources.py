@@ -1,54 +1,22 @@
 # commands/resources.py
-import json
-import os
 import discord
-from difflib import get_close_matches
-
-RES_FILE = "data/resources.json"
+from utils import topic_store
+from utils.render_cache import RenderCache
 
 async def handle_resources(ctx, topic: str):
-    if not os.path.exists(RES_FILE):
+    snapshot = topic_store.current()
+    res = snapshot.resources
+    if not res:
         await ctx.send("⏳ Resources not ready yet; initial sync running.")
         return
 
-    try:
-        with open(RES_FILE, "r", encoding='utf-8') as f:
-            res = json.load(f)
-    except Exception as e:
-        await ctx.send("❌ Error loading resources. Please try again later.")
-        return
-
-    # Normalize the input topic
-    key = topic.lower().replace(" ", "").replace("-", "").replace("_", "")
-    
-    # Try exact match first
-    found_key = None
-    if key in res:
-        found_key = key
-    else:
-        # Try fuzzy matching
-        all_keys = list(res.keys())
-        normalized_map = {k.lower().replace(" ", "").replace("-", "").replace("_", ""): k for k in all_keys}
-        
-        if key in normalized_map:
-            found_key = normalized_map[key]
-        else:
-            # Try substring matching
-            matches = [k for k in all_keys if topic.lower() in k.lower() or k.lower() in topic.lower()]
-            if matches:
-                found_key = matches[0]
-            else:
-                # Try close matches
-                close_matches = get_close_matches(topic.lower(), [k.lower() for k in all_keys], n=1, cutoff=0.6)
-                if close_matches:
-                    for orig_key in all_keys:
-                        if orig_key.lower() == close_matches[0]:
-                            found_key = orig_key
-                            break
+    found_key = snapshot.index.resolve(topic)
+    if found_key not in res:
+        found_key = None
 
     if not found_key:
         # Suggest similar topics
-        suggestions = get_close_matches(topic, list(res.keys()), n=3, cutoff=0.4)
+        suggestions = [k for k in snapshot.index.suggest(topic) if k in res]
         
         embed = discord.Embed(
             title="❌ Resources Not Found", 
@@ -78,8 +46,14 @@ async def handle_resources(ctx, topic: str):
         await ctx.send(f"❌ No resources available for **{topic}** yet.")
         return
 
+    await ctx.send(embed=_embeds.get(snapshot, found_key))
+
+def build_resources_embed(snapshot, key):
+    """The !resources response for a topic; built once per snapshot by the render cache."""
+    items = snapshot.resources[key]
+
     embed = discord.Embed(
-        title=f"📖 Resources for {found_key.replace('[]', '').replace('()', '').title()}", 
+        title=f"📖 Resources for {key.replace('[]', '').replace('()', '').title()}", 
         color=0x27AE60
     )
     
@@ -113,5 +87,19 @@ async def handle_resources(ctx, topic: str):
     total_resources = len(items)
     if total_resources > 8:
         embed.set_footer(text=f"Showing top resources ({total_resources} total available)")
-    
-    await ctx.send(embed=embed)
\ No newline at end of file
+    return embed
+
+_embeds = RenderCache("!resources", build_resources_embed)
+
+def _warm(snapshot):
+    # Partial snapshots published mid-sync are rendered lazily. Mapped
+    # generations decode every resource list to render, so that happens off
+    # the publishing thread
+    if snapshot.partial:
+        return
+    if snapshot.mapped:
+        _embeds.warm_in_background(snapshot, snapshot.resources)
+    else:
+        _embeds.warm(snapshot, [key for key, items in snapshot.resources.items() if items])
+
+topic_store.subscribe(_warm)
\ No newline at end of file
@@ -0,0 +1,38 @@
+# commands/search.py
+import discord
+from utils import topic_store
+from utils.search_index import snippet
+
+MAX_RESULTS = 5
+
+async def handle_search(ctx, query: str):
+    snapshot = topic_store.current()
+    if not snapshot.dsa:
+        await ctx.send("⏳ Data not ready yet — please wait while the bot finishes initial sync.")
+        return
+
+    results = snapshot.search.search(query, MAX_RESULTS)
+    if not results:
+        await ctx.send(embed=discord.Embed(
+            title="🔍 No Matches",
+            description=f"Nothing mentions **{query}**. Try fewer or more general words.",
+            color=0xE74C3C
+        ))
+        return
+
+    embed = discord.Embed(title=f"🔍 Results for \"{query[:100]}\"", color=0x2E86C1)
+    for key, _ in results:
+        # Only the handful of entries shown are decoded
+        info = snapshot.dsa[key]
+        title = info.get("title", key)
+        text = snippet(info, query) or "No description available."
+        embed.add_field(name=f"📚 {title}", value=f"{text}\n`!dsa {title}`"[:1024], inline=False)
+    await ctx.send(embed=embed)
+
+def _build(snapshot):
+    # Complete snapshots get their index while being published; partial ones
+    # published mid-sync only pay for it if someone searches
+    if not snapshot.partial:
+        snapshot.search
+
+topic_store.subscribe(_build)
@@ -0,0 +1,47 @@
+# commands/stats.py
+import discord
+from utils import metrics
+from utils import render_cache
+from utils.response_cache import get_cache
+from utils.throttle import throttle
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+def _hit_rate(hits, misses):
+    total = hits + misses
+    return f"{100 * hits / total:.0f}% of {total}" if total else "no lookups yet"
+
+async def handle_stats(ctx):
+    embed = discord.Embed(title="📈 DSA Master Bot Metrics", color=0x3498DB)
+
+    outcomes = metrics.commands_total.samples()
+    lines = []
+    for (name,) in sorted(metrics.command_seconds.series()):
+        s = metrics.command_seconds.summary(name)
+        failed = outcomes.get((name, "error"), 0)
+        lines.append(f"`!{name}` {s['count']} calls, p50 {_ms(s['p50'])}, p95 {_ms(s['p95'])}"
+                     + (f", {failed} failed" if failed else ""))
+    shed = sum(throttle.shed.values())
+    if shed:
+        lines.append(f"{shed} commands shed by rate limits")
+    embed.add_field(name="⌨️ Commands", value="\n".join(lines) or "No commands handled yet", inline=False)
+
+    cache_lines = [f"{cache.name}: {_hit_rate(cache.hits, cache.misses)}" for cache in render_cache.caches()]
+    ai_cache = get_cache()
+    cache_lines.append(f"AI responses: {_hit_rate(ai_cache.hits, ai_cache.misses)}")
+    embed.add_field(name="🗃️ Cache hit rates", value="\n".join(cache_lines), inline=False)
+
+    statuses = metrics.http_responses.samples()
+    http_lines = []
+    for (host,) in sorted(metrics.http_seconds.series()):
+        s = metrics.http_seconds.summary(host)
+        errors = sum(n for (h, status), n in statuses.items()
+                     if h == host and (status == "error" or int(status) >= 400))
+        codes = ", ".join(f"{status}×{n}" for (h, status), n in sorted(statuses.items(), key=str)
+                          if h == host and status != "200")
+        http_lines.append(f"`{host}` {s['count']} calls, p50 {_ms(s['p50'])}, p95 {_ms(s['p95'])}"
+                          + (f", {errors} errors ({codes})" if errors else ""))
+    embed.add_field(name="🌐 Outbound HTTP", value="\n".join(http_lines) or "No requests yet", inline=False)
+
+    await ctx.send(embed=embed)
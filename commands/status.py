@@ -0,0 +1,74 @@
+# commands/status.py
+import time
+import discord
+from utils import topic_store, problem_catalog
+from utils.sync_status import sync_status
+from utils.throttle import throttle
+from utils.leader import updater_lease
+from utils.data_updater import leetcode_requests
+
+def _ago(timestamp):
+    if not timestamp:
+        return "never"
+    minutes = int((time.time() - timestamp) / 60)
+    if minutes < 60:
+        return f"{minutes} min ago"
+    if minutes < 48 * 60:
+        return f"{minutes // 60} h ago"
+    return f"{minutes // 1440} days ago"
+
+def _progress_bar(done, total, width=20):
+    filled = int(width * done / total) if total else 0
+    return "█" * filled + "░" * (width - filled)
+
+async def handle_status(ctx):
+    snapshot = topic_store.current()
+    sync = sync_status.snapshot()
+    catalog = problem_catalog.current()
+
+    embed = discord.Embed(title="📊 DSA Master Bot Status", color=0x3498DB)
+
+    if snapshot.ready:
+        if snapshot.partial:
+            source = "the sync in progress"
+        elif snapshot.signature and snapshot.signature[0] == "manifest":
+            source = "generated data"
+        else:
+            source = "bundled seed data"
+        data_text = f"{len(snapshot.dsa)} topics from {source}\nLoaded {_ago(snapshot.loaded_at)} (snapshot #{snapshot.generation})"
+    else:
+        data_text = "No topic data loaded yet"
+    embed.add_field(name="📚 Topics", value=data_text, inline=False)
+
+    if not updater_lease.held:
+        sync_text = f"Handled by another process (pid {updater_lease.holder() or '?'}); new data is picked up automatically"
+    elif sync["running"]:
+        total = sync["total"]
+        sync_text = f"**{sync['phase'].capitalize()}** — started {_ago(sync['started_at'])}"
+        if total:
+            sync_text += f"\n`{_progress_bar(sync['done'], total)}` {sync['done']}/{total}"
+            if sync["failed"]:
+                sync_text += f" ({sync['failed']} failed)"
+        if sync["last_topic"]:
+            sync_text += f"\nLast finished: {sync['last_topic']}"
+    elif sync["finished_at"]:
+        outcome = "failed" if sync["last_error"] else ("published new data" if sync["last_result"] else "no changes")
+        sync_text = f"Idle — last sync {_ago(sync['finished_at'])} ({outcome})"
+    else:
+        sync_text = "Idle — no sync has run since startup"
+    embed.add_field(name="🔄 Sync", value=sync_text, inline=False)
+
+    if catalog.rows:
+        catalog_text = f"{len(catalog)} problems ({len(catalog.free)} free), fetched {_ago(catalog.fetched_at)}"
+    else:
+        catalog_text = "Not downloaded yet — !challenge asks LeetCode directly"
+    embed.add_field(name="🎯 LeetCode Catalog", value=catalog_text, inline=False)
+
+    load = throttle.stats()
+    shed = load["shed"]
+    load_text = (f"{load['allowed']} commands served, {sum(shed.values())} shed "
+                 f"(user {shed['user']}, channel {shed['channel']}, guild {shed['guild']})\n"
+                 f"{leetcode_requests.coalesced} LeetCode lookups coalesced into {leetcode_requests.calls} requests")
+    embed.add_field(name="🚦 Load", value=load_text, inline=False)
+
+    await ctx.send(embed=embed)
@@ -0,0 +1,117 @@
+# launcher.py
+"""
+Runs the bot as several shard processes. Each worker is `python bot.py` with
+SHARD_COUNT/SHARD_IDS set so it connects only its share of the shards; the
+workers share data/, where one of them (the holder of data/updater.lock)
+runs the updater and the rest pick up what it publishes. Crashed workers are
+restarted with backoff.
+
+    python launcher.py --workers 4 --shards 16
+"""
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)-8s %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot.py")
+RESTART_BACKOFF_MAX = 60.0
+# A worker up this long is healthy again; its next crash restarts it straight away
+STABLE_UPTIME_SECONDS = 300.0
+
+
+def shard_assignment(shards, workers):
+    """Round-robin shard ids per worker, e.g. 4 shards over 2 workers -> [[0, 2], [1, 3]]."""
+    return [[s for s in range(shards) if s % workers == i] for i in range(workers)]
+
+
+class Worker:
+    def __init__(self, number, shard_ids, shard_count, metrics_port):
+        self.number = number
+        self.shard_ids = shard_ids
+        self.env = dict(os.environ, SHARD_COUNT=str(shard_count), SHARD_IDS=",".join(map(str, shard_ids)))
+        # One metrics endpoint per worker
+        self.env["METRICS_PORT"] = str(metrics_port + number if metrics_port else 0)
+        self.process = None
+        self.restarts = 0
+        self.restart_at = 0.0
+        self.started_at = 0.0
+
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, BOT_SCRIPT], env=self.env)
+        self.started_at = time.monotonic()
+        logging.info(f"Worker {self.number} (shards {self.shard_ids}) started as pid {self.process.pid}")
+
+    def check(self, now):
+        """Restarts the worker if it exited, waiting longer after each crash in a row."""
+        if self.process is None:
+            if now >= self.restart_at:
+                self.start()
+            return
+        code = self.process.poll()
+        if code is None:
+            if self.restarts and now - self.started_at >= STABLE_UPTIME_SECONDS:
+                self.restarts = 0
+            return
+        delay = min(RESTART_BACKOFF_MAX, 2 ** self.restarts)
+        self.restarts += 1
+        self.process = None
+        self.restart_at = now + delay
+        logging.warning(f"Worker {self.number} exited with code {code}; restarting in {delay:.0f}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the bot as several shard processes")
+    parser.add_argument("--workers", type=int, default=2, help="Number of bot processes")
+    parser.add_argument("--shards", type=int, default=None, help="Total shard count (default: one per worker)")
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("METRICS_PORT", "9108")),
+                        help="Worker i serves metrics on this port + i (0 disables)")
+    args = parser.parse_args()
+
+    shards = args.shards or args.workers
+    if shards < args.workers:
+        parser.error("need at least one shard per worker")
+    workers = [Worker(i, ids, shards, args.metrics_port)
+               for i, ids in enumerate(shard_assignment(shards, args.workers))]
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for worker in workers:
+        worker.start()
+    while not stopping:
+        now = time.monotonic()
+        for worker in workers:
+            worker.check(now)
+        time.sleep(1)
+
+    logging.info("Stopping workers...")
+    for worker in workers:
+        worker.stop()
+    for worker in workers:
+        if worker.process:
+            try:
+                worker.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+
+
+if __name__ == "__main__":
+    main()
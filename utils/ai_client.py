@@ -1,31 +1,31 @@
 # utils/ai_client.py
 import os
-import requests
+import asyncio
 import logging
 import json
+import hashlib
 from dotenv import load_dotenv
+from .response_cache import get_cache
+from .http_client import client as http_client, HttpError, HTTP_MAX_RETRIES
 
 load_dotenv()
 
 API_KEY = os.getenv("GOOGLE_AI_API_KEY")
 
 # --- CORRECTED: Updated to the stable v1 API endpoint ---
-API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={API_KEY}"
+# GEMINI_API_BASE can point at a local stub server for benchmarking
+API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com")
+MODEL = "gemini-2.0-flash"
+API_URL = f"{API_BASE}/v1beta/models/{MODEL}:generateContent?key={API_KEY}"
 
 HEADERS = {
     "Content-Type": "application/json"
 }
 
-def generate_dsa_info(topic):
-    """
-    Uses the AI model to generate a full breakdown of a DSA topic.
-    """
-    if not API_KEY:
-        logging.error("GOOGLE_AI_API_KEY is not set. Please check your .env file.")
-        return None
-
-    # The prompt is well-engineered and does not need to be changed.
-    prompt = f"""
+# The prompt is well-engineered and does not need to be changed.
+# Editing it (or MODEL) changes PROMPT_HASH, which marks every stored topic
+# generated with the old version as stale on the next incremental refresh.
+PROMPT_TEMPLATE = """
     As an expert computer science professor, provide a detailed and accurate guide on the data structure or algorithm: "{topic}".
 
     Your response MUST be a single, valid JSON object. Do not include any text or markdown formatting before or after the JSON object.
@@ -56,22 +56,203 @@ def generate_dsa_info(topic):
     Ensure all information, especially the code and complexities, is correct and follows best practices. The C++ code should be self-contained and ready to compile.
     """
 
+PROMPT_HASH = hashlib.sha256(f"{MODEL}\n{PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()[:16]
+
+# Asks for the same object as PROMPT_TEMPLATE once per topic, so batched and
+# single responses share the cache and PROMPT_HASH. Keep the two schemas in step.
+BATCH_PROMPT_TEMPLATE = """
+    As an expert computer science professor, provide a detailed and accurate guide on each of these data structures or algorithms, in this order.
+    topics: {topics}
+
+    Your response MUST be a single, valid JSON array with exactly one object per topic, in the same order. Do not include any text or markdown formatting before or after the JSON array.
+
+    Each object must have the following structure:
+    {{
+      "topic": "The topic exactly as it was given in the list above",
+      "title": "The official name of the topic",
+      "short_description": "A concise, one-paragraph explanation of what it is, how it works, and its primary use case. Should be around 3-4 sentences.",
+      "time_complexity": "Provide the Big O notation for average, best, and worst cases for major operations (e.g., Access, Search, Insertion, Deletion). Format as a simple string.",
+      "space_complexity": "Provide the Big O notation for the space complexity. Format as a simple string.",
+      "cpp_code": "A clean, well-commented, and complete C++ implementation of the algorithm or data structure. The code must be fully functional and demonstrate a common use case. Do not include any explanation outside of the code comments.",
+      "resource_links": [
+        {{"name": "GeeksforGeeks Article", "url": "A direct URL to the most relevant GeeksforGeeks article for this topic."}},
+        {{"name": "YouTube Tutorial", "url": "A direct URL to a high-quality, popular YouTube video tutorial explaining this topic."}},
+        {{"name": "LeetCode Problems", "url": "A direct URL to the LeetCode tag page for this topic (e.g., https://leetcode.com/tag/binary-search/)."}}
+      ]
+    }}
+
+    Ensure all information, especially the code and complexities, is correct and follows best practices. The C++ code should be self-contained and ready to compile.
+    """
+
+REQUIRED_FIELDS = ("title", "short_description", "time_complexity", "space_complexity", "cpp_code")
+
+class TransientAIError(Exception):
+    """A failure that may succeed on retry (429, 5xx, timeouts)."""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def validation_error(result):
+    """Why a parsed topic object can't be stored, or None if it looks complete."""
+    if not isinstance(result, dict):
+        return "not an object"
+    missing = [field for field in REQUIRED_FIELDS if not result.get(field)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if not isinstance(result.get("resource_links", []), list):
+        return "resource_links is not a list"
+    return None
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) for budgeting."""
+    return len(text) // 4 + 1
+
+
+def _response_text(response_data):
+    json_string = response_data['candidates'][0]['content']['parts'][0]['text']
+    return json_string.strip().replace("```json", "").replace("```", "").strip()
+
+
+def get_cached_dsa_info(topic, max_age=None):
+    """A previously generated response for this topic, prompt and model, if any."""
+    try:
+        return get_cache().get(topic, MODEL, PROMPT_HASH, max_age)
+    except Exception as e:
+        logging.warning(f"AI response cache read failed for {topic}: {e}")
+        return None
+
+
+def forget_cached_dsa_info(topic):
+    """Drops the cached response for a topic, e.g. once it has failed validation downstream."""
+    try:
+        get_cache().purge(topic)
+    except Exception as e:
+        logging.warning(f"AI response cache purge failed for {topic}: {e}")
+
+
+def _store_in_cache(topic, result):
+    try:
+        get_cache().put(topic, MODEL, PROMPT_HASH, result)
+    except Exception as e:
+        logging.warning(f"AI response cache write failed for {topic}: {e}")
+
+
+async def generate_dsa_info(topic, raise_transient=False, max_age=None):
+    """
+    Uses the AI model to generate a full breakdown of a DSA topic.
+    Responses are served from the on-disk cache when one younger than max_age
+    seconds exists (any age if None, never if 0), and cached after generation.
+    With raise_transient=True, retryable failures raise TransientAIError
+    straight away instead of being retried here, so the caller can back off
+    and try again.
+    """
+    if max_age != 0:
+        cached = await asyncio.to_thread(get_cached_dsa_info, topic, max_age)
+        if cached and not validation_error(cached):
+            return cached
+
+    if not API_KEY:
+        logging.error("GOOGLE_AI_API_KEY is not set. Please check your .env file.")
+        return None
+
+    prompt = PROMPT_TEMPLATE.format(topic=topic)
+
     data = {"contents": [{"parts": [{"text": prompt}]}]}
 
+    response = None
     try:
-        response = requests.post(API_URL, headers=HEADERS, json=data, timeout=60) # Increased timeout for AI generation
-        response.raise_for_status()
+        # Increased timeout for AI generation
+        response = await http_client.post_json(API_URL, data, headers=HEADERS, timeout=60,
+                                               retries=0 if raise_transient else HTTP_MAX_RETRIES)
         
-        response_data = response.json()
-        json_string = response_data['candidates'][0]['content']['parts'][0]['text']
-        cleaned_json = json_string.strip().replace("```json", "").replace("```", "").strip()
-        
-        return json.loads(cleaned_json)
+        result = json.loads(_response_text(response.json()))
+        # Only answers that validate are cached, so a rejected one isn't served again
+        error = validation_error(result)
+        if error:
+            logging.error(f"AI response for topic {topic} is invalid: {error}")
+            return None
+        await asyncio.to_thread(_store_in_cache, topic, result)
+        return result
 
-    except requests.RequestException as e:
+    except HttpError as e:
+        if raise_transient and e.retryable:
+            raise TransientAIError(str(e), e.status, e.retry_after) from e
         logging.error(f"AI API request failed for topic {topic}: {e}")
         return None
     except (KeyError, IndexError, json.JSONDecodeError) as e:
         logging.error(f"Failed to parse AI response for topic {topic}: {e}")
-        logging.error(f"Raw response was: {response.text}")
-        return None
\ No newline at end of file
+        logging.error(f"Raw response was: {response.text if response else ''}")
+        return None
+
+
+class BatchResponse:
+    __slots__ = ("results", "errors", "output_tokens")
+
+    def __init__(self, results, errors, output_tokens):
+        self.results = results              # topic -> parsed object, for the items that validated
+        self.errors = errors                # topic -> why its item was rejected
+        self.output_tokens = output_tokens  # As reported by the API, or estimated from the text
+
+
+async def generate_dsa_batch(topics, raise_transient=False):
+    """
+    Generates several topics with one request. Each element of the returned
+    array is validated on its own and cached as if it had been generated
+    alone; topics whose element is missing or invalid are reported in
+    BatchResponse.errors so the caller can retry just those. Transient
+    failures behave as in generate_dsa_info. Returns None if the request or
+    the response as a whole failed.
+    """
+    if not API_KEY:
+        logging.error("GOOGLE_AI_API_KEY is not set. Please check your .env file.")
+        return None
+
+    prompt = BATCH_PROMPT_TEMPLATE.format(topics=json.dumps(list(topics), ensure_ascii=False))
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+
+    response = None
+    try:
+        response = await http_client.post_json(API_URL, data, headers=HEADERS, timeout=60 + 30 * len(topics),
+                                               retries=0 if raise_transient else HTTP_MAX_RETRIES)
+        response_data = response.json()
+        text = _response_text(response_data)
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError("response is not a JSON array")
+    except HttpError as e:
+        if raise_transient and e.retryable:
+            raise TransientAIError(str(e), e.status, e.retry_after) from e
+        logging.error(f"AI API batch request failed for {len(topics)} topics: {e}")
+        return None
+    except (KeyError, IndexError, ValueError) as e:
+        logging.error(f"Failed to parse AI batch response for {len(topics)} topics: {e}")
+        logging.error(f"Raw response was: {response.text[:2000] if response else ''}")
+        return None
+
+    # Match elements by their echoed topic; fall back to position when the model dropped it
+    by_name = {topic.lower(): topic for topic in topics}
+    matched = {}
+    for position, item in enumerate(items):
+        named = by_name.get(str(item.get("topic", "")).strip().lower()) if isinstance(item, dict) else None
+        topic = named or (topics[position] if position < len(topics) and len(items) == len(topics) else None)
+        if topic and topic not in matched:
+            matched[topic] = item
+
+    results, errors = {}, {}
+    for topic in topics:
+        item = matched.get(topic)
+        error = "not in the response" if item is None else validation_error(item)
+        if error:
+            errors[topic] = error
+            continue
+        item = {k: v for k, v in item.items() if k != "topic"}
+        results[topic] = item
+        await asyncio.to_thread(_store_in_cache, topic, item)
+
+    usage = response_data.get("usageMetadata") or {}
+    output_tokens = usage.get("candidatesTokenCount") or estimate_tokens(text)
+    return BatchResponse(results, errors, output_tokens)
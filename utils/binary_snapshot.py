@@ -0,0 +1,295 @@
+# utils/binary_snapshot.py
+"""
+Compact, memory-mapped storage for one generation of topic data.
+
+topics.bin holds a small header (keys and titles, as compact JSON), a
+fixed-width offset table with one row per key, and then each topic's record
+and resource list as compact JSON. The C++ code bodies, by far the largest
+field, live in code.bin and are only read when an entry's "code" is used;
+their comments are kept with the record, so the search index never reads code.bin.
+Loading parses the header and nothing else; records are decoded on access.
+
+    python -m utils.binary_snapshot convert          # publish data/*.json as a binary generation
+    python -m utils.binary_snapshot convert --output topics-dir/
+    python -m utils.binary_snapshot inspect data/snapshots/gen-000007
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from . import search_index
+
+MAGIC = b"DSASNAP1"
+INDEX_NAME = "topics.bin"
+CODE_NAME = "code.bin"
+# record offset/length, code offset/length, resources offset/length
+ROW = struct.Struct("<QIQIQI")
+ABSENT = 0xFFFFFFFF
+_PREFIX = struct.Struct("<8sI")
+# Record key holding the code's comments; Records don't list it as a field
+COMMENTS_FIELD = "_comments"
+
+
+def _compact(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class _HashingWriter:
+    """A binary file that tracks its size and sha256 as it is written."""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        return {"bytes": self.size, "sha256": self.digest.hexdigest()}
+
+
+def _file_info(path, chunk_size=1 << 20):
+    """Size and sha256 of a finished file, read back in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return {"bytes": size, "sha256": digest.hexdigest()}
+
+
+def write_binary(directory, dsa_items, res_items):
+    """
+    Writes topics.bin and code.bin into directory from (key, entry) and
+    (key, links) pairs. Entries may be plain dicts or Records from an older
+    binary generation. Returns the manifest "files" dict.
+    """
+    directory = Path(directory)
+    dsa = dict(dsa_items)
+    resources = dict(res_items)
+    keys = list(dsa) + [key for key in resources if key not in dsa]
+    titles = [dsa[key].get("title", key) if key in dsa else None for key in keys]
+
+    # Offsets are known only once each record is encoded, so the payloads are
+    # streamed out past a gap left for the offset table, which is filled in last
+    header = _compact({"keys": keys, "titles": titles})
+    table_start = _PREFIX.size + len(header)
+    offset = table_start + ROW.size * len(keys)
+
+    code_out = _HashingWriter(directory / CODE_NAME)
+    index_path = directory / INDEX_NAME
+    rows = []
+    with open(index_path, "wb") as index_out:
+        index_out.write(_PREFIX.pack(MAGIC, len(header)))
+        index_out.write(header)
+        index_out.seek(offset)
+        for key in keys:
+            record_span = code_span = res_span = (0, ABSENT)
+            if key in dsa:
+                fields = dict(dsa[key])
+                code = fields.pop("code", None)
+                if code:
+                    fields[COMMENTS_FIELD] = search_index.code_comments(code)
+                record = _compact(fields)
+                record_span = (offset, len(record))
+                index_out.write(record)
+                offset += len(record)
+                if code is not None:
+                    blob = code.encode("utf-8")
+                    code_span = (code_out.size, len(blob))
+                    code_out.write(blob)
+            if key in resources:
+                links = _compact(resources[key])
+                res_span = (offset, len(links))
+                index_out.write(links)
+                offset += len(links)
+            rows.append(ROW.pack(*(record_span + code_span + res_span)))
+        index_out.seek(table_start)
+        index_out.write(b"".join(rows))
+        index_out.flush()
+        os.fsync(index_out.fileno())
+    code_info = code_out.close()
+    index_info = _file_info(index_path)
+
+    entries = sum(1 for key in keys if key in dsa)
+    return {
+        "index": {"name": INDEX_NAME, "entries": entries, "resources": len(resources), **index_info},
+        "code": {"name": CODE_NAME, **code_info},
+    }
+
+
+def _map(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class BinarySnapshot:
+    """One opened generation. dsa and resources are read-only mappings over the mapped files."""
+
+    def __init__(self, directory, files=None):
+        directory = Path(directory)
+        files = files or {"index": {"name": INDEX_NAME}, "code": {"name": CODE_NAME}}
+        self.index_path = directory / files["index"]["name"]
+        self.code_path = directory / files["code"]["name"]
+        for kind, path in (("index", self.index_path), ("code", self.code_path)):
+            expected = files[kind].get("bytes")
+            if expected is not None and path.stat().st_size != expected:
+                raise ValueError(f"{path} is {path.stat().st_size} bytes, manifest says {expected}")
+
+        self._index = _map(self.index_path)
+        self._code = _map(self.code_path)
+        magic, header_len = _PREFIX.unpack_from(self._index, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.index_path} is not a topic snapshot")
+        header = json.loads(bytes(self._index[_PREFIX.size:_PREFIX.size + header_len]))
+        self.keys = header["keys"]
+        self.titles = header["titles"]
+        self._table = _PREFIX.size + header_len
+
+        dsa_rows, res_rows = {}, {}
+        table = memoryview(self._index)[self._table:self._table + ROW.size * len(self.keys)]
+        for i, (key, row) in enumerate(zip(self.keys, ROW.iter_unpack(table))):
+            if row[1] != ABSENT:
+                dsa_rows[key] = i
+            if row[5] != ABSENT:
+                res_rows[key] = i
+        table.release()
+        self.dsa = TopicRecords(self, dsa_rows)
+        self.resources = ResourceLists(self, res_rows)
+
+    def row(self, i):
+        return ROW.unpack_from(self._index, self._table + ROW.size * i)
+
+    def read_json(self, offset, length):
+        return json.loads(self._index[offset:offset + length])
+
+    def read_code(self, offset, length):
+        return self._code[offset:offset + length].decode("utf-8")
+
+
+class _RowMapping(Mapping):
+    mapped = True  # Lets callers tell these apart from fully loaded dicts
+
+    def __init__(self, snapshot, rows):
+        self._snapshot = snapshot
+        self._rows = rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+
+class TopicRecords(_RowMapping):
+    """key -> Record, decoded on access."""
+
+    def __getitem__(self, key):
+        i = self._rows[key]
+        offset, length, code_offset, code_length, _, _ = self._snapshot.row(i)
+        fields = self._snapshot.read_json(offset, length)
+        comments = fields.pop(COMMENTS_FIELD, None)
+        return Record(self._snapshot, fields, (code_offset, code_length), comments)
+
+    def titles(self):
+        """(key, title) pairs straight from the header, without decoding any record."""
+        titles = self._snapshot.titles
+        return [(key, titles[i]) for key, i in self._rows.items()]
+
+
+class ResourceLists(_RowMapping):
+    """key -> list of [name, url] pairs, decoded on access."""
+
+    def __getitem__(self, key):
+        row = self._snapshot.row(self._rows[key])
+        return self._snapshot.read_json(row[4], row[5])
+
+
+class Record(Mapping):
+    """One topic entry. Reads like the dict the updater stored; "code" is read from code.bin on first use."""
+    __slots__ = ("_snapshot", "_fields", "_code_span", "_code", "_comments")
+
+    def __init__(self, snapshot, fields, code_span, comments=None):
+        self._snapshot = snapshot
+        self._fields = fields
+        self._code_span = code_span
+        self._code = None
+        self._comments = comments
+
+    def code_comments(self):
+        """The code's comments, stored with the record (generations written before that parse the code)."""
+        if self._comments is None:
+            return search_index.code_comments(self.get("code", ""))
+        return self._comments
+
+    def __getitem__(self, name):
+        if name == "code" and self._code_span[1] != ABSENT:
+            if self._code is None:
+                self._code = self._snapshot.read_code(*self._code_span)
+            return self._code
+        return self._fields[name]
+
+    def __iter__(self):
+        yield from self._fields
+        if self._code_span[1] != ABSENT:
+            yield "code"
+
+    def __len__(self):
+        return len(self._fields) + (self._code_span[1] != ABSENT)
+
+    def __contains__(self, name):
+        return name in self._fields or (name == "code" and self._code_span[1] != ABSENT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert or inspect binary topic snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="Convert JSON topic files to the binary format")
+    convert.add_argument("--dsa", default="data/dsa_topics.json")
+    convert.add_argument("--resources", default="data/resources.json")
+    convert.add_argument("--output", help="Write topics.bin/code.bin into this directory instead of "
+                                          "publishing a new generation")
+    inspect = sub.add_parser("inspect", help="Show what a snapshot directory holds")
+    inspect.add_argument("directory")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        with open(args.dsa, "r", encoding="utf-8") as f:
+            dsa = json.load(f)
+        with open(args.resources, "r", encoding="utf-8") as f:
+            resources = json.load(f)
+        if args.output:
+            Path(args.output).mkdir(parents=True, exist_ok=True)
+            files = write_binary(args.output, dsa.items(), resources.items())
+            print(f"Wrote {files['index']['entries']} topics to {args.output}: "
+                  f"{files['index']['bytes']} + {files['code']['bytes']} bytes")
+        else:
+            from .snapshots import write_snapshot
+            manifest = write_snapshot(dsa.items(), resources.items())
+            print(f"Published {len(dsa)} topics as generation {manifest['generation']} ({manifest['path']})")
+        return
+
+    snapshot = BinarySnapshot(args.directory)
+    code_bytes = snapshot.code_path.stat().st_size
+    print(f"{snapshot.index_path}: {len(snapshot.dsa)} topics, {len(snapshot.resources)} resource sets, "
+          f"{snapshot.index_path.stat().st_size} bytes (+{code_bytes} bytes of code)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# utils/coalesce.py
+import asyncio
+
+
+class Coalescer:
+    """
+    Shares one in-flight call between concurrent callers asking for the same
+    key: the first caller runs it, everyone else awaits the same future.
+    Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key, factory):
+        """Awaits factory() for key, or joins the call already running for it."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await factory()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved so a lone caller doesn't log "never retrieved"
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
@@ -1,20 +1,60 @@
 # utils/data_updater.py
+"""
+Refreshes the topic data and LeetCode catalog. The bot runs update_all_data
+on its own schedule, or the updater runs as a separate service that publishes
+generations for consumer-only bots (UPDATER_MODE=external):
+
+    python -m utils.data_updater                 # daemon, every UPDATE_INTERVAL_HOURS
+    python -m utils.data_updater --once --force  # one refresh, then exit
+"""
 import os
-import json
+import argparse
+import asyncio
 import random
 import logging
 import re
+import signal
 import time
-import requests # Make sure requests is imported
 from pathlib import Path
-from .notion_client import get_topics_from_public_page
-from .ai_client import generate_dsa_info
+from dotenv import load_dotenv
+
+# Settings below are read at import time, so .env has to be loaded first when
+# this module is the entry point
+load_dotenv()
+
+from .notion_client import PageStream, load_state
+from .generation_pipeline import generate_topics
+from .ai_client import MODEL, PROMPT_HASH, forget_cached_dsa_info
+from .record_schema import normalize_entry, is_normalized, InvalidRecord
+from .link_checker import check_resource_links, LINK_CHECK_ENABLED
+from . import topic_store
+from .snapshots import write_snapshot, read_manifest
+from .problem_catalog import update_problem_catalog, LEETCODE_GRAPHQL_URL, LEETCODE_HEADERS
+from .sync_status import sync_status
+from .http_client import client as http_client
+from .coalesce import Coalescer
+from .leader import updater_lease
+from . import metrics
 
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
+# Seed files; updates are published as generations under data/snapshots/
 DSA_FILE = DATA_DIR / "dsa_topics.json"
 RES_FILE = DATA_DIR / "resources.json"
-UPDATE_INTERVAL_HOURS = 24
+UPDATE_INTERVAL_HOURS = float(os.getenv("UPDATE_INTERVAL_HOURS", "24"))
+# How often a standby updater checks whether the current one has gone away
+LEASE_RETRY_SECONDS = 30
+# Generated entries older than this are regenerated on the next refresh
+TOPIC_TTL_DAYS = float(os.getenv("TOPIC_TTL_DAYS", "30"))
+# While a refresh runs, finished topics are published in memory this often
+PUBLISH_EVERY_TOPICS = 10
+PUBLISH_EVERY_SECONDS = 30
+
+# Identical LeetCode lookups in flight at the same time share one request
+leetcode_requests = Coalescer()
+metrics.Callback("coalesced_requests_total", "LeetCode lookups by whether they sent a request or joined one",
+                 lambda: {("sent",): leetcode_requests.calls, ("joined",): leetcode_requests.coalesced},
+                 ("result",), kind="counter")
 
 NOTION_PUBLIC_URL = "https://www.notion.so/List-of-important-topics-for-DSA-227e396a4f53806da717c4d2134f37e2?source=copy_link"
 
@@ -22,22 +62,23 @@ DEFAULT_DSA_TOPICS = [
     "Arrays", "Linked Lists", "Stacks", "Queues", "Binary Search", "Merge Sort", "Heaps", "Graphs", "Dynamic Programming"
 ]
 
-def should_update():
+def should_update(interval_hours=UPDATE_INTERVAL_HOURS):
     """
-    Checks if the data files need to be updated.
-    Returns True if files don't exist or are older than UPDATE_INTERVAL_HOURS.
+    Checks if the data needs to be updated.
+    Returns True if only the bundled seed data exists or the last published
+    generation is older than interval_hours.
     """
-    if not DSA_FILE.exists() or not RES_FILE.exists():
-        logging.info("Data files not found. Update is required.")
-        return True
-    
     try:
-        last_modified_time = DSA_FILE.stat().st_mtime
-        age_seconds = time.time() - last_modified_time
+        manifest = read_manifest()
+        if manifest is None:
+            logging.info("No generated data yet (only the bundled seed, if any). Update is required.")
+            return True
+
+        age_seconds = time.time() - manifest["created_at"]
         age_hours = age_seconds / 3600
         
-        if age_hours > UPDATE_INTERVAL_HOURS:
-            logging.info(f"Data is older than {UPDATE_INTERVAL_HOURS} hours. Update is required.")
+        if age_hours > interval_hours:
+            logging.info(f"Data is older than {interval_hours:g} hours. Update is required.")
             return True
         else:
             logging.info(f"Data is fresh (updated {age_hours:.2f} hours ago). Skipping update.")
@@ -47,125 +88,409 @@ def should_update():
         logging.error(f"Could not check file age, forcing update. Error: {e}")
         return True
 
-def update_all_data(force_update=False):
+def topic_key(topic):
+    return topic.lower().replace(" ", "-")
+
+def add_topic_entry(dsa_db, res_db, topic, ai_data, category=None):
+    """
+    Converts one AI response into the stored DSA and resources entries,
+    normalized by record_schema. Raises InvalidRecord (storing nothing) if
+    the response can't be repaired.
+    """
+    key = topic_key(topic)
+    entry, fixes = normalize_entry({
+        "title": ai_data.get("title", topic.title()),
+        "short": ai_data.get("short_description", ""),
+        "time": ai_data.get("time_complexity", "N/A"),
+        "space": ai_data.get("space_complexity", "N/A"),
+        "code": ai_data.get("cpp_code", ""),
+        "links": ai_data.get("resource_links", []),
+        "category": category,
+        # Lets incremental refreshes tell which entries are stale
+        "meta": {"generated_at": time.time(), "model": MODEL, "prompt_hash": PROMPT_HASH}
+    })
+    if fixes:
+        logging.info(f"Normalized {topic}: {'; '.join(fixes)}")
+    dsa_db[key] = entry
+    res_db[key] = list(entry["links"])
+    return key
+
+def carry_over(entry):
+    """
+    An older entry normalized to the current schema, or the entry itself if
+    it already is (or can't be, in which case it is queued for regeneration).
+    """
+    if is_normalized(entry):
+        return entry
+    try:
+        return normalize_entry(entry)[0]
+    except InvalidRecord:
+        return entry
+
+def _renormalizes(entry):
+    return carry_over(entry) is not entry
+
+def refresh_reason(entry, now, ttl_seconds):
+    """Why an existing entry must be regenerated, or None if it can be reused."""
+    meta = entry.get("meta") or {}
+    if meta.get("prompt_hash") != PROMPT_HASH or meta.get("model") != MODEL:
+        return "prompt"
+    if not is_normalized(entry):
+        try:
+            normalize_entry(entry)
+        except InvalidRecord:
+            return "invalid"
+    if now - meta.get("generated_at", 0) > ttl_seconds:
+        return "stale"
+    return None
+
+def merge_topics(clean_topics, generated_dsa, generated_res, old_dsa, old_res, categories=None):
     """
-    Updates all data sources by calling the AI model for each topic
-    and then creates the JSON files for the bot.
+    Builds the stored dicts in the Notion page's order, preferring freshly
+    generated entries and falling back to the old ones. Carried-over entries
+    are normalized and pick up the category of the section they are now
+    listed under.
     """
-    if not force_update and not should_update():
+    dsa_db = {}
+    res_db = {}
+    for topic in clean_topics:
+        key = topic_key(topic)
+        if key in generated_dsa:
+            dsa_db[key], res_db[key] = generated_dsa[key], generated_res[key]
+        elif key in old_dsa and key in old_res:
+            old = old_dsa[key]  # Mapped generations decode a new Record on every lookup
+            entry = carry_over(old)
+            links = old_res[key] if entry is old else list(entry["links"])
+            if categories is not None and key in categories and entry.get("category") != categories[key]:
+                entry = dict(entry, category=categories[key])
+            dsa_db[key], res_db[key] = entry, links
+    return dsa_db, res_db
+
+async def update_all_data(force_update=False, full_refresh=False, interval_hours=None, requests_per_minute=None,
+                          concurrency=None):
+    """
+    Updates all data sources by calling the AI model for each new or stale
+    topic and then publishes a new generation for the bot. Up-to-date entries
+    are carried over unchanged unless full_refresh is set. requests_per_minute
+    and concurrency override the AI pipeline's defaults. Progress is reported
+    through utils.sync_status for the !status command.
+    """
+    # The LeetCode catalog has its own freshness check
+    await update_problem_catalog()
+
+    if not force_update and not should_update(interval_hours or UPDATE_INTERVAL_HOURS):
         return False
 
-    logging.info("Starting AI-powered data update process...")
-    
-    topics = []
+    sync_status.start()
     try:
-        topics = get_topics_from_public_page(NOTION_PUBLIC_URL)
-        if topics:
-            logging.info(f"Got {len(topics)} topics from public Notion page")
+        result = await _update_topics(full_refresh, requests_per_minute, concurrency)
     except Exception as e:
-        logging.error(f"Failed to get topics from Notion: {e}")
-    
-    if not topics:
-        logging.info("Using default DSA topics as fallback")
-        topics = DEFAULT_DSA_TOPICS
+        sync_status.finish(False, str(e))
+        raise
+    sync_status.finish(result)
+    return result
 
+async def _update_topics(full_refresh, requests_per_minute=None, concurrency=None):
+    logging.info("Starting AI-powered data update process...")
+
+    snapshot = topic_store.current()
+    if not snapshot.ready:
+        snapshot = await asyncio.to_thread(topic_store.load) or snapshot
+    old_dsa = {} if full_refresh else snapshot.dsa
+    old_res = {} if full_refresh else snapshot.resources
+
+    now = time.time()
+    ttl_seconds = TOPIC_TTL_DAYS * 86400
     clean_topics = []
+    categories = {}
     seen = set()
-    for topic in topics:
-        if not topic: continue
+    reasons = {"new": 0, "prompt": 0, "invalid": 0, "stale": 0, "unchanged": 0}
+    regenerate = []  # Topics whose response failed validation this run
+    stream = PageStream(NOTION_PUBLIC_URL, load_state())
+
+    def plan(topic, category=None):
+        """Records a listed topic; returns its clean name if it needs generating."""
+        if not topic: return None
         match = re.match(r"([\w\s-]+)", topic)
-        if match:
-            clean_topic = match.group(1).strip()
-            topic_key = clean_topic.lower().replace(" ", "-")
-            if topic_key not in seen and len(topic_key) > 2:
-                seen.add(topic_key)
-                clean_topics.append(clean_topic)
+        if not match: return None
+        clean_topic = match.group(1).strip()
+        key = topic_key(clean_topic)
+        if key in seen or len(key) <= 2: return None
+        seen.add(key)
+        clean_topics.append(clean_topic)
+        categories[key] = category
+        if key not in old_dsa or key not in old_res:
+            reason = "new"
+        else:
+            reason = refresh_reason(old_dsa[key], now, ttl_seconds)
+        reasons[reason or "unchanged"] += 1
+        if reason:
+            sync_status.add_total(1)
+        return clean_topic if reason else None
 
-    logging.info(f"Processing {len(clean_topics)} clean topics: {clean_topics[:5]}")
+    async def topics_to_generate():
+        # Topics are planned and handed to the AI workers as Notion chunks
+        # arrive, so generation starts before the whole page is downloaded
+        try:
+            async for item in stream:
+                topic = plan(item.title, item.category)
+                if topic:
+                    yield topic
+        except Exception as e:
+            logging.error(f"Failed to get topics from Notion: {e}")
+        if not clean_topics and not old_dsa:
+            logging.info("Using default DSA topics as fallback")
+            for topic in DEFAULT_DSA_TOPICS:
+                if plan(topic):
+                    yield topic
 
-    dsa_db = {}
-    res_db = {}
-    
-    for i, topic in enumerate(clean_topics):
-        logging.info(f"Processing topic {i+1}/{len(clean_topics)}: {topic}")
+    generated_dsa = {}
+    generated_res = {}
+    progress = {"pending": 0, "published_at": time.monotonic()}
+
+    def publish_progress():
+        # Serve finished topics right away, with the previous data filling the gaps
+        dsa_db, res_db = merge_topics(clean_topics, generated_dsa, generated_res, snapshot.dsa, snapshot.resources)
+        topic_store.mark_current(dsa_db, res_db, partial=True)
+        progress.update(pending=0, published_at=time.monotonic())
+
+    async def store_result(result):
+        if not result.data:
+            sync_status.topic_finished(result.topic, False)
+            logging.warning(f"Could not generate AI data for topic: {result.topic}")
+            return
         try:
-            ai_data = generate_dsa_info(topic)
-            
-            if ai_data:
-                key = topic.lower().replace(" ", "-")
-                dsa_db[key] = {
-                    "title": ai_data.get("title", topic.title()),
-                    "short": ai_data.get("short_description", ""),
-                    "time": ai_data.get("time_complexity", "N/A"),
-                    "space": ai_data.get("space_complexity", "N/A"),
-                    "code": ai_data.get("cpp_code", ""),
-                    "links": [(link["name"], link["url"]) for link in ai_data.get("resource_links", [])]
-                }
-                res_db[key] = [(link["name"], link["url"]) for link in ai_data.get("resource_links", [])]
-                logging.info(f"Successfully generated data for {topic}")
-            else:
-                logging.warning(f"Could not generate AI data for topic: {topic}")
-
-            logging.info("Waiting for 8 seconds before the next topic...")
-            time.sleep(8)
-            
+            add_topic_entry(generated_dsa, generated_res, result.topic, result.data,
+                            categories.get(topic_key(result.topic)))
+        except InvalidRecord as e:
+            sync_status.topic_finished(result.topic, False)
+            logging.warning(f"AI data for {result.topic} failed validation ({e}); queued for regeneration")
+            # The cache holds the rejected answer; later runs must not reuse it
+            await asyncio.to_thread(forget_cached_dsa_info, result.topic)
+            regenerate.append(result.topic)
+            return
         except Exception as e:
-            logging.error(f"An error occurred while processing topic {topic}: {e}")
+            sync_status.topic_finished(result.topic, False)
+            logging.error(f"An error occurred while processing topic {result.topic}: {e}")
+            return
+        sync_status.topic_finished(result.topic, True)
 
-    try:
-        with open(DSA_FILE, "w", encoding='utf-8') as f:
-            json.dump(dsa_db, f, indent=2, ensure_ascii=False)
-        logging.info(f"Wrote {len(dsa_db)} entries to {DSA_FILE}")
-    except Exception as e:
-        logging.error(f"Failed to write DSA file: {e}")
+        progress["pending"] += 1
+        if (not topic_store.current().ready or progress["pending"] >= PUBLISH_EVERY_TOPICS
+                or time.monotonic() - progress["published_at"] >= PUBLISH_EVERY_SECONDS):
+            try:
+                # Rebuilding the lookup index is CPU work; keep it off the event loop
+                await asyncio.to_thread(publish_progress)
+            except Exception as e:
+                logging.error(f"Failed to publish partial update: {e}")
+
+    sync_status.set_phase("generating", total=0)
+    # Responses cached within the TTL are reused, so a crashed update resumes cheaply
+    max_age = 0 if full_refresh else ttl_seconds
+    await generate_topics(topics_to_generate(), on_result=store_result, max_age=max_age,
+                          requests_per_minute=requests_per_minute, concurrency=concurrency)
+
+    logging.info(f"Refresh plan: {sum(reasons.values()) - reasons['unchanged']} to generate "
+                 f"({reasons['new']} new, {reasons['prompt']} prompt changed, {reasons['invalid']} invalid, "
+                 f"{reasons['stale']} past TTL), {reasons['unchanged']} unchanged")
+
+    if regenerate:
+        # One targeted retry, one topic per request and never from the cache
+        # (which holds the rejected answer); anything still invalid keeps its
+        # old entry, if any, and comes back as "new"/"invalid" next run
+        retry = list(regenerate)
+        regenerate.clear()
+        logging.info(f"Regenerating {len(retry)} topics whose AI data failed validation")
+        sync_status.add_total(len(retry))
+        await generate_topics(retry, on_result=store_result, max_age=0, batch_size=1,
+                              requests_per_minute=requests_per_minute, concurrency=concurrency)
+        if regenerate:
+            logging.warning(f"Still invalid after regeneration: {', '.join(regenerate)}")
+
+    if not stream.complete:
+        # A page we couldn't read to the end says nothing about the topics
+        # after the failure, so keep them rather than treating them as removed
+        for key in old_dsa:
+            if key not in seen and key in old_res:
+                seen.add(key)
+                clean_topics.append(key.replace("-", " "))
+                categories[key] = old_dsa[key].get("category")
+
+    removed = set(old_dsa) - seen
+    recategorized = sum(1 for key, category in categories.items()
+                        if key in old_dsa and key not in generated_dsa and old_dsa[key].get("category") != category)
+    renormalized = sum(1 for key in seen
+                       if key in old_dsa and key not in generated_dsa and _renormalizes(old_dsa[key]))
+    if (stream.unchanged and not generated_dsa and not removed and not recategorized and not renormalized
+            and len(old_dsa) == len(clean_topics)):
+        # Same page content and every stored entry is current: skip the merge,
+        # link check and publish. Links are checked again on the next run
+        # that has something to change.
+        logging.info("Notion page unchanged and every topic is current; nothing to do.")
+        return False
+    # If regenerating a stale entry failed, the old version is better than
+    # nothing and will be retried next time.
+    dsa_db, res_db = merge_topics(clean_topics, generated_dsa, generated_res, old_dsa, old_res, categories)
+
+    relinked = 0
+    if LINK_CHECK_ENABLED:
+        # Links die after they are generated, so carried-over topics are
+        # checked too; cached results keep most refreshes off the network
+        sync_status.set_phase("checking links")
+        try:
+            relinked = await check_resource_links(dsa_db, res_db)
+        except Exception as e:
+            logging.error(f"Link check failed, publishing links unchecked: {e}")
+
+    if (not generated_dsa and not removed and not recategorized and not renormalized and not relinked
+            and len(old_dsa) == len(clean_topics)):
+        logging.info("Stored data is already up to date; nothing to write.")
+        stream.save_state()
+        return False
+
+    sync_status.set_phase("publishing")
+
+    logging.info(f"Generated {len(generated_dsa)} topics, carried over {len(dsa_db) - len(generated_dsa)}, "
+                 f"dropped {len(removed)} no longer listed")
 
     try:
-        with open(RES_FILE, "w", encoding='utf-8') as f:
-            json.dump(res_db, f, indent=2, ensure_ascii=False)
-        logging.info(f"Wrote {len(res_db)} entries to {RES_FILE}")
+        await asyncio.to_thread(write_snapshot, dsa_db.items(), res_db.items())
     except Exception as e:
-        logging.error(f"Failed to write resources file: {e}")
+        logging.error(f"Failed to publish data snapshot, keeping the previous one: {e}")
+        return False
+
+    stream.save_state()
+    # Serve the new generation straight away; opening it only maps the files
+    await asyncio.to_thread(topic_store.load)
 
     logging.info("AI-powered data update process completed")
     return True
 
+# Problems LeetCode last reported; the random page offset stays below it
+_question_total = None
+
 # --- ADD THIS FUNCTION BACK ---
-def get_random_leetcode_problem(limit=50):
-    """Fetch a random LeetCode problem"""
-    try:
-        query = """
-        query problemsetQuestionList($limit: Int!, $skip: Int!) {
-          problemsetQuestionList: questionList(
-            categorySlug: ""
-            limit: $limit
-            skip: $skip
-            filters: {}
-          ) {
-            questions: data {
-              acRate
-              difficulty
-              title
-              titleSlug
-              paidOnly: isPaidOnly
-            }
-          }
+async def _fetch_question_page(limit):
+    global _question_total
+    query = """
+    query problemsetQuestionList($limit: Int!, $skip: Int!) {
+      problemsetQuestionList: questionList(
+        categorySlug: ""
+        limit: $limit
+        skip: $skip
+        filters: {}
+      ) {
+        total: totalNum
+        questions: data {
+          acRate
+          difficulty
+          title
+          titleSlug
+          paidOnly: isPaidOnly
         }
-        """
-        variables = {"limit": limit, "skip": random.randint(0, 2000)}
-        payload = {"query": query, "variables": variables}
-        headers = {"Content-Type": "application/json", "User-Agent": "Mozilla/5.0"}
-        response = requests.post("https://leetcode.com/graphql/", json=payload, headers=headers, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        questions = data.get("data", {}).get("problemsetQuestionList", {}).get("questions", [])
+      }
+    }
+    """
+    # Until LeetCode has reported its total, guess; a guess past the end is retried below
+    total = _question_total or 2000
+    skip = random.randint(0, max(0, total - limit))
+    while True:
+        payload = {"query": query, "variables": {"limit": limit, "skip": skip}}
+        response = await http_client.post_json(LEETCODE_GRAPHQL_URL, payload, headers=LEETCODE_HEADERS,
+                                               timeout=15, retries=1)
+        page = response.json().get("data", {}).get("problemsetQuestionList") or {}
+        questions = page.get("questions") or []
+        _question_total = page.get("total") or _question_total
+        if questions or not _question_total or skip < _question_total:
+            return questions
+        skip = random.randint(0, max(0, _question_total - limit))
+
+async def get_random_leetcode_problem(limit=50):
+    """Fetch a random LeetCode problem (used until the local catalog is downloaded)"""
+    try:
+        # Concurrent !challenge calls share one page request and each pick from it
+        questions = await leetcode_requests.run(("question-page", limit), lambda: _fetch_question_page(limit))
         if not questions: return None
         free_questions = [q for q in questions if not q.get("paidOnly", True)]
         question = random.choice(free_questions or questions)
         return {
             "title": question.get("title", "Unknown Problem"),
+            "slug": question.get("titleSlug", ""),
             "difficulty": question.get("difficulty", "Unknown"),
             "url": f"https://leetcode.com/problems/{question.get('titleSlug', '')}/"
         }
     except Exception as e:
         logging.error(f"Error fetching LeetCode problem: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# --- Standalone updater service ---
+async def run_service(once=False, force_update=False, full_refresh=False, interval_hours=UPDATE_INTERVAL_HOURS,
+                      requests_per_minute=None, concurrency=None, metrics_port=0):
+    """
+    Holds the updater lease and refreshes the data every interval_hours until
+    SIGTERM/SIGINT. A second instance waits as a standby until the lease frees.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows event loops
+            pass
+
+    async def wait(seconds):
+        try:
+            await asyncio.wait_for(stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    while not updater_lease.try_acquire():
+        if once:
+            logging.error(f"Another updater (pid {updater_lease.holder()}) holds the lease; not running.")
+            return False
+        logging.info(f"Standing by: updater pid {updater_lease.holder()} holds the lease.")
+        await wait(LEASE_RETRY_SECONDS)
+        if stop.is_set():
+            return False
+
+    metrics_runner = await metrics.start_server(port=metrics_port) if metrics_port else None
+    try:
+        while not stop.is_set():
+            try:
+                await update_all_data(force_update=force_update, full_refresh=full_refresh,
+                                      interval_hours=interval_hours, requests_per_minute=requests_per_minute,
+                                      concurrency=concurrency)
+            except Exception as e:
+                logging.error(f"Update failed: {e}", exc_info=True)
+            if once:
+                break
+            # Later runs rely on the age check rather than repeating a forced/full refresh
+            force_update = full_refresh = False
+            await wait(interval_hours * 3600)
+    finally:
+        await http_client.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        updater_lease.release()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data updater on its own, outside the bot process")
+    parser.add_argument("--once", action="store_true", help="Run one update and exit")
+    parser.add_argument("--force", action="store_true", help="Refresh even if the data is younger than the interval")
+    parser.add_argument("--full-refresh", action="store_true", help="Regenerate every topic, ignoring stored entries")
+    parser.add_argument("--interval-hours", type=float, default=UPDATE_INTERVAL_HOURS)
+    parser.add_argument("--rpm", type=float, default=None, help="AI requests per minute (default AI_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--concurrency", type=int, default=None, help="AI requests in flight (default AI_CONCURRENCY)")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve /metrics on this port (0 disables)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)-8s %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    ok = asyncio.run(run_service(args.once, args.force, args.full_refresh, args.interval_hours, args.rpm,
+                                 args.concurrency, args.metrics_port))
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+# utils/generation_pipeline.py
+import asyncio
+import logging
+import os
+import inspect
+import time
+from .ai_client import generate_dsa_info, generate_dsa_batch, get_cached_dsa_info, validation_error, TransientAIError
+from .rate_limiter import TokenBucket
+from .http_client import backoff_delay
+from . import metrics
+
+# Defaults match the Gemini free tier; raise them for a paid quota
+AI_REQUESTS_PER_MINUTE = float(os.getenv("AI_REQUESTS_PER_MINUTE", "15"))
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "4"))
+AI_MAX_ATTEMPTS = int(os.getenv("AI_MAX_ATTEMPTS", "4"))
+BACKOFF_BASE_SECONDS = 2.0
+# Topics per request; 1 sends one prompt per topic
+AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "1"))
+# A batched response has to fit the model's output limit (maxOutputTokens)
+AI_BATCH_OUTPUT_TOKENS = int(os.getenv("AI_BATCH_OUTPUT_TOKENS", "8192"))
+# Starting estimate of output tokens per topic, refined from real responses
+AI_TOKENS_PER_TOPIC = int(os.getenv("AI_TOKENS_PER_TOPIC", "1500"))
+
+generation_seconds = metrics.Histogram("ai_generation_seconds", "Time spent generating one topic, retries included",
+                                       buckets=metrics.HTTP_BUCKETS)
+generations_total = metrics.Counter("ai_generations_total", "Topics generated by outcome", ("outcome",))
+batch_retries = metrics.Counter("ai_batch_retries_total", "Batched topics whose item failed and was retried alone")
+
+
+class TopicResult:
+    __slots__ = ("topic", "data", "attempts", "latency", "error")
+
+    def __init__(self, topic, data, attempts, latency, error=None):
+        self.topic = topic
+        self.data = data
+        self.attempts = attempts
+        self.latency = latency  # Seconds spent in API calls, excluding rate-limit waits
+        self.error = error
+
+
+class BatchSizer:
+    """
+    Picks how many topics go into one request: at most max_size, and no more
+    than the output token budget holds at the observed tokens per topic.
+    """
+
+    def __init__(self, max_size, token_budget=None, tokens_per_topic=None):
+        self.max_size = max_size
+        self.token_budget = token_budget or AI_BATCH_OUTPUT_TOKENS
+        self.tokens_per_topic = float(tokens_per_topic or AI_TOKENS_PER_TOPIC)
+
+    def limit(self):
+        return max(1, min(self.max_size, int(self.token_budget // self.tokens_per_topic)))
+
+    def observe(self, topics, output_tokens):
+        # Smoothed, so one unusually long answer doesn't halve the batch size
+        self.tokens_per_topic = 0.7 * self.tokens_per_topic + 0.3 * (output_tokens / topics)
+
+    def overflowed(self):
+        # An unparseable batch is most often a truncated one; assume bigger answers
+        self.tokens_per_topic *= 1.5
+
+
+async def _cached_result(topic, max_age):
+    # Cached responses (e.g. from an update that crashed halfway) don't spend quota
+    if max_age != 0:
+        cached = await asyncio.to_thread(get_cached_dsa_info, topic, max_age)
+        if cached and not validation_error(cached):
+            return TopicResult(topic, cached, 0, 0.0)
+    return None
+
+
+async def _with_retries(label, call, bucket, max_attempts):
+    """
+    Awaits call() under the shared bucket, backing off and retrying on
+    transient errors. Returns (value, attempts, latency, error).
+    """
+    latency = 0.0
+    for attempt in range(1, max_attempts + 1):
+        await bucket.acquire()
+        started = time.perf_counter()
+        try:
+            value = await call()
+        except TransientAIError as e:
+            latency += time.perf_counter() - started
+            bucket.slow_down()
+            if attempt == max_attempts:
+                return None, attempt, latency, str(e)
+            delay = backoff_delay(attempt, e.retry_after, base=BACKOFF_BASE_SECONDS)
+            logging.warning(f"Transient AI error for {label} ({e}); retry {attempt}/{max_attempts - 1} in {delay:.1f}s, "
+                            f"rate now {bucket.rate_per_minute:.1f}/min")
+            await asyncio.sleep(delay)
+            continue
+        latency += time.perf_counter() - started
+        bucket.recover()
+        return value, attempt, latency, None
+    return None, max_attempts, latency, "gave up"
+
+
+async def _generate_one(topic, bucket, max_attempts, max_age):
+    cached = await _cached_result(topic, max_age)
+    if cached:
+        return cached
+    data, attempts, latency, error = await _with_retries(
+        topic, lambda: generate_dsa_info(topic, raise_transient=True, max_age=0), bucket, max_attempts)
+    return TopicResult(topic, data, attempts, latency, error or (None if data else "no data"))
+
+
+async def _generate_batch(topics, bucket, max_attempts, max_age, sizer):
+    """
+    Generates topics with one request, then retries each topic whose item
+    was missing or invalid on its own. Returns a TopicResult per topic.
+    """
+    results = []
+    pending = []
+    for topic in topics:
+        cached = await _cached_result(topic, max_age)
+        if cached:
+            results.append(cached)
+        else:
+            pending.append(topic)
+    if len(pending) <= 1:
+        return results + [await _generate_one(topic, bucket, max_attempts, 0) for topic in pending]
+
+    batch, attempts, latency, error = await _with_retries(
+        f"batch of {len(pending)}", lambda: generate_dsa_batch(pending, raise_transient=True), bucket, max_attempts)
+    if batch:
+        sizer.observe(len(pending), batch.output_tokens)
+    elif not error:
+        sizer.overflowed()
+
+    share = latency / len(pending)
+    retry = []
+    for topic in pending:
+        if batch and topic in batch.results:
+            results.append(TopicResult(topic, batch.results[topic], attempts, share))
+        else:
+            reason = batch.errors.get(topic) if batch else (error or "unusable response")
+            logging.warning(f"Batched generation failed for {topic} ({reason}); retrying it on its own")
+            retry.append(topic)
+    batch_retries.inc(amount=len(retry))
+    for topic in retry:
+        results.append(await _generate_one(topic, bucket, max_attempts, 0))
+    return results
+
+
+async def generate_topics(topics, on_result=None, requests_per_minute=None, concurrency=None, max_attempts=None,
+                          max_age=None, batch_size=None):
+    """
+    Generates AI data for every topic with a bounded number of in-flight
+    requests and a shared token bucket, so throughput follows the configured
+    quota instead of a fixed sleep. topics may be a list or an async iterable;
+    with the latter, generation starts while later topics are still arriving.
+    Cached responses younger than max_age seconds are reused (max_age=0
+    always calls the API). on_result(TopicResult) is called (and awaited, if
+    it is a coroutine function) as each topic finishes. Returns the list of
+    results in completion order.
+
+    With batch_size > 1 (default AI_BATCH_SIZE), each worker packs the topics
+    waiting in the queue into one request, up to batch_size and the output
+    token budget; topics whose part of the answer fails validation are
+    retried individually.
+    """
+    bucket = TokenBucket(requests_per_minute or AI_REQUESTS_PER_MINUTE)
+    max_attempts = max_attempts or AI_MAX_ATTEMPTS
+    streaming = hasattr(topics, "__aiter__")
+    workers = max(1, concurrency or AI_CONCURRENCY)
+    if not streaming:
+        workers = min(workers, len(topics) or 1)
+    batch_size = batch_size or AI_BATCH_SIZE
+    sizer = BatchSizer(batch_size) if batch_size > 1 else None
+    queue = asyncio.Queue()
+    queued = 0
+    results = []
+
+    async def produce():
+        nonlocal queued
+        try:
+            if streaming:
+                async for topic in topics:
+                    queued += 1
+                    queue.put_nowait(topic)
+            else:
+                for topic in topics:
+                    queued += 1
+                    queue.put_nowait(topic)
+        finally:
+            for _ in range(workers):
+                queue.put_nowait(None)  # One stop marker per worker
+
+    async def finish(result):
+        results.append(result)
+        if not result.attempts:
+            status = "cached"
+        else:
+            status = "ok" if result.data else f"failed ({result.error})"
+            generation_seconds.observe(result.latency)
+        generations_total.inc("cached" if not result.attempts else ("ok" if result.data else "failed"))
+        logging.info(f"[{len(results)}/{queued}] {result.topic}: {status} in {result.latency:.2f}s "
+                     f"after {result.attempts} attempt(s)")
+        if on_result:
+            outcome = on_result(result)
+            if inspect.isawaitable(outcome):
+                await outcome
+
+    async def worker():
+        stopping = False
+        while not stopping:
+            topic = await queue.get()
+            if topic is None:
+                return
+            if not sizer:
+                await finish(await _generate_one(topic, bucket, max_attempts, max_age))
+                continue
+            # Take whatever else is already waiting, up to the current batch limit
+            batch = [topic]
+            limit = sizer.limit()
+            while len(batch) < limit:
+                try:
+                    extra = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if extra is None:
+                    stopping = True
+                    break
+                batch.append(extra)
+            for result in await _generate_batch(batch, bucket, max_attempts, max_age, sizer):
+                await finish(result)
+
+    started = time.perf_counter()
+    producer = asyncio.create_task(produce())
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    await producer  # Re-raises if the topic source failed
+    log_summary(results, time.perf_counter() - started)
+    return results
+
+
+def latency_summary(results):
+    latencies = sorted(r.latency for r in results)
+    if not latencies:
+        return {}
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "count": len(latencies),
+        "ok": sum(1 for r in results if r.data),
+        "cached": sum(1 for r in results if r.data and not r.attempts),
+        "retries": sum(max(0, r.attempts - 1) for r in results),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "max": latencies[-1],
+    }
+
+
+def log_summary(results, elapsed):
+    summary = latency_summary(results)
+    if not summary:
+        return
+    logging.info(f"Generated {summary['ok']}/{summary['count']} topics in {elapsed:.1f}s "
+                 f"({summary['cached']} from cache, {summary['retries']} retries); "
+                 f"per-topic latency p50={summary['p50']:.2f}s p95={summary['p95']:.2f}s max={summary['max']:.2f}s")
@@ -0,0 +1,140 @@
+# utils/http_client.py
+"""
+Shared async HTTP layer for the Gemini, Notion and LeetCode integrations.
+One pooled keep-alive aiohttp session per host, a cap on concurrent requests
+per host, and the same timeout/retry/backoff rules for every caller.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+from urllib.parse import urlsplit
+import time
+import aiohttp
+from . import metrics
+
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Status codes worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class HttpError(Exception):
+    """A request that failed for good. status is None for network errors and timeouts."""
+
+    def __init__(self, message, status=None, retry_after=None, body=""):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.body = body
+
+    @property
+    def retryable(self):
+        return self.status is None or self.status in RETRYABLE_STATUS
+
+
+class HttpResponse:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self):
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def backoff_delay(attempt, retry_after=None, base=BACKOFF_BASE_SECONDS):
+    """Exponential backoff with jitter for the given 1-based attempt, honouring Retry-After."""
+    if retry_after:
+        return min(BACKOFF_MAX_SECONDS, retry_after)
+    delay = min(BACKOFF_MAX_SECONDS, base * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)  # Jitter so callers don't retry in lockstep
+
+
+def _retry_after(headers):
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    def __init__(self, per_host_limit=HTTP_PER_HOST_LIMIT, timeout=HTTP_TIMEOUT_SECONDS):
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._sessions = {}
+        self._limits = {}
+        self._loop = None
+
+    def _session(self, host):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Sessions are bound to the loop that created them (e.g. a one-off asyncio.run)
+            self._sessions, self._limits, self._loop = {}, {}, loop
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.per_host_limit, keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._sessions[host] = session
+            self._limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return session, self._limits[host]
+
+    async def request(self, method, url, *, json=None, headers=None, timeout=None, retries=HTTP_MAX_RETRIES):
+        """
+        Sends a request, retrying 429/5xx responses and network errors up to
+        `retries` times with backoff. Returns an HttpResponse for 2xx/3xx and
+        raises HttpError otherwise.
+        """
+        host = urlsplit(url).netloc
+        session, limit = self._session(host)
+        # timeout=None would mean no limit at all to aiohttp, so fall back to the client default
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                async with limit:
+                    async with session.request(method, url, json=json, headers=headers,
+                                               timeout=request_timeout) as response:
+                        body = await response.read()
+                        result = HttpResponse(response.status, response.headers, body)
+                metrics.http_seconds.observe(time.perf_counter() - started, host)
+                metrics.http_responses.inc(host, str(result.status))
+                if result.status < 400:
+                    return result
+                error = HttpError(f"HTTP {result.status} from {host}", result.status,
+                                  _retry_after(result.headers), result.text[:500])
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.http_seconds.observe(time.perf_counter() - started, host)
+                metrics.http_responses.inc(host, "error")
+                error = HttpError(f"{type(e).__name__} talking to {host}: {e}")
+
+            if not error.retryable or attempt > retries:
+                raise error
+            delay = backoff_delay(attempt, error.retry_after)
+            logging.warning(f"{method} {host} failed ({error}); retry {attempt}/{retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def post_json(self, url, payload, **kwargs):
+        return await self.request("POST", url, json=payload, **kwargs)
+
+    async def close(self):
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+
+client = HttpClient()
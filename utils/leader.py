@@ -0,0 +1,65 @@
+# utils/leader.py
+"""
+Picks the one process that runs the data updater when several bot processes
+(shards) share the data directory. The leader holds an exclusive lock on
+data/updater.lock for as long as it runs; the OS drops the lock when the
+process exits, so another process can take over on its next attempt.
+"""
+import logging
+import os
+from .snapshots import DATA_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, and no multi-process deployments either
+    fcntl = None
+
+LOCK_FILE = DATA_DIR / "updater.lock"
+
+
+class FileLease:
+    def __init__(self, path=LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self):
+        return self._file is not None
+
+    def try_acquire(self):
+        """Takes the lock if no other process holds it. Never blocks."""
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            self._file = True
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(f"{os.getpid()}\n")
+        f.flush()
+        self._file = f
+        logging.info(f"This process (pid {os.getpid()}) is now the data updater")
+        return True
+
+    def release(self):
+        if self._file not in (None, True):
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+        self._file = None
+
+    def holder(self):
+        """The pid written by the current leader, if any."""
+        try:
+            return int(self.path.read_text().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+
+updater_lease = FileLease()
@@ -0,0 +1,296 @@
+# utils/link_checker.py
+"""
+Checks the resource links the model suggests before they are published.
+Every URL gets a HEAD request (a GET where the site refuses HEAD), with a
+cap on requests in flight per domain so a topic list full of GeeksforGeeks
+articles doesn't look like a crawl. Results are cached with a TTL per
+outcome, so a refresh only re-checks links it hasn't looked at lately.
+YouTube serves a 200 page for removed videos, so watch links are checked
+through its oEmbed endpoint instead.
+
+    python -m utils.link_checker                                # check data/resources.json, print a report
+    python -m utils.link_checker --refresh --per-domain 8       # ignore cached results
+    LINK_CHECK_BASE=http://127.0.0.1:8766 python -m utils.link_checker --resources bench.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from urllib.parse import quote, quote_plus, urlsplit
+import aiohttp
+from . import metrics
+from .snapshots import DATA_DIR, atomic_write_json
+
+LINK_CHECK_ENABLED = os.getenv("LINK_CHECK_ENABLED", "1") == "1"
+LINK_CHECK_CONCURRENCY = int(os.getenv("LINK_CHECK_CONCURRENCY", "32"))
+LINK_CHECK_PER_DOMAIN = int(os.getenv("LINK_CHECK_PER_DOMAIN", "4"))
+LINK_CHECK_TIMEOUT_SECONDS = float(os.getenv("LINK_CHECK_TIMEOUT_SECONDS", "15"))
+# Overridable so the benchmarks can point the checker at a local stub:
+# https://host/path is then fetched as {LINK_CHECK_BASE}/host/path
+LINK_CHECK_BASE = os.getenv("LINK_CHECK_BASE", "").rstrip("/")
+CACHE_FILE = DATA_DIR / "link_health.json"
+
+# How long a result is trusted. Only "dead" links are acted on; "blocked"
+# (the site refuses bots) and "error" (timeouts, 5xx) say nothing about the
+# page, so those links are kept and looked at again sooner.
+TTL_SECONDS = {"ok": 7 * 86400, "dead": 3 * 86400, "blocked": 86400, "error": 6 * 3600}
+DEAD_STATUS = {404, 410}
+BLOCKED_STATUS = {401, 403, 429}
+# Answers to a HEAD request that mean "ask again with GET"
+HEAD_REFUSED = {403, 405, 501}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+YOUTUBE_OEMBED = "https://www.youtube.com/oembed?format=json&url="
+# Dead links on these domains are replaced by a search for the topic; others are dropped
+SEARCH_URLS = {
+    "youtube.com": "https://www.youtube.com/results?search_query={query}",
+    "youtu.be": "https://www.youtube.com/results?search_query={query}",
+    "leetcode.com": "https://leetcode.com/problemset/?search={query}",
+}
+
+link_checks = metrics.Counter("link_checks_total", "Resource links checked over the network, by outcome",
+                              ("outcome",))
+link_check_seconds = metrics.Histogram("link_check_seconds", "Time to check one resource link", ("domain",),
+                                       buckets=metrics.HTTP_BUCKETS)
+
+
+def domain(url):
+    """The host a link is rate limited under, without www./m. prefixes."""
+    host = (urlsplit(url).hostname or "").lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def _is_youtube_video(url):
+    parts = urlsplit(url)
+    site = domain(url)
+    return site == "youtu.be" or (site == "youtube.com" and parts.path == "/watch")
+
+
+def outcome(status):
+    if status is None:
+        return "error"
+    if status < 400:
+        return "ok"
+    if status in DEAD_STATUS:
+        return "dead"
+    if status in BLOCKED_STATUS:
+        return "blocked"
+    return "error"
+
+
+def search_replacement(url, query):
+    """A search on the dead link's site standing in for it, or None."""
+    template = SEARCH_URLS.get(domain(url))
+    return template.format(query=quote_plus(query)) if template else None
+
+
+class LinkChecker:
+    """
+    url -> outcome for a set of links, from the cache while it is fresh and
+    over the network otherwise. After check() the report attribute holds the
+    run's throughput and outcome breakdown.
+    """
+
+    def __init__(self, path=CACHE_FILE, concurrency=LINK_CHECK_CONCURRENCY, per_domain=LINK_CHECK_PER_DOMAIN,
+                 timeout=LINK_CHECK_TIMEOUT_SECONDS, base=LINK_CHECK_BASE):
+        self.path = path
+        self.concurrency = concurrency
+        self.per_domain = per_domain
+        self.timeout = timeout
+        self.base = base
+        self.results = self._load()  # url -> [outcome, status, checked_at]
+        self.report = None
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Writes the cache, forgetting results too old to be used again."""
+        now = time.time()
+        longest = max(TTL_SECONDS.values())
+        self.results = {url: result for url, result in self.results.items() if now - result[2] <= longest}
+        atomic_write_json(self.path, self.results)
+
+    def cached(self, url, now=None):
+        result = self.results.get(url)
+        if result is None:
+            return None
+        state, _, checked_at = result
+        if (now or time.time()) - checked_at > TTL_SECONDS.get(state, 0):
+            return None
+        return state
+
+    def _target(self, url):
+        if not self.base:
+            return url
+        parts = urlsplit(url)
+        return f"{self.base}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+
+    async def _status(self, session, method, url):
+        async with session.request(method, self._target(url), headers=HEADERS, allow_redirects=True) as response:
+            # The body isn't needed; leaving it unread just closes the connection
+            return response.status
+
+    async def _probe(self, session, url):
+        """(outcome, status) for one link; status is None for network errors."""
+        try:
+            if _is_youtube_video(url):
+                status = await self._status(session, "GET", YOUTUBE_OEMBED + quote(url, safe=""))
+                # 401/403 mean the video exists but can't be embedded; 400 is an unknown id
+                if status in (401, 403):
+                    return "ok", status
+                return ("dead" if status == 400 else outcome(status)), status
+            status = await self._status(session, "HEAD", url)
+            if status in HEAD_REFUSED:
+                status = await self._status(session, "GET", url)
+            return outcome(status), status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.debug(f"Link check for {url} failed: {type(e).__name__} {e}")
+            return "error", None
+
+    async def check(self, urls, refresh=False):
+        """Returns url -> outcome for every URL in urls."""
+        started = time.perf_counter()
+        now = time.time()
+        urls = list(dict.fromkeys(urls))
+        health = {}
+        pending = []
+        for url in urls:
+            state = None if refresh else self.cached(url, now)
+            if state is None:
+                pending.append(url)
+            else:
+                health[url] = state
+
+        statuses = Counter()
+        domains = {}
+        if pending:
+            limits = {}
+            overall = asyncio.Semaphore(self.concurrency)
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=0)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+            async def check_one(session, url):
+                site = domain(url)
+                limit = limits.setdefault(site, asyncio.Semaphore(self.per_domain))
+                # The domain slot is taken first so links queued behind a busy
+                # domain don't hold overall slots other domains could use
+                async with limit, overall:
+                    probe_started = time.perf_counter()
+                    state, status = await self._probe(session, url)
+                    link_check_seconds.observe(time.perf_counter() - probe_started, site)
+                link_checks.inc(state)
+                health[url] = state
+                self.results[url] = [state, status, time.time()]
+                if state != "ok":
+                    statuses[str(status or "network")] += 1
+                domains.setdefault(site, Counter())[state] += 1
+
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                await asyncio.gather(*(check_one(session, url) for url in pending))
+
+        elapsed = time.perf_counter() - started
+        self.report = {
+            "urls": len(urls),
+            "cached": len(urls) - len(pending),
+            "checked": len(pending),
+            "seconds": round(elapsed, 3),
+            "checks_per_second": round(len(pending) / elapsed, 1) if pending and elapsed else 0.0,
+            "outcomes": dict(Counter(health.values())),
+            "failures_by_status": {status: n for status, n in sorted(statuses.items()) if n},
+            "checked_by_domain": {site: dict(counts) for site, counts in sorted(domains.items())},
+        }
+        return health
+
+
+def repair_links(links, health, query):
+    """
+    (links, replaced, dropped) with every dead link swapped for a search on
+    its site, or dropped where the site has no search to send users to.
+    """
+    kept, replaced, dropped = [], 0, 0
+    seen = set()
+    for name, url in links:
+        if health.get(url) == "dead":
+            substitute = search_replacement(url, query)
+            if substitute is None:
+                dropped += 1
+                continue
+            name, url = f"{name} (search)", substitute
+            replaced += 1
+        if url not in seen:
+            seen.add(url)
+            kept.append((name, url))
+    return kept, replaced, dropped
+
+
+async def check_resource_links(dsa_db, res_db, checker=None):
+    """
+    Checks every link in res_db and repairs dead ones in both dicts, in
+    place. Returns the number of topics whose links changed; the checker's
+    report describes the run.
+    """
+    checker = checker or LinkChecker()
+    urls = [url for links in res_db.values() for _, url in links]
+    health = await checker.check(urls)
+    try:
+        await asyncio.to_thread(checker.save)
+    except OSError as e:
+        logging.warning(f"Could not save link check results: {e}")
+
+    changed = replaced = dropped = 0
+    for key, links in res_db.items():
+        if not any(health.get(url) == "dead" for _, url in links):
+            continue
+        entry = dsa_db.get(key)
+        query = (entry.get("title") if entry is not None else None) or key.replace("-", " ")
+        fixed, r, d = repair_links(links, health, query)
+        res_db[key] = fixed
+        if entry is not None:
+            dsa_db[key] = dict(entry, links=list(fixed))
+        changed += 1
+        replaced += r
+        dropped += d
+
+    report = checker.report
+    logging.info(f"Checked {report['urls']} resource links ({report['cached']} cached) in {report['seconds']}s, "
+                 f"{report['checks_per_second']}/s: {report['outcomes']}; "
+                 f"replaced {replaced} and dropped {dropped} dead links across {changed} topics")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the resource links in a resources file")
+    parser.add_argument("--resources", default="data/resources.json")
+    parser.add_argument("--refresh", action="store_true", help="Check every link, ignoring cached results")
+    parser.add_argument("--concurrency", type=int, default=LINK_CHECK_CONCURRENCY)
+    parser.add_argument("--per-domain", type=int, default=LINK_CHECK_PER_DOMAIN)
+    args = parser.parse_args()
+
+    with open(args.resources, "r", encoding="utf-8") as f:
+        resources = json.load(f)
+    checker = LinkChecker(concurrency=args.concurrency, per_domain=args.per_domain)
+    health = asyncio.run(checker.check([url for links in resources.values() for _, url in links],
+                                       refresh=args.refresh))
+    checker.save()
+    for key, links in resources.items():
+        for name, url in links:
+            if health.get(url) == "dead":
+                print(f"{key}: dead link {name} <{url}>")
+    print(json.dumps(checker.report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# utils/metrics.py
+"""
+In-process metrics: counters, histograms and gauges kept in plain dicts and
+rendered in the Prometheus text format on request. Recording is a dict
+lookup plus an add (and a bisect for histograms), so it stays on in
+production. Values owned by other objects (cache hit counters, sync
+progress) are read through callbacks at scrape time instead of being
+recorded on the hot path.
+"""
+import bisect
+import logging
+import os
+import time
+from aiohttp import web
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# 0 disables the HTTP endpoint; !stats keeps working either way
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+PREFIX = "dsabot_"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HTTP_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_metrics = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = tuple(labels)
+        _metrics.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_label_text(self.labels, values)} {value:g}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        return dict(self._values)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+
+class Callback(_Metric):
+    """A counter or gauge whose samples come from fn() -> {label tuple: value}."""
+
+    def __init__(self, name, help, fn, labels=(), kind="gauge"):
+        super().__init__(name, help, labels)
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self):
+        try:
+            values = self.fn()
+        except Exception as e:
+            logging.error(f"Metric callback {self.name} failed: {e}")
+            return {}
+        return values if isinstance(values, dict) else {(): values}
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def summary(self, *labels):
+        """count, mean, p50, p95 and p99 for one series, or None if it has no samples."""
+        series = self._series.get(labels)
+        if not series or not series[2]:
+            return None
+        counts, total, count = series
+        return {"count": count, "mean": total / count,
+                "p50": self._quantile(counts, count, 0.5),
+                "p95": self._quantile(counts, count, 0.95),
+                "p99": self._quantile(counts, count, 0.99)}
+
+    def _quantile(self, counts, count, q):
+        # Linear interpolation inside the bucket holding the q-th sample
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def series(self):
+        return list(self._series)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_label_text(names, labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, labels)} {total:g}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, labels)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics shared by several modules ---
+command_seconds = Histogram("command_seconds", "Time spent handling a command", ("command",))
+commands_total = Counter("commands_total", "Commands handled, by outcome", ("command", "outcome"))
+http_seconds = Histogram("http_request_seconds", "Outbound HTTP request duration per attempt", ("host",),
+                         buckets=HTTP_BUCKETS)
+http_responses = Counter("http_responses_total", "Outbound HTTP attempts by status (\"error\" for network failures)",
+                         ("host", "status"))
+_started_at = time.time()
+Callback("uptime_seconds", "Seconds since the process started", lambda: time.time() - _started_at)
+
+
+async def _handle_metrics(request):
+    return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_server(host=METRICS_HOST, port=METRICS_PORT):
+    """
+    Serves /metrics on host:port; returns the runner (None when disabled).
+    If the port can't be bound (another shard or a leftover process holds
+    it), the bot keeps running without the endpoint.
+    """
+    if not port:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        logging.error(f"Could not serve metrics on {host}:{port} ({e}); continuing without the endpoint")
+        await runner.cleanup()
+        return None
+    logging.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
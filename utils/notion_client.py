@@ -1,11 +1,12 @@
 # utils/notion_client.py - NOW WITH RETRIES
 import os
-import requests
-from requests.adapters import HTTPAdapter, Retry
+import hashlib
 from bs4 import BeautifulSoup
 import logging
 import re
 import json
+from .http_client import client as http_client
+from .snapshots import DATA_DIR, atomic_write_json
 
 # ... (format_notion_id function is the same) ...
 def format_notion_id(notion_id):
@@ -15,72 +16,211 @@ def format_notion_id(notion_id):
     return f"{clean_id[:8]}-{clean_id[8:12]}-{clean_id[12:16]}-{clean_id[16:20]}-{clean_id[20:]}"
 
 
+# Overridable so the benchmarks can point the scraper at a local stub
+NOTION_API_BASE = os.getenv("NOTION_API_BASE", "https://www.notion.so")
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
-def get_topics_from_public_page(notion_public_url):
+# Block types that start a new section rather than naming a topic
+HEADER_TYPES = {"header", "sub_header", "sub_sub_header"}
+CHUNK_LIMIT = 100
+MAX_CHUNKS = 200
+STATE_FILE = DATA_DIR / "notion_state.json"
+
+
+class NotionTopic:
+    __slots__ = ("title", "category", "block_id")
+
+    def __init__(self, title, category, block_id):
+        self.title = title
+        self.category = category  # Text of the section header (or toggle) the topic sits under
+        self.block_id = block_id
+
+
+def _page_id(notion_public_url):
+    match = re.search(r'([a-f0-9]{32})', notion_public_url)
+    if not match:
+        match = re.search(r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})', notion_public_url)
+    return match.group(1).replace('-', '') if match else None
+
+
+def _block_value(record):
+    value = record.get("value") or {}
+    # Newer responses wrap the block one level deeper
+    if "type" not in value and isinstance(value.get("value"), dict):
+        value = value["value"]
+    return value
+
+
+def _block_text(value):
+    segments = (value.get("properties") or {}).get("title") or []
+    full_text = "".join(segment[0] for segment in segments if segment)
+    return re.sub(r'^\d+\.\s*', '', full_text).strip()
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class PageStream:
+    """
+    Streams the topics of a public Notion page in page order. Chunks are
+    requested with loadPageChunk until the cursor is exhausted, and topics are
+    yielded as soon as every block before them has arrived, so callers can
+    start work while later chunks download.
+
+        stream = PageStream(url, load_state())
+        async for topic in stream:
+            ...
+        stream.complete, stream.unchanged, stream.truncated, stream.content_hash
+
+    Header blocks (and toggles with children) become the category of the
+    topics under them. If the page's last_edited_time matches the saved state,
+    the saved topic list is replayed without fetching further chunks.
+    """
+
+    def __init__(self, notion_public_url, state=None):
+        self.url = notion_public_url
+        self.state = state
+        self.page_id = _page_id(notion_public_url)
+        self.complete = False   # Every chunk was fetched (or the saved list replayed)
+        self.unchanged = False  # Same content as the saved state
+        self.truncated = False  # Stopped at MAX_CHUNKS with more of the page left
+        self.content_hash = None
+        self.last_edited_time = None
+        self.chunks = 0
+        self.topics = []
+
+    async def _chunks(self):
+        cursor = {"stack": []}
+        for chunk_number in range(MAX_CHUNKS):
+            payload = {
+                "pageId": format_notion_id(self.page_id),
+                "limit": CHUNK_LIMIT,
+                "cursor": cursor,
+                "chunkNumber": chunk_number,
+                "verticalColumns": False
+            }
+            # Retries with backoff on 429/5xx are handled by the shared HTTP client
+            response = await http_client.post_json(f"{NOTION_API_BASE}/api/v3/loadPageChunk", payload,
+                                                   headers=HEADERS, timeout=30, retries=3)
+            data = response.json()
+            self.chunks += 1
+            yield data.get("recordMap", {}).get("block", {})
+            cursor = data.get("cursor") or {}
+            if not cursor.get("stack"):
+                return
+        self.truncated = True
+        logging.warning(f"Stopped reading Notion page after {MAX_CHUNKS} chunks")
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        if not self.page_id:
+            raise ValueError("Could not find a valid Notion page ID in the URL.")
+        root_id = format_notion_id(self.page_id)
+        digest = hashlib.sha256()
+        blocks = {}
+        stack = None  # Frames of [child ids, next position, current category]
+
+        def emit(topic):
+            digest.update(f"{topic.category}\x1f{topic.title}\x1e".encode("utf-8"))
+            self.topics.append(topic)
+            return topic
+
+        def walk(final):
+            # Depth-first over the page's content, pausing at the first block not downloaded yet
+            while stack:
+                frame = stack[-1]
+                ids, position, category = frame
+                if position >= len(ids):
+                    stack.pop()
+                    continue
+                value = blocks.get(ids[position])
+                if value is None and not final:
+                    return
+                frame[1] += 1
+                if value is None or value.get("alive") is False:
+                    continue
+                block_type = value.get("type")
+                text = _block_text(value)
+                children = value.get("content") or []
+                if block_type in HEADER_TYPES:
+                    frame[2] = text or category
+                    continue
+                if block_type == "toggle" and children:
+                    stack.append([children, 0, text or category])
+                    continue
+                if is_likely_dsa_topic(text):
+                    yield emit(NotionTopic(text, category, ids[position]))
+                if children and block_type != "page":
+                    stack.append([children, 0, category])
+
+        async for chunk in self._chunks():
+            for block_id, record in chunk.items():
+                blocks[block_id] = _block_value(record)
+
+            if stack is None and root_id in blocks:
+                root = blocks[root_id]
+                self.last_edited_time = root.get("last_edited_time")
+                state = self.state
+                if (state and state.get("page_id") == self.page_id and self.last_edited_time
+                        and state.get("last_edited_time") == self.last_edited_time and state.get("topics")):
+                    # Nothing was edited since the last run: replay the saved list
+                    logging.info("Notion page unchanged since the last sync; using the saved topic list.")
+                    for title, category in state["topics"]:
+                        yield emit(NotionTopic(title, category, None))
+                    self.content_hash = state.get("content_hash")
+                    self.complete = self.unchanged = True
+                    return
+                stack = [[root.get("content") or [], 0, None]]
+
+            if stack is not None:
+                for topic in walk(final=False):
+                    yield topic
+
+        if stack is None:
+            # No page block came back: fall back to every titled block in response order
+            stack = [[[block_id for block_id, value in blocks.items() if value.get("type") != "page"], 0, None]]
+        for topic in walk(final=True):
+            yield topic
+
+        # A truncated read is missing topics, so it mustn't be saved as the page's content
+        self.complete = not self.truncated
+        self.content_hash = digest.hexdigest()
+        self.unchanged = bool(self.complete and self.state and self.state.get("content_hash") == self.content_hash)
+        logging.info(f"Read {len(self.topics)} topics from {self.chunks} Notion chunk(s)"
+                     + (" (content unchanged)" if self.unchanged else ""))
+
+    def save_state(self):
+        """Remembers a complete read so the next sync can skip an unedited page."""
+        if not self.complete:
+            return
+        atomic_write_json(STATE_FILE, {
+            "page_id": self.page_id,
+            "last_edited_time": self.last_edited_time,
+            "content_hash": self.content_hash,
+            "topics": [[t.title, t.category] for t in self.topics],
+        }, indent=2)
+
+
+async def get_topics_from_public_page(notion_public_url):
     """
     Scrapes a public Notion page by mimicking the internal API call it uses
-    to load its content. This is more reliable than parsing raw HTML.
+    to load its content. Returns the topic titles in page order, or None.
     """
     try:
         logging.info(f"Attempting robust scrape of public Notion page: {notion_public_url}")
-        
-        page_id_match = re.search(r'([a-f0-9]{32})', notion_public_url)
-        if not page_id_match:
-            page_id_match = re.search(r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})', notion_public_url)
-        
-        if not page_id_match:
-            logging.error("Could not find a valid Notion page ID in the URL.")
-            return None
-
-        page_id = page_id_match.group(1).replace('-', '')
-        logging.info(f"Extracted page ID: {page_id}")
-
-        api_url = "https://www.notion.so/api/v3/loadPageChunk"
-        
-        payload = {
-            "pageId": format_notion_id(page_id),
-            "limit": 100,
-            "cursor": {"stack": []},
-            "chunkNumber": 0,
-            "verticalColumns": False
-        }
-        
-        # --- NEW: Retry Logic ---
-        session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        session.mount('https://', HTTPAdapter(max_retries=retries))
-        # --- END: Retry Logic ---
-
-        session.headers.update(HEADERS)
-        
-        # Increased timeout to 30 seconds
-        response = session.post(api_url, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        blocks = data.get("recordMap", {}).get("block", {})
-        
-        if not blocks:
-            logging.error("No content blocks found in the API response.")
-            return None
-            
-        topics = []
-        for block_id, block_value in blocks.items():
-            if 'properties' in block_value.get('value', {}):
-                properties = block_value['value']['properties']
-                if 'title' in properties:
-                    text_segments = properties['title']
-                    full_text = "".join(segment[0] for segment in text_segments if segment)
-                    cleaned_text = re.sub(r'^\d+\.\s*', '', full_text).strip()
-                    if is_likely_dsa_topic(cleaned_text):
-                        topics.append(cleaned_text)
-
+        topics = [topic.title async for topic in PageStream(notion_public_url)]
         logging.info(f"Extracted {len(topics)} potential topics using the internal API method.")
         return topics if topics else None
-        
     except Exception as e:
         logging.error(f"Failed to parse public Notion page with robust method: {e}", exc_info=True)
         return None
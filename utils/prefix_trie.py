@@ -0,0 +1,67 @@
+# utils/prefix_trie.py
+import re
+from .topic_index import normalize
+
+# Discord shows at most 25 autocomplete choices
+MAX_CHOICES = 25
+# Prefixes longer than this are matched by filtering the deepest node's keys
+MAX_DEPTH = 24
+_KEYS = ""  # Children are keyed by single characters, so the empty string can't collide
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class PrefixTrie:
+    """
+    Completes partially typed topic names. Every node keeps the first
+    MAX_CHOICES keys below it, so a lookup walks len(prefix) nodes and
+    returns a precomputed list. Whole names are inserted before the names'
+    later words ("tree" -> "Segment Tree"), so topics that start with the
+    prefix rank first, each group in page order.
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (key, title), as for TopicIndex
+        self.root = {_KEYS: []}
+        self.names = {}
+        words = []
+        for key, title in entries:
+            if key in self.names:
+                continue
+            names = {normalize(key)}
+            if title:
+                names.add(normalize(title))
+            names.discard("")
+            self.names[key] = names
+            for name in names:
+                self._insert(name, key)
+            parts = _WORD.findall((title or key).lower())
+            words.extend(("".join(parts[i:]), key) for i in range(1, len(parts)))
+        for suffix, key in words:
+            self._insert(suffix, key)
+
+    def _insert(self, name, key):
+        node = self.root
+        for ch in name[:MAX_DEPTH]:
+            keys = node[_KEYS]
+            if len(keys) < MAX_CHOICES and key not in keys:
+                keys.append(key)
+            node = node.setdefault(ch, {_KEYS: []})
+        keys = node[_KEYS]
+        if len(keys) < MAX_CHOICES and key not in keys:
+            keys.append(key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def complete(self, prefix, limit=MAX_CHOICES):
+        """Keys of topics whose name, or a later word of it, starts with prefix."""
+        q = normalize(prefix)
+        node = self.root
+        for ch in q[:MAX_DEPTH]:
+            node = node.get(ch)
+            if node is None:
+                return []
+        keys = node[_KEYS]
+        if len(q) > MAX_DEPTH:
+            keys = [k for k in keys if any(q in name for name in self.names[k])]
+        return keys[:limit]
@@ -0,0 +1,311 @@
+# utils/problem_catalog.py
+"""
+Local copy of the LeetCode problem list. The periodic updater downloads the
+whole catalog once a day; !challenge then picks from in-memory indexes
+instead of making a GraphQL request per command.
+"""
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+import asyncio
+import re
+from difflib import get_close_matches
+from .snapshots import DATA_DIR, atomic_write_json
+from .http_client import client as http_client
+
+CATALOG_FILE = DATA_DIR / "leetcode_catalog.json"
+CATALOG_MAX_AGE_HOURS = float(os.getenv("CATALOG_MAX_AGE_HOURS", "24"))
+LEETCODE_GRAPHQL_URL = os.getenv("LEETCODE_GRAPHQL_URL", "https://leetcode.com/graphql/")
+PAGE_SIZE = 100
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+LEETCODE_HEADERS = {"Content-Type": "application/json", "User-Agent": "Mozilla/5.0"}
+TAG_URL_PATTERN = re.compile(r"leetcode\.com/tag/([a-z0-9-]+)")
+PROBLEM_URL_PATTERN = re.compile(r"leetcode\.com/problems/([a-z0-9-]+)")
+
+CATALOG_QUERY = """
+query problemsetQuestionList($limit: Int!, $skip: Int!) {
+  problemsetQuestionList: questionList(
+    categorySlug: ""
+    limit: $limit
+    skip: $skip
+    filters: {}
+  ) {
+    total: totalNum
+    questions: data {
+      acRate
+      difficulty
+      title
+      titleSlug
+      paidOnly: isPaidOnly
+      topicTags { slug }
+    }
+  }
+}
+"""
+
+# Row layout in the compact on-disk format
+SLUG, TITLE, DIFFICULTY, PAID, AC_RATE, TAGS = range(6)
+
+
+def _bits(ids):
+    mask = 0
+    for i in ids:
+        mask |= 1 << i
+    return mask
+
+
+def _nth_set_bit(mask, n):
+    """Position of the n-th (0-based) set bit, scanning 64 bits at a time."""
+    base = 0
+    while mask:
+        chunk = mask & 0xFFFFFFFFFFFFFFFF
+        count = chunk.bit_count()
+        if n < count:
+            for _ in range(n):
+                chunk &= chunk - 1  # Clear the lowest set bit
+            return base + (chunk & -chunk).bit_length() - 1
+        n -= count
+        mask >>= 64
+        base += 64
+    raise IndexError("bit index out of range")
+
+
+class ProblemCatalog:
+    """
+    Problems stored as compact rows plus index lists built at load time, so
+    picking a random problem from any index is a single random.choice().
+    Each facet also has a bitset (an int with bit i set for row i), so
+    combined filters are a few integer ANDs.
+    """
+
+    def __init__(self, rows=(), tags=(), fetched_at=None):
+        self.rows = list(rows)
+        self.tags = list(tags)
+        self.fetched_at = fetched_at
+        self.free = [i for i, row in enumerate(self.rows) if not row[PAID]]
+        self.by_slug = {row[SLUG]: i for i, row in enumerate(self.rows)}
+        self.by_difficulty = {name: [] for name in DIFFICULTIES}
+        self.by_tag = {tag: [] for tag in self.tags}
+        for i, row in enumerate(self.rows):
+            self.by_difficulty[DIFFICULTIES[row[DIFFICULTY]]].append(i)
+            for tag in row[TAGS]:
+                self.by_tag[self.tags[tag]].append(i)
+        # Row ids ordered by acceptance rate, for range queries on acceptance
+        self.by_acceptance = sorted(range(len(self.rows)), key=lambda i: self.rows[i][AC_RATE])
+
+        self.all_bits = (1 << len(self.rows)) - 1
+        self.free_bits = _bits(self.free)
+        self.difficulty_bits = {name: _bits(ids) for name, ids in self.by_difficulty.items()}
+        self.tag_bits = {tag: _bits(ids) for tag, ids in self.by_tag.items()}
+        # min_ac_bits[p] = problems with acceptance >= p%, built by sweeping from the top
+        self.min_ac_bits = [0] * 101
+        mask = 0
+        position = len(self.by_acceptance)
+        for threshold in range(100, -1, -1):
+            while position > 0 and self.rows[self.by_acceptance[position - 1]][AC_RATE] >= threshold:
+                position -= 1
+                mask |= 1 << self.by_acceptance[position]
+            self.min_ac_bits[threshold] = mask
+
+    def __len__(self):
+        return len(self.rows)
+
+    def problem(self, i):
+        row = self.rows[i]
+        return {
+            "id": i,
+            "title": row[TITLE],
+            "slug": row[SLUG],
+            "difficulty": DIFFICULTIES[row[DIFFICULTY]],
+            "paid": bool(row[PAID]),
+            "ac_rate": row[AC_RATE],
+            "tags": [self.tags[t] for t in row[TAGS]],
+            "url": f"https://leetcode.com/problems/{row[SLUG]}/",
+        }
+
+    def random_problem(self):
+        """A random free problem (any problem if the catalog has no free ones)."""
+        if self.free:
+            return self.problem(random.choice(self.free))
+        return self.problem(random.randrange(len(self.rows))) if self.rows else None
+
+    def match(self, difficulty=None, tag=None, min_ac=None, include_paid=False, exclude=0):
+        """Bitset of the problems that pass every given filter and aren't in exclude."""
+        mask = (self.all_bits if include_paid else self.free_bits) & ~exclude
+        if difficulty:
+            mask &= self.difficulty_bits.get(difficulty, 0)
+        if tag:
+            mask &= self.tag_bits.get(tag, 0)
+        if min_ac and not math.isnan(min_ac):
+            # Clamp before converting so infinite or out-of-range thresholds can't escape the table
+            mask &= self.min_ac_bits[int(math.ceil(max(0.0, min(100.0, min_ac))))]
+        return mask
+
+    def pick(self, difficulty=None, tag=None, min_ac=None, include_paid=False, exclude=0):
+        """A uniformly random problem matching the filters, or None."""
+        mask = self.match(difficulty, tag, min_ac, include_paid, exclude)
+        count = mask.bit_count()
+        if not count:
+            return None
+        return self.problem(_nth_set_bit(mask, random.randrange(count)))
+
+    def sample(self, tag, per_difficulty=1):
+        """A few free problems for a tag, spread across difficulties."""
+        picks = []
+        for difficulty in DIFFICULTIES:
+            mask = self.match(difficulty, tag)
+            count = mask.bit_count()
+            for n in random.sample(range(count), min(per_difficulty, count)):
+                picks.append(self.problem(_nth_set_bit(mask, n)))
+        return picks
+
+    def bits(self, slugs):
+        """Bitset of the problems with the given slugs; slugs not in the catalog are skipped."""
+        return _bits(self.by_slug[slug] for slug in slugs if slug in self.by_slug)
+
+    def find(self, text):
+        """Row id of a problem given its URL, slug or title, or None."""
+        match = PROBLEM_URL_PATTERN.search(text)
+        slug = match.group(1) if match else "-".join(re.findall(r"[a-z0-9]+", text.lower()))
+        return self.by_slug.get(slug)
+
+    def resolve_tag(self, text):
+        """Maps user input like 'Dynamic Programming' or 'graphs' to a catalog tag slug."""
+        slug = "-".join(text.lower().replace("_", " ").split())
+        for candidate in (slug, slug.rstrip("s"), slug[:-2] if slug.endswith("es") else None):
+            if candidate and candidate in self.tag_bits:
+                return candidate
+        close = get_close_matches(slug, self.tags, n=1, cutoff=0.75)
+        if close:
+            return close[0]
+        # Multi-word topics like "graph-algorithms": fall back to a word that is a tag
+        for word in slug.split("-"):
+            for candidate in (word, word.rstrip("s")):
+                if len(candidate) > 2 and candidate in self.tag_bits:
+                    return candidate
+        return None
+
+    def tag_for_topic(self, key, info=None):
+        """
+        The LeetCode tag matching a DSA topic, read from the tag page the AI
+        linked to (https://leetcode.com/tag/<slug>/) or guessed from the key.
+        """
+        for _, url in (info or {}).get("links", []):
+            match = TAG_URL_PATTERN.search(url or "")
+            if match and match.group(1) in self.tag_bits:
+                return match.group(1)
+        return self.resolve_tag(key)
+
+    def to_json(self):
+        return {"version": 1, "fetched_at": self.fetched_at, "difficulties": DIFFICULTIES,
+                "tags": self.tags, "problems": self.rows}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["problems"], data["tags"], data.get("fetched_at"))
+
+    @classmethod
+    def from_questions(cls, questions, fetched_at=None):
+        """Builds a catalog from raw GraphQL question dicts."""
+        tag_ids = {}
+        rows = []
+        for q in questions:
+            if q.get("difficulty") not in DIFFICULTIES or not q.get("titleSlug"):
+                continue
+            tags = [tag_ids.setdefault(t["slug"], len(tag_ids)) for t in q.get("topicTags") or []]
+            rows.append([q["titleSlug"], q.get("title", q["titleSlug"]), DIFFICULTIES.index(q["difficulty"]),
+                         1 if q.get("paidOnly") else 0, round(float(q.get("acRate") or 0), 1), tags])
+        return cls(rows, list(tag_ids), fetched_at)
+
+
+async def fetch_catalog(page_size=PAGE_SIZE, pause=0.5):
+    """Downloads every problem, page by page, until LeetCode's reported total."""
+    questions = []
+    total = None
+    while total is None or len(questions) < total:
+        payload = {"query": CATALOG_QUERY, "variables": {"limit": page_size, "skip": len(questions)}}
+        response = await http_client.post_json(LEETCODE_GRAPHQL_URL, payload, headers=LEETCODE_HEADERS,
+                                               timeout=30, retries=3)
+        page = response.json().get("data", {}).get("problemsetQuestionList") or {}
+        total = page.get("total") or 0
+        batch = page.get("questions") or []
+        if not batch:
+            break
+        questions.extend(batch)
+        if pause:
+            await asyncio.sleep(pause)
+    logging.info(f"Fetched {len(questions)} LeetCode problems (reported total {total})")
+    return ProblemCatalog.from_questions(questions, time.time())
+
+
+_catalog = ProblemCatalog()
+_signature = None
+_lock = threading.Lock()
+
+
+def current():
+    """The catalog currently in memory; empty until one has been loaded."""
+    return _catalog
+
+
+def publish(catalog, signature=None):
+    global _catalog, _signature
+    with _lock:
+        _catalog, _signature = catalog, signature
+    logging.info(f"Loaded LeetCode catalog with {len(catalog)} problems ({len(catalog.free)} free)")
+    return catalog
+
+
+def _file_signature():
+    try:
+        st = CATALOG_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def load():
+    signature = _file_signature()
+    if signature is None:
+        return None
+    try:
+        with open(CATALOG_FILE, "r", encoding="utf-8") as f:
+            catalog = ProblemCatalog.from_json(json.load(f))
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        logging.warning(f"Could not load LeetCode catalog: {e}")
+        return None
+    return publish(catalog, signature)
+
+
+def refresh_if_changed():
+    signature = _file_signature()
+    if signature is None or signature == _signature:
+        return None
+    return load()
+
+
+async def update_problem_catalog(force=False):
+    """Re-downloads the catalog if it is missing or older than CATALOG_MAX_AGE_HOURS."""
+    if not current().rows:
+        await asyncio.to_thread(load)
+    fetched_at = current().fetched_at
+    if not force and fetched_at and time.time() - fetched_at < CATALOG_MAX_AGE_HOURS * 3600:
+        logging.info("LeetCode catalog is fresh. Skipping download.")
+        return False
+
+    try:
+        catalog = await fetch_catalog()
+    except Exception as e:
+        logging.error(f"Failed to download LeetCode catalog: {e}")
+        return False
+    if not catalog.rows:
+        logging.warning("LeetCode returned an empty catalog; keeping the current one.")
+        return False
+
+    await asyncio.to_thread(atomic_write_json, CATALOG_FILE, catalog.to_json(), separators=(",", ":"))
+    publish(catalog, _file_signature())
+    return True
@@ -0,0 +1,368 @@
+# utils/progress_store.py
+"""
+Per-guild record of the LeetCode problems each user was served by
+!challenge and marked solved, with daily solve streaks and per-tag counts.
+
+Writes are queued in memory and committed by one background task every
+PROGRESS_FLUSH_SECONDS, so a burst of commands shares one transaction (and
+one fsync) instead of each waiting on its own. The problems a user has seen
+are also kept in memory as a bitset over the current catalog, the same shape
+as ProblemCatalog's filters, so !challenge skips them with a single AND.
+
+    python -m utils.progress_store stats
+    python -m utils.progress_store user --guild 123 --user 456
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from . import metrics
+
+PROGRESS_DB_PATH = Path(os.getenv("PROGRESS_DB_PATH", "data/progress.sqlite3"))
+# Queued writes are committed together at most this long after the first one
+PROGRESS_FLUSH_SECONDS = float(os.getenv("PROGRESS_FLUSH_SECONDS", "0.25"))
+# A batch whose commit fails is retried this many times (backing off) before it is dropped
+PROGRESS_COMMIT_RETRIES = int(os.getenv("PROGRESS_COMMIT_RETRIES", "5"))
+# Users whose seen-sets stay in memory; the least recently active are reloaded from disk
+PROGRESS_USERS_MAX = int(os.getenv("PROGRESS_USERS_MAX", "10000"))
+DAY_SECONDS = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    guild_id  INTEGER NOT NULL,
+    user_id   INTEGER NOT NULL,
+    slug      TEXT NOT NULL,
+    served    INTEGER NOT NULL DEFAULT 0,
+    served_at REAL,
+    solved_at REAL,
+    PRIMARY KEY (guild_id, user_id, slug)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS users (
+    guild_id        INTEGER NOT NULL,
+    user_id         INTEGER NOT NULL,
+    served          INTEGER NOT NULL DEFAULT 0,
+    solved          INTEGER NOT NULL DEFAULT 0,
+    streak          INTEGER NOT NULL DEFAULT 0,
+    best_streak     INTEGER NOT NULL DEFAULT 0,
+    last_solved_day INTEGER,
+    PRIMARY KEY (guild_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tags (
+    guild_id INTEGER NOT NULL,
+    user_id  INTEGER NOT NULL,
+    tag      TEXT NOT NULL,
+    served   INTEGER NOT NULL DEFAULT 0,
+    solved   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id, tag)
+) WITHOUT ROWID;
+"""
+
+commit_seconds = metrics.Histogram("progress_commit_seconds", "Time to commit one batch of progress writes")
+progress_ops = metrics.Counter("progress_writes_total", "Progress writes committed, by kind", ("kind",))
+
+
+def current_streak(streak, last_solved_day, now=None):
+    """A streak only counts while its last solve was today or yesterday."""
+    today = int((now or time.time()) // DAY_SECONDS)
+    return streak if last_solved_day is not None and last_solved_day >= today - 1 else 0
+
+
+class _Seen:
+    __slots__ = ("slugs", "last", "catalog", "bits")
+
+    def __init__(self, slugs, last):
+        self.slugs = slugs
+        self.last = last      # Slug of the most recently served problem
+        self.catalog = None   # Catalog the bitset was built against; row ids change between downloads
+        self.bits = 0
+
+    def add(self, slug):
+        self.slugs.add(slug)
+        if self.catalog is not None and slug in self.catalog.by_slug:
+            self.bits |= 1 << self.catalog.by_slug[slug]
+
+
+class ProgressStore:
+    def __init__(self, path=PROGRESS_DB_PATH, flush_seconds=PROGRESS_FLUSH_SECONDS, max_users=PROGRESS_USERS_MAX):
+        self.path = Path(path)
+        self.flush_seconds = flush_seconds
+        self.max_users = max_users
+        self._seen = OrderedDict()  # (guild id, user id) -> _Seen
+        self._pending = []          # (op, future or None) waiting for the next commit
+        self._committing = []       # Ops of the commit in progress
+        self._failures = 0          # Commits failed in a row
+        self._lock = threading.Lock()
+        self._conn = None
+        self._loop = None
+        self._flush_lock = None
+        self._task = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # Shard processes share the file; wait for another one's commit rather than fail
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._flush_lock, self._task = loop, asyncio.Lock(), None
+
+    # --- Seen-sets ---
+
+    def _load_seen(self, guild_id, user_id):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT slug, served_at FROM problems WHERE guild_id=? AND user_id=?", (guild_id, user_id)).fetchall()
+        last = max(rows, key=lambda row: row[1] or 0)[0] if rows else None
+        return _Seen({slug for slug, _ in rows}, last)
+
+    async def _state(self, guild_id, user_id):
+        key = (guild_id, user_id)
+        state = self._seen.get(key)
+        if state is not None:
+            self._seen.move_to_end(key)
+            return state
+        state = await asyncio.to_thread(self._load_seen, guild_id, user_id)
+        if key in self._seen:
+            # Another command loaded it while this one was reading
+            return self._seen[key]
+        # Writes not committed yet aren't on disk; their slugs are still seen
+        for op, _ in self._committing + self._pending:
+            if op[1] == guild_id and op[2] == user_id:
+                state.add(op[3])
+                if op[0] == "served":
+                    state.last = op[3]
+        self._seen[key] = state
+        if len(self._seen) > self.max_users:
+            self._seen.popitem(last=False)
+        return state
+
+    async def seen(self, guild_id, user_id, catalog):
+        """Bitset over catalog of the problems this user was served or solved."""
+        state = await self._state(guild_id, user_id)
+        if state.catalog is not catalog:
+            state.catalog, state.bits = catalog, catalog.bits(state.slugs)
+        return state.bits
+
+    async def last_served(self, guild_id, user_id):
+        return (await self._state(guild_id, user_id)).last
+
+    # --- Writes ---
+
+    def _enqueue(self, op, future=None):
+        self._bind()
+        state = self._seen.get((op[1], op[2]))
+        if state is not None:
+            state.add(op[3])
+            if op[0] == "served":
+                state.last = op[3]
+        self._pending.append((op, future))
+        if self._task is None:
+            self._task = self._loop.create_task(self._flush_soon())
+
+    async def _flush_soon(self, delay=None):
+        await asyncio.sleep(self.flush_seconds if delay is None else delay)
+        self._task = None
+        await self.flush()
+
+    def _forget(self, ops):
+        # Drops the cached seen-sets these ops touched; the next read rebuilds
+        # them from disk plus whatever is still queued
+        for op in ops:
+            self._seen.pop((op[1], op[2]), None)
+
+    def served(self, guild_id, user_id, slug, tags=()):
+        """Records a problem shown to a user. Returns at once; the write is committed with the next batch."""
+        self._enqueue(("served", guild_id, user_id, slug, tuple(tags), time.time()))
+
+    async def solved(self, guild_id, user_id, slug, tags=()):
+        """
+        Marks a problem solved once it has been committed. Returns a dict with
+        new (False if it was already solved), solved, streak and best_streak.
+        """
+        self._bind()
+        future = self._loop.create_future()
+        self._enqueue(("solved", guild_id, user_id, slug, tuple(tags), time.time()), future)
+        return await future
+
+    async def flush(self):
+        """Commits every queued write in one transaction."""
+        self._bind()
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            self._committing = [op for op, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await asyncio.to_thread(self._write, self._committing)
+            except Exception as e:
+                self._committing = []
+                self._failed(batch, e)
+                return
+            self._committing = []
+            self._failures = 0
+            commit_seconds.observe(time.perf_counter() - started)
+            for (op, future), result in zip(batch, results):
+                progress_ops.inc(op[0])
+                if future is not None and not future.done():
+                    future.set_result(result)
+
+    def _failed(self, batch, error):
+        """
+        Handles a batch whose commit failed. Callers waiting on !solved get the
+        error; served writes, which nobody waits for, go back to the front of
+        the queue and are retried with backoff. Once the retries run out they
+        are dropped, and the seen-sets that already counted them are reloaded.
+        """
+        self._failures += 1
+        retry = self._failures <= PROGRESS_COMMIT_RETRIES
+        requeued = [(op, future) for op, future in batch if future is None and retry]
+        dropped = [op for op, future in batch if future is not None or not retry]
+        logging.error(f"Failed to save {len(batch)} progress updates ({error}); "
+                      + (f"retrying {len(requeued)}" if retry else "giving up"))
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_exception(error)
+        self._pending[:0] = requeued
+        self._forget(dropped)
+        if not retry:
+            self._failures = 0
+        if self._pending and self._task is None:
+            self._task = self._loop.create_task(self._flush_soon(self.flush_seconds * 2 ** self._failures))
+
+    def _write(self, ops):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                results = [self._apply(conn, *op) for op in ops]
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def _apply(self, conn, kind, guild_id, user_id, slug, tags, at):
+        conn.execute("INSERT INTO users (guild_id, user_id) VALUES (?, ?) ON CONFLICT DO NOTHING", (guild_id, user_id))
+        conn.executemany("INSERT INTO tags (guild_id, user_id, tag) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+                         [(guild_id, user_id, tag) for tag in tags])
+        if kind == "served":
+            conn.execute("INSERT INTO problems (guild_id, user_id, slug, served, served_at) VALUES (?, ?, ?, 1, ?) "
+                         "ON CONFLICT DO UPDATE SET served = served + 1, served_at = excluded.served_at",
+                         (guild_id, user_id, slug, at))
+            conn.execute("UPDATE users SET served = served + 1 WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+            conn.executemany("UPDATE tags SET served = served + 1 WHERE guild_id=? AND user_id=? AND tag=?",
+                             [(guild_id, user_id, tag) for tag in tags])
+            return None
+
+        new = conn.execute("INSERT INTO problems (guild_id, user_id, slug, solved_at) VALUES (?, ?, ?, ?) "
+                           "ON CONFLICT DO UPDATE SET solved_at = excluded.solved_at WHERE solved_at IS NULL",
+                           (guild_id, user_id, slug, at)).rowcount == 1
+        solved, streak, best, last_day = conn.execute(
+            "SELECT solved, streak, best_streak, last_solved_day FROM users WHERE guild_id=? AND user_id=?",
+            (guild_id, user_id)).fetchone()
+        if new:
+            day = int(at // DAY_SECONDS)
+            if last_day != day:
+                streak = streak + 1 if last_day == day - 1 else 1
+            solved, best, last_day = solved + 1, max(best, streak), day
+            conn.execute("UPDATE users SET solved=?, streak=?, best_streak=?, last_solved_day=? "
+                         "WHERE guild_id=? AND user_id=?", (solved, streak, best, last_day, guild_id, user_id))
+            conn.executemany("UPDATE tags SET solved = solved + 1 WHERE guild_id=? AND user_id=? AND tag=?",
+                             [(guild_id, user_id, tag) for tag in tags])
+        return {"new": new, "solved": solved, "streak": current_streak(streak, last_day, at), "best_streak": best}
+
+    # --- Reads ---
+
+    def _summary(self, guild_id, user_id, top_tags):
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT served, solved, streak, best_streak, last_solved_day FROM users "
+                               "WHERE guild_id=? AND user_id=?", (guild_id, user_id)).fetchone()
+            tags = conn.execute("SELECT tag, served, solved FROM tags WHERE guild_id=? AND user_id=? "
+                                "ORDER BY solved DESC, served DESC, tag LIMIT ?",
+                                (guild_id, user_id, top_tags)).fetchall()
+            recent = conn.execute("SELECT slug FROM problems WHERE guild_id=? AND user_id=? AND solved_at IS NOT NULL "
+                                  "ORDER BY solved_at DESC LIMIT 5", (guild_id, user_id)).fetchall()
+        served, solved, streak, best, last_day = row or (0, 0, 0, 0, None)
+        return {"served": served, "solved": solved, "streak": current_streak(streak, last_day),
+                "best_streak": best, "tags": tags, "recent": [slug for slug, in recent]}
+
+    async def summary(self, guild_id, user_id, top_tags=5):
+        """A user's totals, current and best streak, top tags and latest solves."""
+        await self.flush()
+        return await asyncio.to_thread(self._summary, guild_id, user_id, top_tags)
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            users, = conn.execute("SELECT COUNT(*) FROM users").fetchone()
+            guilds, = conn.execute("SELECT COUNT(DISTINCT guild_id) FROM users").fetchone()
+            served, solved = conn.execute(
+                "SELECT COALESCE(SUM(served), 0), COALESCE(SUM(solved), 0) FROM users").fetchone()
+        return {"path": str(self.path), "guilds": guilds, "users": users, "served": served, "solved": solved}
+
+    def pending(self):
+        return len(self._pending) + len(self._committing)
+
+    async def close(self):
+        """Commits whatever is queued; called on shutdown."""
+        if self._task is not None and self._task.get_loop() is asyncio.get_running_loop():
+            await self._task
+        await self.flush()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide store used by the challenge commands."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProgressStore()
+        return _store
+
+
+metrics.Callback("progress_pending_writes", "Progress writes queued for the next commit",
+                 lambda: _store.pending() if _store is not None else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the challenge progress store")
+    parser.add_argument("--path", default=str(PROGRESS_DB_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show totals")
+    user_parser = sub.add_parser("user", help="Show one user's progress")
+    user_parser.add_argument("--guild", type=int, required=True, help="Guild id (0 for DMs)")
+    user_parser.add_argument("--user", type=int, required=True)
+    args = parser.parse_args()
+
+    store = ProgressStore(args.path)
+    if args.command == "stats":
+        stats = store.stats()
+        print(f"{stats['path']}: {stats['users']} users in {stats['guilds']} guilds, "
+              f"{stats['served']} problems served, {stats['solved']} solved")
+    else:
+        summary = asyncio.run(store.summary(args.guild, args.user))
+        print(f"served {summary['served']}, solved {summary['solved']}, "
+              f"streak {summary['streak']} (best {summary['best_streak']})")
+        for tag, served, solved in summary["tags"]:
+            print(f"  {tag:30} {solved:>5} solved of {served} served")
+
+
+if __name__ == "__main__":
+    main()
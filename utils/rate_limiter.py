@@ -0,0 +1,91 @@
+# utils/rate_limiter.py
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate_per_minute` tokens are added continuously up to
+    `burst`. The effective rate can be lowered when the upstream pushes back
+    (slow_down) and creeps back up to the configured rate on success (recover).
+    """
+
+    def __init__(self, rate_per_minute, burst=1, min_fraction=0.05):
+        self.max_rate = rate_per_minute / 60.0
+        self.min_rate = self.max_rate * min_fraction
+        self.rate = self.max_rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Takes a token if one is available right now; never waits."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def available(self):
+        """Whether a token could be taken right now, without taking it."""
+        self._refill()
+        return self.tokens >= 1
+
+    def retry_after(self):
+        """Seconds until the next token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    async def acquire(self):
+        """Waits for a token. Waiters are served in arrival order."""
+        async with self._lock:
+            while not self.try_acquire():
+                await asyncio.sleep(self.retry_after())
+
+    def slow_down(self, factor=0.5):
+        """Multiplicative decrease after a 429 or 5xx."""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * factor)
+
+    def recover(self, step=0.1):
+        """Additive increase back towards the configured rate after a success."""
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate * step)
+
+    @property
+    def rate_per_minute(self):
+        return self.rate * 60.0
+
+
+class KeyedLimiter:
+    """
+    One token bucket per key (user id, channel id, ...). Only the most
+    recently used `max_keys` buckets are kept; an evicted key simply starts
+    again with a full bucket.
+    """
+
+    def __init__(self, rate_per_minute, burst, max_keys=10000):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    def bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate_per_minute, self.burst)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def __len__(self):
+        return len(self._buckets)
@@ -0,0 +1,203 @@
+# utils/record_schema.py
+"""
+Validation and normalization of stored topic entries, run by the updater on
+every AI response before it is stored and on older entries it carries over.
+A normalized entry renders without type checks: complexities are strings,
+links are (name, url) pairs on allowed https domains, and every field fits
+the Discord embed limits it is shown under.
+
+    python -m utils.record_schema check                      # report problems in data/dsa_topics.json
+    python -m utils.record_schema fix --dsa data/dsa_topics.json --resources data/resources.json
+"""
+import argparse
+import json
+import os
+import re
+from urllib.parse import urlsplit
+
+# Bumped when normalization changes, so carried-over entries are normalized again
+SCHEMA_VERSION = 1
+
+# Discord limits: embed title 256, field value 1024. Titles get an emoji
+# prefix and a link line is "🎥 [name](url)" with three to a field.
+TITLE_MAX = 200
+COMPLEXITY_MAX = 1024
+LINK_NAME_MAX = 80
+URL_MAX = 240
+MAX_LINKS = 8
+ALLOWED_LINK_DOMAINS = [d.strip().lower() for d in os.getenv(
+    "ALLOWED_LINK_DOMAINS",
+    "geeksforgeeks.org,youtube.com,youtu.be,leetcode.com,takeuforward.org,codeforces.com,cp-algorithms.com,"
+    "wikipedia.org,programiz.com,cppreference.com,cplusplus.com,hackerrank.com,hackerearth.com,visualgo.net,"
+    "khanacademy.org,brilliant.org,github.com,w3schools.com,interviewbit.com,topcoder.com,usaco.guide"
+).split(",") if d.strip()]
+
+_FENCE = re.compile(r"^\s*```[a-zA-Z+]*\s*$", re.M)
+
+
+class InvalidRecord(ValueError):
+    """An entry that can't be repaired and has to be generated again."""
+
+
+def complexity_text(value):
+    """
+    One canonical string for a complexity the model may have returned as a
+    string, a dict of operation -> bound, or a list. Each operation gets its
+    own line; anything nested under it stays on that line.
+    """
+    if isinstance(value, dict):
+        text = "\n".join(f"{op}: {_inline(bound)}" for op, bound in value.items())
+    elif isinstance(value, (list, tuple)):
+        text = "\n".join(_inline(v) for v in value)
+    else:
+        text = str(value or "").strip()
+    return text or "N/A"
+
+
+def _inline(value):
+    """A nested complexity on one line, e.g. "Best: O(1), Average: O(log n)"."""
+    if isinstance(value, dict):
+        parts = [f"{op}: {_grouped(bound)}" for op, bound in value.items()]
+    elif isinstance(value, (list, tuple)):
+        parts = [_grouped(v) for v in value]
+    else:
+        return str(value or "").strip() or "N/A"
+    return ", ".join(parts) or "N/A"
+
+
+def _grouped(value):
+    # Parenthesised when nested again, so it's clear which operation its parts belong to
+    text = _inline(value)
+    return f"({text})" if isinstance(value, (dict, list, tuple)) and len(value) > 1 else text
+
+
+def _clip(text, limit):
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def link_problem(url):
+    """Why a resource URL is rejected, or None."""
+    if not isinstance(url, str) or len(url) > URL_MAX:
+        return "not a short string"
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return "not an http(s) URL"
+    host = parts.hostname.lower()
+    if not any(host == d or host.endswith("." + d) for d in ALLOWED_LINK_DOMAINS):
+        return f"{host} is not an allowed domain"
+    return None
+
+
+def normalize_links(links):
+    """Returns ([(name, url)], [problems]) keeping only well-formed allowed links."""
+    kept, problems, seen = [], [], set()
+    for link in links or []:
+        if isinstance(link, dict):
+            name, url = link.get("name"), link.get("url")
+        elif isinstance(link, (list, tuple)) and len(link) == 2:
+            name, url = link
+        else:
+            problems.append(f"malformed link {link!r:.60}")
+            continue
+        problem = link_problem(url)
+        if problem:
+            problems.append(f"dropped link {str(url)[:80]}: {problem}")
+            continue
+        url = url.strip()
+        if url in seen:
+            continue
+        seen.add(url)
+        # Brackets would end the markdown link early
+        name = re.sub(r"[\[\]]", "", str(name or "").strip()) or urlsplit(url).hostname
+        kept.append((_clip(name, LINK_NAME_MAX), url))
+    if len(kept) > MAX_LINKS:
+        problems.append(f"kept the first {MAX_LINKS} of {len(kept)} links")
+        kept = kept[:MAX_LINKS]
+    return kept, problems
+
+
+def normalize_entry(entry):
+    """
+    Returns (normalized copy, [fixes applied]) for a stored DSA entry.
+    Raises InvalidRecord if it lacks a title, description or code.
+    """
+    fixes = []
+    record = dict(entry)
+
+    title = str(record.get("title") or "").strip()
+    short = str(record.get("short") or "").strip()
+    code = record.get("code")
+    missing = [name for name, value in (("title", title), ("short", short)) if not value]
+    if not isinstance(code, str) or not code.strip():
+        missing.append("code")
+    if missing:
+        raise InvalidRecord(f"missing {', '.join(missing)}")
+
+    if len(title) > TITLE_MAX:
+        fixes.append("title clipped")
+    record["title"] = _clip(title, TITLE_MAX)
+    record["short"] = short
+
+    for field in ("time", "space"):
+        value = record.get(field)
+        text = _clip(complexity_text(value), COMPLEXITY_MAX)
+        if text != value:
+            fixes.append(f"{field} normalized")
+        record[field] = text
+
+    # The commands wrap the code in their own fences
+    stripped = _FENCE.sub("", code).strip("\n")
+    if stripped != code.strip("\n"):
+        fixes.append("code fences removed")
+    record["code"] = stripped
+
+    links, problems = normalize_links(record.get("links"))
+    fixes.extend(problems)
+    record["links"] = links
+
+    meta = dict(record.get("meta") or {})
+    meta["schema"] = SCHEMA_VERSION
+    record["meta"] = meta
+    return record, fixes
+
+
+def is_normalized(entry):
+    return (entry.get("meta") or {}).get("schema") == SCHEMA_VERSION
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or normalize stored topic entries")
+    parser.add_argument("command", choices=["check", "fix"])
+    parser.add_argument("--dsa", default="data/dsa_topics.json")
+    parser.add_argument("--resources", default="data/resources.json")
+    args = parser.parse_args()
+
+    with open(args.dsa, "r", encoding="utf-8") as f:
+        dsa = json.load(f)
+    normalized, invalid = {}, 0
+    for key, entry in dsa.items():
+        try:
+            normalized[key], fixes = normalize_entry(entry)
+        except InvalidRecord as e:
+            print(f"{key}: INVALID ({e})")
+            normalized[key] = entry
+            invalid += 1
+            continue
+        for fix in fixes:
+            print(f"{key}: {fix}")
+    print(f"{len(dsa)} entries, {invalid} invalid")
+
+    if args.command == "fix":
+        with open(args.dsa, "w", encoding="utf-8") as f:
+            json.dump(normalized, f, indent=2, ensure_ascii=False)
+        with open(args.resources, "r", encoding="utf-8") as f:
+            resources = json.load(f)
+        for key, entry in normalized.items():
+            if key in resources:
+                resources[key] = [list(link) for link in entry.get("links", [])]
+        with open(args.resources, "w", encoding="utf-8") as f:
+            json.dump(resources, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
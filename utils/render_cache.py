@@ -0,0 +1,107 @@
+# utils/render_cache.py
+import logging
+import threading
+import time
+from . import metrics
+
+_caches = []
+_warming = []  # Background warm threads, so callers can wait for them
+
+
+def caches():
+    """Every RenderCache created so far, for reporting."""
+    return list(_caches)
+
+
+def wait_for_warming(timeout=None):
+    """Blocks until background warms started so far have finished (benchmarks use this)."""
+    while _warming:
+        _warming.pop().join(timeout)
+
+
+def _cache_requests():
+    samples = {}
+    for cache in _caches:
+        samples[(cache.name, "hit")] = cache.hits
+        samples[(cache.name, "miss")] = cache.misses
+    return samples
+
+
+metrics.Callback("render_cache_requests_total", "Prebuilt response lookups by cache and result",
+                 _cache_requests, ("cache", "result"), kind="counter")
+
+
+class RenderCache:
+    """
+    Prebuilt command responses for one topic snapshot. Responses are a pure
+    function of the entry, so each is built once per snapshot generation
+    (plus any extra inputs reported by `version`) and then reused. A new
+    generation starts from an empty cache; warm() fills one up front.
+    Requests still holding an older snapshot are rendered but not stored,
+    so they can't throw away the cache of the generation being served.
+    """
+
+    def __init__(self, name, render, version=None):
+        self.name = name
+        self.render = render  # render(snapshot, key) -> payload
+        self.version = version or (lambda: None)
+        self.hits = 0
+        self.misses = 0
+        # (token, entries) replaced as one object so readers never see a mix
+        self._state = (None, {})
+        _caches.append(self)
+
+    def _token(self, snapshot):
+        return (snapshot.generation, self.version())
+
+    def _replaces(self, token):
+        """True if token belongs to a newer generation (or version) than the cached one."""
+        current_token = self._state[0]
+        if current_token is None or token[0] > current_token[0]:
+            return True
+        return token[0] == current_token[0] and token[1] != current_token[1]
+
+    def get(self, snapshot, key):
+        token = self._token(snapshot)
+        current_token, entries = self._state
+        if current_token != token:
+            if not self._replaces(token):
+                self.misses += 1
+                return self.render(snapshot, key)
+            entries = {}
+            self._state = (token, entries)
+
+        payload = entries.get(key)
+        if payload is None:
+            self.misses += 1
+            payload = entries[key] = self.render(snapshot, key)
+        else:
+            self.hits += 1
+        return payload
+
+    def warm(self, snapshot, keys):
+        """Builds every response for a newly published snapshot in one go."""
+        token = self._token(snapshot)
+        if token != self._state[0] and not self._replaces(token):
+            return  # A newer generation is already being served
+        started = time.perf_counter()
+        entries = {}
+        for key in keys:
+            try:
+                entries[key] = self.render(snapshot, key)
+            except Exception as e:
+                logging.error(f"Failed to pre-render {self.name} for {key}: {e}")
+        # A newer generation may have arrived while a background warm was running
+        if token == self._state[0] or self._replaces(token):
+            self._state = (token, entries)
+        logging.info(f"Pre-rendered {len(entries)} {self.name} responses for snapshot #{snapshot.generation} "
+                     f"in {time.perf_counter() - started:.2f}s")
+
+    def warm_in_background(self, snapshot, keys):
+        """warm() on a daemon thread, for snapshots too large to render while publishing."""
+        thread = threading.Thread(target=self.warm, args=(snapshot, list(keys)), name=f"warm {self.name}",
+                                  daemon=True)
+        thread.start()
+        # Finished threads are dropped here, so a long-running bot doesn't keep one per generation
+        _warming[:] = [t for t in _warming if t.is_alive()]
+        _warming.append(thread)
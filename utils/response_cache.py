@@ -0,0 +1,207 @@
+# utils/response_cache.py
+"""
+Durable cache of parsed AI responses, keyed by (topic, model, prompt hash).
+Every response is committed as soon as it arrives, so an update that crashes
+halfway resumes from the cache instead of paying for the same calls again.
+
+    python -m utils.response_cache stats
+    python -m utils.response_cache list --limit 20
+    python -m utils.response_cache purge --topic "Merge Sort"
+    python -m utils.response_cache purge --older-than-days 30
+    python -m utils.response_cache purge --all
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from . import metrics
+
+AI_CACHE_PATH = Path(os.getenv("AI_CACHE_PATH", "data/ai_cache.sqlite3"))
+# Least recently used responses are evicted past this size; 0 disables the cache
+AI_CACHE_MAX_MB = float(os.getenv("AI_CACHE_MAX_MB", "64"))
+# Bulk purges that delete at least this many entries give the space back to the disk
+VACUUM_MIN_DELETED = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    topic       TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    PRIMARY KEY (topic, model, prompt_hash)
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def _topic_key(topic):
+    return " ".join(topic.lower().split())
+
+
+class ResponseCache:
+    def __init__(self, path=AI_CACHE_PATH, max_bytes=int(AI_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # One connection shared by the pipeline's worker threads
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, topic, model, prompt_hash, max_age=None):
+        """The cached response, or None if missing or older than max_age seconds."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT data, created_at FROM responses WHERE topic=? AND model=? AND prompt_hash=?",
+                (_topic_key(topic), model, prompt_hash)).fetchone()
+            if row is None or (max_age is not None and now - row[1] > max_age):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used=? WHERE topic=? AND model=? AND prompt_hash=?",
+                               (now, _topic_key(topic), model, prompt_hash))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, topic, model, prompt_hash, data):
+        if not self.enabled:
+            return
+        payload = json.dumps(data, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (_topic_key(topic), model, prompt_hash, payload, len(payload.encode("utf-8")), now, now))
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        for topic, model, prompt_hash, size in self._conn.execute(
+                "SELECT topic, model, prompt_hash, size FROM responses ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE topic=? AND model=? AND prompt_hash=?",
+                               (topic, model, prompt_hash))
+            total -= size
+            evicted += 1
+        logging.info(f"AI response cache evicted {evicted} entries to stay under {self.max_bytes} bytes")
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            count, total, oldest, newest = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(created_at), MAX(created_at) FROM responses").fetchone()
+        return {"path": str(self.path), "entries": count, "bytes": total, "max_bytes": self.max_bytes,
+                "oldest": oldest, "newest": newest, "hits": self.hits, "misses": self.misses}
+
+    def entries(self, limit=50):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT topic, model, prompt_hash, size, created_at, last_used FROM responses "
+                "ORDER BY last_used DESC LIMIT ?", (limit,)).fetchall()
+
+    def purge(self, topic=None, older_than=None):
+        """
+        Deletes matching entries (everything if no filter); returns how many.
+        Per-topic purges run during updates, so only large full or age-based
+        purges VACUUM the file, which rewrites it under the lock.
+        """
+        clauses, params = [], []
+        if topic is not None:
+            clauses.append("topic=?")
+            params.append(_topic_key(topic))
+        if older_than is not None:
+            clauses.append("created_at < ?")
+            params.append(time.time() - older_than)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            deleted = self._connect().execute(f"DELETE FROM responses{where}", params).rowcount
+            if topic is None and deleted >= VACUUM_MIN_DELETED:
+                self._conn.execute("VACUUM")
+        return deleted
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide cache used by ai_client."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def _cache_requests():
+    cache = _cache
+    if cache is None:
+        return {}
+    return {("hit",): cache.hits, ("miss",): cache.misses}
+
+
+metrics.Callback("ai_cache_requests_total", "AI response cache lookups by result", _cache_requests, ("result",),
+                 kind="counter")
+
+
+def _format_time(ts):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts)) if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or purge the AI response cache")
+    parser.add_argument("--path", default=str(AI_CACHE_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show entry count and size")
+    list_parser = sub.add_parser("list", help="List the most recently used entries")
+    list_parser.add_argument("--limit", type=int, default=50)
+    purge_parser = sub.add_parser("purge", help="Delete entries")
+    purge_parser.add_argument("--topic")
+    purge_parser.add_argument("--older-than-days", type=float)
+    purge_parser.add_argument("--all", action="store_true", help="Delete every entry")
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.path, max_bytes=max(1, int(AI_CACHE_MAX_MB * 1024 * 1024)))
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"{stats['path']}: {stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB "
+              f"of {stats['max_bytes'] / 1024 / 1024:.0f} MiB")
+        print(f"oldest {_format_time(stats['oldest'])}, newest {_format_time(stats['newest'])}")
+    elif args.command == "list":
+        for topic, model, prompt_hash, size, created_at, last_used in cache.entries(args.limit):
+            print(f"{topic:40} {model:20} {prompt_hash} {size:>8}B  created {_format_time(created_at)}  "
+                  f"used {_format_time(last_used)}")
+    elif args.command == "purge":
+        if args.topic is None and args.older_than_days is None and not args.all:
+            parser.error("purge needs --topic, --older-than-days or --all")
+        older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+        print(f"Deleted {cache.purge(args.topic, older_than)} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# utils/search_index.py
+import heapq
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from .record_schema import complexity_text
+
+# Field weights: a query word in the title counts as much as three in the description
+FIELD_WEIGHTS = {"title": 3.0, "short": 1.0, "complexity": 0.5, "comments": 0.75}
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 160
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it", "its", "of", "on",
+    "or", "that", "the", "this", "to", "was", "what", "which", "with", "we", "can", "each", "into", "i",
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+_LINE_COMMENT = re.compile(r"//(.*)")
+_BLOCK_COMMENT = re.compile(r"/\*(.*?)\*/", re.S)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=65536)  # The vocabulary is small; most words repeat across topics
+def stem(word):
+    """Light suffix stripping so "paths"/"path" and "weighted"/"weight" meet."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ed"):
+        return word[:-2]
+    return word
+
+
+def tokenize(text):
+    return [stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+def code_comments(code):
+    """The // and /* */ comments of a C++ snippet, which describe it in plain words."""
+    if not code:
+        return []
+    return [c.strip() for c in _LINE_COMMENT.findall(code) + _BLOCK_COMMENT.findall(code)]
+
+
+def entry_comments(info):
+    """code_comments of an entry; mapped records keep them precomputed so their code stays unread."""
+    stored = getattr(info, "code_comments", None)
+    return stored() if stored else code_comments(info.get("code", ""))
+
+
+def _fields(key, info):
+    return {
+        "title": info.get("title", key),
+        "short": info.get("short", ""),
+        "complexity": complexity_text(info.get("time")) + " " + complexity_text(info.get("space")),
+        "comments": " ".join(entry_comments(info)),
+    }
+
+
+class SearchIndex:
+    """
+    BM25 over each topic's title, description, complexity and code comments,
+    built once per snapshot. Per-posting scores are computed at build time,
+    so a query only sums precomputed floats for its terms.
+    """
+
+    def __init__(self, dsa):
+        self.keys = []
+        doc_terms = []
+        lengths = []
+        for key, info in dsa.items():
+            tf = {}
+            length = 0.0
+            for field, text in _fields(key, info).items():
+                weight = FIELD_WEIGHTS[field]
+                for term, n in Counter(tokenize(text)).items():
+                    tf[term] = tf.get(term, 0.0) + weight * n
+                    length += weight * n
+            self.keys.append(key)
+            doc_terms.append(tf)
+            lengths.append(length)
+
+        count = len(self.keys)
+        average = (sum(lengths) / count) if count else 1.0
+        df = {}
+        for tf in doc_terms:
+            for term in tf:
+                df[term] = df.get(term, 0) + 1
+
+        idf = {term: math.log(1 + (count - n + 0.5) / (n + 0.5)) for term, n in df.items()}
+
+        # term -> list of (doc number, BM25 contribution)
+        self.postings = postings = {term: [] for term in df}
+        for doc, (tf, length) in enumerate(zip(doc_terms, lengths)):
+            norm = K1 * (1 - B + B * length / average)
+            for term, freq in tf.items():
+                postings[term].append((doc, idf[term] * freq * (K1 + 1) / (freq + norm)))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, query, k=5):
+        """Top-k (key, score) pairs for a free-text query, best first."""
+        scores = {}
+        get = scores.get
+        for term in set(tokenize(query)):
+            for doc, score in self.postings.get(term, ()):
+                scores[doc] = get(doc, 0.0) + score
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.keys[doc], score) for doc, score in best]
+
+
+def snippet(info, query, width=SNIPPET_CHARS):
+    """
+    The sentence of the description (or a code comment) mentioning the most
+    query words, trimmed to width, with those words in bold.
+    """
+    terms = set(tokenize(query))
+    candidates = _SENTENCE.split(info.get("short", "")) + entry_comments(info)
+
+    def hits(sentence):
+        return len(terms.intersection(tokenize(sentence)))
+
+    best = max((s for s in candidates if s.strip()), key=hits, default="")
+    if len(best) > width:
+        best = best[:width].rsplit(" ", 1)[0] + "…"
+
+    def bold(match):
+        word = match.group(0)
+        return f"**{word}**" if stem(word.lower()) in terms else word
+
+    return re.sub(r"[A-Za-z0-9]+", bold, best)
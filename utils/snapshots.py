@@ -0,0 +1,130 @@
+# utils/snapshots.py
+"""
+Crash-safe publishing of the topic data. Each update is written as a new
+generation directory (data/snapshots/gen-000042/) and only becomes visible
+once data/manifest.json is atomically replaced to point at it, so readers
+always see both files from the same, fully written generation. Generations
+are stored in the memory-mapped format from utils.binary_snapshot; older
+JSON generations can still be read.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from .binary_snapshot import BinarySnapshot, write_binary
+
+DATA_DIR = Path("data")
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+MANIFEST_FILE = DATA_DIR / "manifest.json"
+# Older generations are kept briefly so a reader that just read the manifest can finish
+KEEP_GENERATIONS = 3
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on every platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, obj, **dump_kwargs):
+    """Writes JSON to a temp file, fsyncs it and renames it over path."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+def read_manifest():
+    """The current manifest, or None if no generation has been published yet."""
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def generation_path(manifest):
+    return DATA_DIR / manifest["path"]
+
+
+def write_snapshot(dsa_items, res_items):
+    """
+    Writes a binary generation directory, fsyncs everything and then swaps
+    the manifest. Either the whole generation becomes current or,
+    if anything fails, the previous one stays current. Returns the manifest.
+    """
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    previous = read_manifest()
+    generation = (previous["generation"] if previous else 0) + 1
+    name = f"gen-{generation:06d}"
+    tmp_dir = SNAPSHOT_DIR / f"{name}.tmp"
+    final_dir = SNAPSHOT_DIR / name
+
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    try:
+        files = write_binary(tmp_dir, dsa_items, res_items)
+        _fsync_dir(tmp_dir)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+        _fsync_dir(SNAPSHOT_DIR)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    manifest = {
+        "generation": generation,
+        "path": final_dir.relative_to(DATA_DIR).as_posix(),
+        "created_at": time.time(),
+        "format": "binary",
+        "files": files,
+    }
+    atomic_write_json(MANIFEST_FILE, manifest, indent=2)  # The commit point
+
+    logging.info(f"Published generation {generation}: {files['index']['entries']} topics, "
+                 f"{files['index']['resources']} resource sets, {files['code']['bytes']} bytes of code")
+    prune_generations(generation)
+    return manifest
+
+
+def prune_generations(current_generation, keep=KEEP_GENERATIONS):
+    """Removes generation directories older than the last `keep` ones."""
+    for path in SNAPSHOT_DIR.glob("gen-*"):
+        try:
+            number = int(path.name[4:].split(".")[0])
+        except ValueError:
+            continue
+        if number <= current_generation - keep or (path.suffix == ".tmp" and number < current_generation):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_generation(manifest):
+    """
+    Opens a generation, checking its files are the ones the manifest
+    describes. Binary generations are memory-mapped and decoded lazily;
+    JSON ones (written before the binary format) are parsed in full.
+    """
+    base = generation_path(manifest)
+    if manifest.get("format") == "binary":
+        snapshot = BinarySnapshot(base, manifest["files"])
+        return snapshot.dsa, snapshot.resources
+    loaded = []
+    for kind in ("dsa", "resources"):
+        info = manifest["files"][kind]
+        path = base / info["name"]
+        raw = path.read_bytes()
+        if len(raw) != info["bytes"]:
+            raise ValueError(f"{path} is {len(raw)} bytes, manifest says {info['bytes']}")
+        loaded.append(json.loads(raw.decode("utf-8")))
+    return loaded[0], loaded[1]
@@ -0,0 +1,68 @@
+# utils/sync_status.py
+import threading
+import time
+from . import metrics
+
+
+class SyncStatus:
+    """
+    Progress of the data updater, written by the update thread and read by
+    !status. Reads take a copy, so the command never sees a torn update.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {
+            "running": False,
+            "phase": "idle",
+            "total": 0,
+            "done": 0,
+            "failed": 0,
+            "started_at": None,
+            "finished_at": None,
+            "last_topic": None,
+            "last_error": None,
+            "last_result": None,
+        }
+
+    def start(self):
+        with self._lock:
+            self._state.update(running=True, phase="fetching topics", total=0, done=0, failed=0,
+                               started_at=time.time(), finished_at=None, last_topic=None, last_error=None)
+
+    def set_phase(self, phase, total=None):
+        with self._lock:
+            self._state["phase"] = phase
+            if total is not None:
+                self._state["total"] = total
+
+    def add_total(self, count):
+        """Grows the amount of work while topics are still being discovered."""
+        with self._lock:
+            self._state["total"] += count
+
+    def topic_finished(self, topic, ok):
+        with self._lock:
+            self._state["done"] += 1
+            self._state["last_topic"] = topic
+            if not ok:
+                self._state["failed"] += 1
+
+    def finish(self, result, error=None):
+        with self._lock:
+            self._state.update(running=False, phase="idle", finished_at=time.time(),
+                               last_result=result, last_error=error)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._state)
+
+
+sync_status = SyncStatus()
+
+metrics.Callback("sync_running", "1 while the data updater is running", lambda: int(sync_status.snapshot()["running"]))
+metrics.Callback("sync_topics", "Topics in the current (or last) sync by state",
+                 lambda: {(k,): v for k, v in sync_status.snapshot().items() if k in ("total", "done", "failed")},
+                 ("state",))
+metrics.Callback("sync_last_finished_timestamp_seconds", "When the last sync finished",
+                 lambda: sync_status.snapshot()["finished_at"] or 0)
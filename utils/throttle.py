@@ -0,0 +1,81 @@
+# utils/throttle.py
+"""
+Per-user, per-channel and per-guild command limits. Every command takes one
+token from each of its three buckets; if any of them is empty the command is
+shed before its handler runs and the caller gets a short cooldown reply.
+"""
+import os
+import time
+from discord.ext import commands
+from .rate_limiter import KeyedLimiter
+from . import metrics
+
+USER_COMMANDS_PER_MINUTE = float(os.getenv("USER_COMMANDS_PER_MINUTE", "6"))
+USER_COMMAND_BURST = int(os.getenv("USER_COMMAND_BURST", "3"))
+CHANNEL_COMMANDS_PER_MINUTE = float(os.getenv("CHANNEL_COMMANDS_PER_MINUTE", "30"))
+CHANNEL_COMMAND_BURST = int(os.getenv("CHANNEL_COMMAND_BURST", "10"))
+GUILD_COMMANDS_PER_MINUTE = float(os.getenv("GUILD_COMMANDS_PER_MINUTE", "120"))
+GUILD_COMMAND_BURST = int(os.getenv("GUILD_COMMAND_BURST", "30"))
+# A user who keeps hammering a command gets one cooldown reply per window, not one per message
+COOLDOWN_NOTICE_SECONDS = 10.0
+
+
+class Throttled(commands.CheckFailure):
+    def __init__(self, scope, retry_after):
+        super().__init__(f"{scope} rate limit hit; retry in {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class CommandThrottle:
+    def __init__(self):
+        self.scopes = {
+            "user": KeyedLimiter(USER_COMMANDS_PER_MINUTE, USER_COMMAND_BURST),
+            "channel": KeyedLimiter(CHANNEL_COMMANDS_PER_MINUTE, CHANNEL_COMMAND_BURST),
+            "guild": KeyedLimiter(GUILD_COMMANDS_PER_MINUTE, GUILD_COMMAND_BURST),
+        }
+        self.allowed = 0
+        self.shed = {scope: 0 for scope in self.scopes}
+        self._notified = {}
+
+    def _keys(self, ctx):
+        yield "user", ctx.author.id
+        yield "channel", ctx.channel.id
+        if ctx.guild is not None:
+            yield "guild", ctx.guild.id
+
+    def check(self, ctx):
+        """
+        Takes a token from every bucket the context maps to, or none of them:
+        a command shed by its channel doesn't also eat into the user's budget.
+        Raises Throttled naming the first scope that is out of tokens.
+        """
+        buckets = [(scope, self.scopes[scope].bucket(key)) for scope, key in self._keys(ctx)]
+        for scope, bucket in buckets:
+            if not bucket.available():
+                self.shed[scope] += 1
+                raise Throttled(scope, bucket.retry_after())
+        for _, bucket in buckets:
+            bucket.try_acquire()
+        self.allowed += 1
+        return True
+
+    def should_notify(self, user_id):
+        """True at most once per COOLDOWN_NOTICE_SECONDS for each user."""
+        now = time.monotonic()
+        if now - self._notified.get(user_id, 0.0) < COOLDOWN_NOTICE_SECONDS:
+            return False
+        self._notified[user_id] = now
+        if len(self._notified) > 10000:
+            self._notified = {k: v for k, v in self._notified.items() if now - v < COOLDOWN_NOTICE_SECONDS}
+        return True
+
+    def stats(self):
+        return {"allowed": self.allowed, "shed": dict(self.shed),
+                "tracked": {scope: len(limiter) for scope, limiter in self.scopes.items()}}
+
+
+throttle = CommandThrottle()
+
+metrics.Callback("commands_shed_total", "Commands rejected by the rate limits, by scope",
+                 lambda: {(scope,): n for scope, n in throttle.shed.items()}, ("scope",), kind="counter")
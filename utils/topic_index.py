@@ -0,0 +1,215 @@
+# utils/topic_index.py
+import heapq
+from collections import Counter
+from itertools import chain
+from difflib import SequenceMatcher
+
+# Common shorthand people type instead of the topic name. Each alias lists
+# normalized keys in order of preference; the first one present in the data wins.
+ALIASES = {
+    "dp": ["dynamicprogramming"],
+    "bfs": ["bfsanddfs", "breadthfirstsearch", "graphalgorithms", "graphs"],
+    "dfs": ["bfsanddfs", "depthfirstsearch", "graphalgorithms", "graphs"],
+    "graph": ["graphalgorithms", "graphs", "graphrepresentations"],
+    "graphs": ["graphalgorithms", "graphrepresentations"],
+    "ll": ["linkedlists", "linkedlist"],
+    "linkedlist": ["linkedlists"],
+    "bst": ["selfbalancingbsts", "binarysearchtree", "tree"],
+    "avl": ["selfbalancingbsts"],
+    "redblack": ["selfbalancingbsts"],
+    "dsu": ["disjointsetunion", "unionfind"],
+    "unionfind": ["disjointsetunion"],
+    "pq": ["heapandpriorityqueue", "heaps"],
+    "priorityqueue": ["heapandpriorityqueue", "heaps"],
+    "heap": ["heapandpriorityqueue", "heaps", "heapsort"],
+    "bit": ["fenwicktree"],
+    "bitmask": ["bitmaskdp", "countingsetbits"],
+    "mst": ["minimumspanningtree"],
+    "scc": ["stronglyconnectedcomponents"],
+    "lis": ["longestincreasingsubsequence"],
+    "lcs": ["longestcommonsubsequence"],
+    "hashmap": ["hashtables"],
+    "hashing": ["hashtables"],
+    "recursion": ["mathematicalrecursion", "backtrackingrecursionbasics"],
+    "sorting": ["mergesort", "quicksort"],
+    "twopointers": ["twopointer"],
+    "toposort": ["topologicalsort"],
+    "dijkstras": ["dijkstra"],
+    "kadanes": ["kadane"],
+    "lru": ["lrucacheimplementation"],
+    "bigo": ["timeandspacecomplexityanalysis"],
+    "complexity": ["timeandspacecomplexityanalysis"],
+}
+
+MAX_QUERY_LENGTH = 64
+FUZZY_CANDIDATES = 12
+# Fuzzy ranking reads at most this many posting entries, rarest trigrams first,
+# then keeps the FUZZY_POOL best-overlapping topics for the common trigrams
+FUZZY_SCAN = 800
+FUZZY_POOL = 48
+STRONG_MATCH = 0.85
+
+
+def normalize(text):
+    """The same normalization the commands have always used for matching."""
+    return text.lower().replace(" ", "").replace("-", "").replace("_", "")
+
+
+def _trigrams(text):
+    padded = f"^{text}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TopicIndex:
+    """
+    Lookup structures built once per data snapshot so that resolving a topic
+    is a handful of dict/set operations instead of a scan over every key.
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (key, title) in the order the data file lists them
+        self.keys = []
+        self.titles = {}
+        self.normalized = {}
+        self.postings = {}
+        self._names = {}  # key -> normalized forms scored during fuzzy ranking
+
+        for key, title in entries:
+            if key in self.titles:
+                continue
+            self.keys.append(key)
+            self.titles[key] = title or key
+
+            names = {normalize(key)}
+            if title:
+                names.add(normalize(title))
+            names.discard("")
+            self._names[key] = names
+            for name in names:
+                self.normalized.setdefault(name, key)
+                for gram in _trigrams(name):
+                    self.postings.setdefault(gram, set()).add(key)
+
+        self.order = {key: i for i, key in enumerate(self.keys)}
+        self.aliases = {}
+        for alias, targets in ALIASES.items():
+            for target in targets:
+                if target in self.normalized:
+                    self.aliases[alias] = self.normalized[target]
+                    break
+
+    def __len__(self):
+        return len(self.keys)
+
+    def resolve(self, query):
+        """
+        Maps user input to a topic key: exact key, normalized key/title, alias,
+        substring, then fuzzy match. Returns None if nothing is close enough.
+        """
+        if query in self.titles:
+            return query
+
+        q = normalize(query)[:MAX_QUERY_LENGTH]
+        if not q:
+            return None
+        if q in self.normalized:
+            return self.normalized[q]
+        if q in self.aliases:
+            return self.aliases[q]
+
+        found = self._contained_in_name(q)
+        if found:
+            return found
+
+        # A close typo ("segmnt tree") beats a short topic name that happens to
+        # appear inside the query ("tree"), so check strong fuzzy hits first
+        ranked = self._scored(q, cutoff=0.6, limit=1)
+        if ranked and ranked[0][0] >= STRONG_MATCH:
+            return ranked[0][2]
+
+        found = self._name_in_query(q)
+        if found:
+            return found
+        return ranked[0][2] if ranked else None
+
+    def suggest(self, query, n=3):
+        """Ranked 'did you mean' keys for a query that didn't resolve."""
+        q = normalize(query)[:MAX_QUERY_LENGTH]
+        if not q:
+            return []
+        return [key for _, _, key in self._scored(q, cutoff=0.4, limit=n)]
+
+    def _contained_in_name(self, q):
+        if len(q) < 3:
+            return None
+
+        # Topics whose name contains the query: they must contain every trigram of it
+        grams = sorted((self.postings.get(q[i:i + 3], ()) for i in range(len(q) - 2)), key=len)
+        if not grams[0]:
+            return None
+        candidates = set(grams[0]).intersection(*grams[1:])
+        hits = [k for k in candidates if any(q in name for name in self._names[k])]
+        if hits:
+            return min(hits, key=lambda k: (len(normalize(k)), self.order[k]))
+        return None
+
+    def _name_in_query(self, q):
+        # Topics whose name is contained in the query, longest first
+        for length in range(len(q) - 1, 2, -1):
+            for start in range(len(q) - length + 1):
+                key = self.normalized.get(q[start:start + length])
+                if key:
+                    return key
+        return None
+
+    def _most_overlap(self, counts, n):
+        """The n keys with the highest counts, ties going to the topic listed first."""
+        ranked = counts.most_common()
+        if len(ranked) <= n:
+            return [key for key, _ in ranked]
+        floor = ranked[n - 1][1]
+        above = [key for key, count in ranked if count > floor]
+        tied = sorted((key for key, count in ranked if count == floor), key=self.order.__getitem__)
+        return above + tied[:n - len(above)]
+
+    def _scored(self, q, cutoff, limit=None):
+        """(score, -order, key) tuples at or above cutoff, best first; at most limit of them."""
+        postings = sorted(filter(None, map(self.postings.get, _trigrams(q))), key=len)
+        if not postings:
+            return []
+
+        # Rare trigrams say the most about which topic was meant, so overlap is
+        # counted from those first. Common ones ("tre", "ion") can cover most of
+        # the index: once FUZZY_SCAN posting entries have been read they are only
+        # checked against the FUZZY_POOL best candidates so far
+        rare = 1
+        scanned = len(postings[0])
+        while rare < len(postings) and scanned + len(postings[rare]) <= FUZZY_SCAN:
+            scanned += len(postings[rare])
+            rare += 1
+        if scanned > FUZZY_SCAN:
+            # Every trigram is common: keep the topics listed first
+            postings[0] = heapq.nsmallest(FUZZY_SCAN, postings[0], key=self.order.__getitem__)
+        counts = Counter(chain.from_iterable(postings[:rare]))
+        if rare < len(postings):
+            pool = set(self._most_overlap(counts, FUZZY_POOL))
+            counts = Counter({key: counts[key] for key in pool})
+            counts.update(chain.from_iterable(map(pool.intersection, postings[rare:])))
+
+        # Cheap trigram overlap narrows the field before the exact similarity ratio
+        shortlist = heapq.nlargest(FUZZY_CANDIDATES, counts, key=lambda k: (counts[k], -self.order[k]))
+        matcher = SequenceMatcher()
+        matcher.set_seq2(q)  # seq2 is the side SequenceMatcher precomputes, so it's reused across names
+        scored = []
+        for key in shortlist:
+            score = 0.0
+            for name in self._names[key]:
+                matcher.set_seq1(name)
+                # The upper bounds skip names that can't beat what's already ranked
+                floor = max(cutoff, score, scored[limit - 1][0] if limit and len(scored) >= limit else 0.0)
+                if matcher.real_quick_ratio() >= floor and matcher.quick_ratio() >= floor:
+                    score = max(score, matcher.ratio())
+            if score >= cutoff:
+                scored.append((score, -self.order[key], key))
+                scored.sort(reverse=True)
+        return scored[:limit] if limit else scored
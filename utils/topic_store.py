@@ -0,0 +1,186 @@
+# utils/topic_store.py
+import json
+import logging
+import threading
+import time
+from .topic_index import TopicIndex
+from .search_index import SearchIndex
+from .prefix_trie import PrefixTrie
+from .snapshots import DATA_DIR, MANIFEST_FILE, read_manifest, load_generation
+from . import metrics
+
+# Bundled seed data, served until the updater publishes its first generation
+DSA_FILE = DATA_DIR / "dsa_topics.json"
+RES_FILE = DATA_DIR / "resources.json"
+
+
+class Snapshot:
+    """
+    An immutable view of the topic data. Readers grab one with current()
+    and keep using it for the whole request, even if a newer one is published.
+    """
+    __slots__ = ("dsa", "resources", "index", "generation", "loaded_at", "signature", "partial", "_search",
+                 "_completions")
+
+    def __init__(self, dsa, resources, generation, signature=None, partial=False):
+        self.dsa = dsa
+        self.resources = resources
+        self.index = build_index(dsa, resources)
+        self.generation = generation
+        self.loaded_at = time.time()
+        self.signature = signature
+        self.partial = partial  # Published mid-sync, not yet written to disk
+        self._search = None
+        self._completions = None
+
+    @property
+    def ready(self):
+        return bool(self.dsa or self.resources)
+
+    @property
+    def search(self):
+        """
+        Full-text index for !search. Built by a publish listener for complete
+        snapshots; partial ones build it only if someone searches mid-sync.
+        """
+        if self._search is None:
+            self._search = SearchIndex(self.dsa)
+        return self._search
+
+    @property
+    def completions(self):
+        """Prefix trie for slash command autocomplete, built like search."""
+        if self._completions is None:
+            index = self.index
+            self._completions = PrefixTrie((key, index.titles[key]) for key in index.keys)
+        return self._completions
+
+    @property
+    def mapped(self):
+        """True when entries are decoded from a memory-mapped generation on access."""
+        return getattr(self.dsa, "mapped", False)
+
+
+def build_index(dsa, resources):
+    """One index shared by !dsa and !resources, titled from the DSA entries."""
+    if hasattr(dsa, "titles"):
+        entries = dsa.titles()  # Mapped generations keep titles in the header
+    else:
+        entries = [(key, info.get("title", key)) for key, info in dsa.items()]
+    entries.extend((key, None) for key in resources if key not in dsa)
+    return TopicIndex(entries)
+
+
+_snapshot = Snapshot({}, {}, 0)
+_publish_lock = threading.Lock()  # Serialises publishers; readers never take it
+_listeners = []
+
+metrics.Callback("snapshot_generation", "Generation number of the topic snapshot being served",
+                 lambda: _snapshot.generation)
+metrics.Callback("snapshot_topics", "Topics in the snapshot being served", lambda: len(_snapshot.dsa))
+
+
+def current():
+    """Returns the latest published snapshot without touching the disk."""
+    return _snapshot
+
+
+def subscribe(callback):
+    """Registers callback(snapshot) to run every time a new snapshot is published."""
+    _listeners.append(callback)
+
+
+def publish(dsa, resources, signature=None, partial=False):
+    """
+    Swaps in a new snapshot built from already-parsed data. The swap is a
+    single reference assignment, so concurrent readers see either the old
+    snapshot or the new one, never a mix.
+    """
+    global _snapshot
+    with _publish_lock:
+        snapshot = Snapshot(dsa, resources, _snapshot.generation + 1, signature, partial)
+        _snapshot = snapshot
+
+    logging.info(f"Published topic snapshot #{snapshot.generation} ({len(dsa)} topics, {len(resources)} resource sets)")
+    for callback in list(_listeners):
+        try:
+            callback(snapshot)
+        except Exception as e:
+            logging.error(f"Topic store listener failed: {e}", exc_info=True)
+    return snapshot
+
+
+def _file_signature():
+    """
+    Identifies what's on disk: the manifest's (inode, mtime, size) once the
+    updater has published a generation, otherwise the bundled seed files.
+    Returns None if there is no data at all.
+    """
+    try:
+        st = MANIFEST_FILE.stat()
+        return ("manifest", st.st_ino, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        pass
+    try:
+        stats = [path.stat() for path in (DSA_FILE, RES_FILE)]
+    except FileNotFoundError:
+        return None
+    return ("seed",) + tuple((st.st_ino, st.st_mtime_ns, st.st_size) for st in stats)
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_data(signature):
+    if signature[0] == "manifest":
+        manifest = read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(MANIFEST_FILE)
+        return load_generation(manifest)
+    return _read_json(DSA_FILE), _read_json(RES_FILE)
+
+
+def load():
+    """
+    Loads the current generation (or the seed files) from disk and publishes
+    it. If anything is missing or can't be parsed the current snapshot is kept.
+    """
+    signature = _file_signature()
+    if signature is None:
+        logging.info("Topic data files not found; keeping current snapshot.")
+        return None
+
+    try:
+        dsa, resources = _read_data(signature)
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Could not load topic data, keeping snapshot #{_snapshot.generation}: {e}")
+        return None
+
+    # If a new generation was published while we were reading, try again on the next check
+    if _file_signature() != signature:
+        logging.info("Topic data changed while loading; will retry on next check.")
+        return None
+
+    return publish(dsa, resources, signature)
+
+
+def refresh_if_changed():
+    """
+    Cheap stat() check used by the bot's watcher task; reloads only when the
+    manifest on disk no longer matches the published snapshot.
+    """
+    signature = _file_signature()
+    if signature is None or signature == _snapshot.signature:
+        return None
+    return load()
+
+
+def mark_current(dsa, resources, partial=False):
+    """
+    Called by the updater as topics finish during a sync (partial=True), so
+    they are served before the generation is written. Finished generations
+    are picked up with load(), which only has to map the new files.
+    """
+    return publish(dsa, resources, _file_signature(), partial)